@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Per-request setup overhead of main.invoke: before vs after reusing warm
+components.
+
+"cold" rebuilds everything each request the way invoke used to (load_model,
+profile tools, Agent with the full system prompt); "warm" goes through the
+process-wide model and the per-session agent cache. No model calls are made;
+only setup is timed. Memory is disabled (BEDROCK_AGENTCORE_MEMORY_ID unset)
+so no AWS calls are needed.
+
+Usage:
+    python benchmarks/bench_agent_setup.py [--requests 200] [--sessions 10]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+os.environ.pop("BEDROCK_AGENTCORE_MEMORY_ID", None)
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import logging
+
+import main
+from strands import Agent
+
+logging.getLogger().setLevel(logging.ERROR)
+main.log.setLevel(logging.ERROR)
+
+
+def cold_setup(session_id):
+    return Agent(
+        model=main.load_model(),
+        session_manager=main.create_session_manager(session_id),
+        system_prompt=main.SYSTEM_PROMPT,
+        tools=main.create_profile_tools(session_id) + main.KB_TOOLS
+    )
+
+
+def warm_setup(session_id):
+    return main.session_agents.get_or_create(
+        session_id, lambda: main.build_session_agent(session_id, [])
+    ).agent
+
+
+def run(setup, requests, sessions):
+    times = []
+    for i in range(requests):
+        session_id = f"session-{i % sessions}"
+        start = time.perf_counter()
+        setup(session_id)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def run_benchmark():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--sessions", type=int, default=10, help="distinct sessions the requests rotate through")
+    args = parser.parse_args()
+
+    print(f"{args.requests} requests over {args.sessions} sessions")
+    print(f"{'setup':<8}{'mean (ms)':>12}{'p50 (ms)':>12}{'max (ms)':>12}")
+    for name, setup in (("cold", cold_setup), ("warm", warm_setup)):
+        times = run(setup, args.requests, args.sessions)
+        print(f"{name:<8}{statistics.mean(times):>12.3f}{statistics.median(times):>12.3f}{max(times):>12.3f}")
+    print(f"agent cache: {main.session_agents.stats()}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Concurrent-session load test of the agent runtime: the real main.invoke
+entrypoint at N simultaneous sessions, on one event loop as in the
+BedrockAgentCoreApp container.
+
+The model is a deterministic stub: each turn it first calls
+search_project_profile, then streams --chunks text chunks. Its waits are
+asyncio sleeps, like a real model stream. The Knowledge Base client is a
+stub whose retrieve blocks for --kb-ms with time.sleep, like the real
+synchronous boto3 call. The retrieval cache is disabled so every turn
+reaches it.
+
+For each session count this reports:
+- event-loop lag: how late a 10 ms asyncio.sleep wakes up; high values
+  mean something is blocking the loop and stalling every stream
+- TTFB per turn: time to the first text chunk
+- tool latency per call: search_project_profile, from the turn's usage
+
+Usage:
+    python benchmarks/bench_load.py [--sessions 1,8,32,64] [--turns 2] [--kb-ms 80] [--model-ms 300]
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import math
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+os.environ.pop("BEDROCK_AGENTCORE_MEMORY_ID", None)
+os.environ.pop("GATEWAY_URL", None)
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import kb_tool
+import main
+from sessions import SessionCache
+from strands.models import Model
+
+logging.disable(logging.WARNING)
+
+LAG_INTERVAL = 0.010
+TOOL = "search_project_profile"
+
+
+class StubModel(Model):
+    """Calls search_project_profile, then answers with fixed text chunks once it has the result."""
+
+    def __init__(self, model_delay, chunk_delay, chunks):
+        self.model_delay = model_delay
+        self.chunk_delay = chunk_delay
+        self.chunks = chunks
+
+    def update_config(self, **model_config):
+        pass
+
+    def get_config(self):
+        return {}
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        raise NotImplementedError
+        yield
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        await asyncio.sleep(self.model_delay)
+        yield {"messageStart": {"role": "assistant"}}
+        if not any("toolResult" in block for block in messages[-1]["content"]):
+            tool_input = {"location": "Minas Gerais, Brazil", "commodity": "coffee",
+                          "budget_range": "$50,000", "outcomes": "soil health, farmer income"}
+            yield {"contentBlockStart": {"start": {"toolUse": {"toolUseId": f"t{len(messages)}", "name": TOOL}}}}
+            yield {"contentBlockDelta": {"delta": {"toolUse": {"input": json.dumps(tool_input)}}}}
+            yield {"contentBlockStop": {}}
+            yield {"messageStop": {"stopReason": "tool_use"}}
+        else:
+            for i in range(self.chunks):
+                if i:
+                    await asyncio.sleep(self.chunk_delay)
+                yield {"contentBlockDelta": {"delta": {"text": f"token {i} "}}}
+            yield {"contentBlockStop": {}}
+            yield {"messageStop": {"stopReason": "end_turn"}}
+        yield {"metadata": {"usage": {"inputTokens": 1000, "outputTokens": self.chunks, "totalTokens": 1000 + self.chunks},
+                            "metrics": {"latencyMs": 0}}}
+
+
+class StubKnowledgeBase:
+    """Blocking retrieve, like the synchronous boto3 client."""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def retrieve(self, **kwargs):
+        time.sleep(self.delay)
+        text = kwargs["retrievalQuery"]["text"]
+        return {"retrievalResults": [
+            {"content": {"text": f"{text} result {i}"}, "metadata": {"source": "stub"}, "score": 1.0 - i / 10}
+            for i in range(kwargs["retrievalConfiguration"]["vectorSearchConfiguration"]["numberOfResults"])
+        ]}
+
+
+def percentile(samples, q):
+    """Nearest-rank percentile of a list of samples."""
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))]
+
+
+async def monitor_lag(samples, stop):
+    """Record how late each LAG_INTERVAL sleep wakes up (ms)."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(LAG_INTERVAL)
+        samples.append((time.perf_counter() - start - LAG_INTERVAL) * 1000)
+
+
+async def run_session(session_id, turns, ttfbs, tool_ms, errors):
+    context = SimpleNamespace(session_id=session_id)
+    for turn in range(turns):
+        start = time.perf_counter()
+        first = None
+        try:
+            async for chunk in main.invoke({"prompt": f"turn {turn}", "metadata": True}, context):
+                if isinstance(chunk, str):
+                    if first is None:
+                        first = time.perf_counter()
+                else:
+                    tool = chunk["metadata"]["usage"]["tools"].get(TOOL)
+                    if tool and tool["calls"]:
+                        tool_ms.append(tool["total_ms"] / tool["calls"])
+        except Exception:
+            errors.append(session_id)
+            continue
+        if first is not None:
+            ttfbs.append((first - start) * 1000)
+
+
+async def run_level(sessions, turns):
+    main.session_agents = SessionCache(max_sessions=max(sessions, 1), idle_seconds=3600)
+    lag, ttfbs, tool_ms, errors = [], [], [], []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(monitor_lag(lag, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        run_session(f"load-{sessions}-{i:032d}", turns, ttfbs, tool_ms, errors) for i in range(sessions)
+    ))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await monitor
+    return {"lag": lag, "ttfb": ttfbs, "tool_ms": tool_ms, "errors": len(errors),
+            "turns_per_s": sessions * turns / elapsed}
+
+
+def run_benchmark():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", default="1,8,32,64", help="comma-separated concurrent session counts")
+    parser.add_argument("--turns", type=int, default=2, help="turns per session")
+    parser.add_argument("--model-ms", type=float, default=300, help="stub model delay before each response")
+    parser.add_argument("--chunk-ms", type=float, default=5, help="delay between streamed text chunks")
+    parser.add_argument("--chunks", type=int, default=100, help="text chunks per answer")
+    parser.add_argument("--kb-ms", type=float, default=80, help="blocking latency of each KB retrieve")
+    args = parser.parse_args()
+
+    main._model = StubModel(args.model_ms / 1000, args.chunk_ms / 1000, args.chunks)
+    kb_tool.bedrock_agent_runtime = StubKnowledgeBase(args.kb_ms / 1000)
+    kb_tool.retrieval_cache = None
+
+    print(f"{args.turns} turns/session; model {args.model_ms:.0f} ms + {args.chunks} x {args.chunk_ms:.0f} ms chunks; "
+          f"KB retrieve {args.kb_ms:.0f} ms (blocking), {len(kb_tool.profile_facet_queries('a', 'b', 'c', 'd'))} per tool call")
+    print(f"{'sessions':>8}{'turns/s':>9}{'lag p50':>9}{'lag p99':>9}{'lag max':>9}"
+          f"{'TTFB p50':>10}{'TTFB p95':>10}{'TTFB p99':>10}{'tool p50':>10}{'tool p95':>10}{'tool p99':>10}{'errors':>8}")
+    for sessions in (int(n) for n in args.sessions.split(",") if n):
+        # The agents' default callback handler prints every chunk; keep its cost, drop the output
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            r = asyncio.run(run_level(sessions, args.turns))
+        print(f"{sessions:>8}{r['turns_per_s']:>9.1f}"
+              f"{percentile(r['lag'], 50):>9.1f}{percentile(r['lag'], 99):>9.1f}{max(r['lag'], default=0):>9.1f}"
+              f"{percentile(r['ttfb'], 50):>10.0f}{percentile(r['ttfb'], 95):>10.0f}{percentile(r['ttfb'], 99):>10.0f}"
+              f"{percentile(r['tool_ms'], 50):>10.0f}{percentile(r['tool_ms'], 95):>10.0f}{percentile(r['tool_ms'], 99):>10.0f}"
+              f"{r['errors']:>8}")
+    print("All times in ms. Lag is the delay of a 10 ms timer on the event loop.")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Per-invocation MCP overhead: a new Gateway session per request vs the
+persistent MCPConnectionManager.
+
+The Gateway is replaced by a local stub MCP server: a small JSON-RPC server
+on 127.0.0.1 that answers initialize and tools/list after a configurable
+delay (standing in for the network round trip and Gateway processing). Each
+client call is a real HTTP request, so connection setup is measured too.
+
+"per-request" opens a session (initialize) and lists tools on every
+invocation, the way invoke used to; "persistent" goes through one
+MCPConnectionManager.
+
+Usage:
+    python benchmarks/bench_mcp_connection.py [--requests 100] [--latency-ms 20]
+"""
+import argparse
+import http.client
+import json
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from mcp_client.connection import MCPConnectionManager
+
+TOOLS = [{"name": f"gateway_tool_{i}", "description": "Stub tool", "inputSchema": {"type": "object"}} for i in range(20)]
+
+
+class StubMCPServer(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(self.server.latency)
+        if request["method"] == "initialize":
+            result = {"protocolVersion": "2025-03-26", "capabilities": {"tools": {"listChanged": True}}}
+        else:
+            result = {"tools": TOOLS}
+        body = json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": result}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubMCPClient:
+    """Minimal MCP client for the stub server: a session is a connection plus initialize."""
+
+    def __init__(self, port):
+        self.port = port
+        self.conn = None
+        self.ids = 0
+
+    def _call(self, method):
+        self.ids += 1
+        body = json.dumps({"jsonrpc": "2.0", "id": self.ids, "method": method})
+        self.conn.request("POST", "/mcp", body, {"Content-Type": "application/json"})
+        return json.loads(self.conn.getresponse().read())["result"]
+
+    def __enter__(self):
+        self.conn = http.client.HTTPConnection("127.0.0.1", self.port)
+        self._call("initialize")
+        return self
+
+    def __exit__(self, *exc):
+        self.conn.close()
+
+    def list_tools_sync(self):
+        return self._call("tools/list")["tools"]
+
+
+def per_request(port):
+    with StubMCPClient(port) as client:
+        return client.list_tools_sync()
+
+
+def run(fn, requests):
+    times = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=20, help="stub server delay per MCP request")
+    parser.add_argument("--ttl", type=float, default=300, help="tool list cache TTL in seconds")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubMCPServer)
+    server.latency = args.latency_ms / 1000
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    manager = MCPConnectionManager(lambda: StubMCPClient(port), tools_ttl=args.ttl)
+    print(f"{args.requests} invocations, stub Gateway latency {args.latency_ms:.0f} ms per request")
+    print(f"{'mode':<12}{'mean (ms)':>12}{'p50 (ms)':>12}{'p99 (ms)':>12}")
+    for name, fn in (("per-request", lambda: per_request(port)), ("persistent", manager.list_tools)):
+        times = sorted(run(fn, args.requests))
+        p99 = times[min(len(times) - 1, int(len(times) * 0.99))]
+        print(f"{name:<12}{statistics.mean(times):>12.3f}{statistics.median(times):>12.3f}{p99:>12.3f}")
+    print(f"connection: {manager.stats()}")
+    manager.reset()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
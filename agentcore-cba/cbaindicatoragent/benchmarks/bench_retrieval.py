@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Latency / recall comparison harness for the local hybrid retriever.
+
+Offline (default): measures recall@k of the local index against known-item
+queries built from the indicator catalog (query = indicator name, relevant
+document = that indicator), for BM25-only, dense-only and hybrid scoring,
+plus per-query latency.
+
+Live (--live): also runs the kb_tool query templates against the Bedrock
+Knowledge Base and reports Bedrock latency and the overlap between the top-k
+results of both engines (needs AWS credentials and KNOWLEDGE_BASE_ID).
+
+Usage:
+    python benchmarks/bench_retrieval.py [--k 5] [--live]
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from retrieval import HybridRetriever
+
+PROFILE_QUERIES = [
+    "indicators that measure soil health in circular bioeconomy projects",
+    "indicators that measure farmer income in circular bioeconomy projects",
+    "measurement methods for coffee with low budget cost-effective affordable",
+    "measurement methods for cotton with medium budget cost-effective affordable",
+    "coffee indicators and methods for Brazil region location-specific considerations",
+    "cotton indicators and methods for Chad region location-specific considerations",
+    "water quality monitoring methods for smallholder farms",
+    "biodiversity indicators for regenerative agriculture",
+]
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def known_item_queries(retriever):
+    for doc, source in enumerate(retriever.sources):
+        if "#Indicators:" in source:
+            name = retriever.texts[doc].split("\n", 1)[0].split(": ", 1)[1]
+            yield name, doc
+
+
+def offline_recall(retriever, k):
+    queries = list(known_item_queries(retriever))
+    print(f"Known-item recall@{k} over {len(queries)} indicator-name queries")
+    print(f"{'scoring':<10}{'recall':>8}{'p50 (ms)':>10}{'p95 (ms)':>10}")
+    for name, alpha in (("bm25", 1.0), ("dense", 0.0), ("hybrid", 0.5)):
+        hits, times = 0, []
+        for query, doc in queries:
+            start = time.perf_counter()
+            results = retriever.search(query, k, alpha=alpha)
+            times.append((time.perf_counter() - start) * 1000)
+            hits += any(r["metadata"]["source"] == retriever.sources[doc] for r in results)
+        print(f"{name:<10}{hits / len(queries):>8.3f}{percentile(times, 50):>10.3f}{percentile(times, 95):>10.3f}")
+
+
+def live_comparison(retriever, k):
+    import kb_tool
+
+    print(f"\nBedrock KB vs local index, top-{k}, {len(PROFILE_QUERIES)} profile queries")
+    kb_times, local_times, overlaps = [], [], []
+    for query in PROFILE_QUERIES:
+        start = time.perf_counter()
+        kb_results = kb_tool._bedrock_retrieve(query, k)
+        kb_times.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        local_results = retriever.search(query, k)
+        local_times.append((time.perf_counter() - start) * 1000)
+        kb_texts = {r.get("content", {}).get("text", "") for r in kb_results}
+        overlaps.append(sum(r["content"]["text"] in kb_texts for r in local_results) / max(len(kb_results), 1))
+    print(f"{'engine':<10}{'p50 (ms)':>10}{'p95 (ms)':>10}")
+    print(f"{'bedrock':<10}{percentile(kb_times, 50):>10.1f}{percentile(kb_times, 95):>10.1f}")
+    print(f"{'local':<10}{percentile(local_times, 50):>10.3f}{percentile(local_times, 95):>10.3f}")
+    print(f"mean overlap@{k} with Bedrock: {statistics.mean(overlaps):.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--live", action="store_true", help="also query the Bedrock Knowledge Base")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    retriever = HybridRetriever.load()
+    print(f"Loaded {len(retriever.texts)} documents in {(time.perf_counter() - start) * 1000:.1f} ms\n")
+    offline_recall(retriever, args.k)
+    if args.live:
+        live_comparison(retriever, args.k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+boto3 clients with explicit connection pooling, timeouts and retries.
+
+Copy of cba_api/aws.py from the repository root (the container is built
+from this directory alone); the root tests/test_aws.py fails when the code
+differs from it. See that module for the rationale. create_client() builds
+clients for a call type ("storage", "search", "model" or "stream") with
+adaptive retries and TCP keepalive, and client_stats() returns per-client
+call, error, retry and latency counters.
+"""
+
+import os
+import threading
+import time
+
+# Pooled connections per client; threads beyond this wait for a connection
+MAX_POOL_CONNECTIONS = int(os.environ.get("AWS_MAX_POOL_CONNECTIONS", "50"))
+
+CALL_TYPES = {
+    "storage": {"connect_timeout": 2, "read_timeout": 10, "max_attempts": 4},
+    "search": {"connect_timeout": 2, "read_timeout": 10, "max_attempts": 4},
+    "model": {"connect_timeout": 3, "read_timeout": 60, "max_attempts": 3},
+    "stream": {"connect_timeout": 3, "read_timeout": 120, "max_attempts": 2},
+}
+
+
+class ClientStats:
+    """Thread-safe call, error, retry and latency counters for one client."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, elapsed_ms, retries, error):
+        with self._lock:
+            self.calls += 1
+            self.errors += bool(error)
+            self.retries += retries
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "retries": self.retries,
+                "avg_ms": round(self.total_ms / self.calls, 1) if self.calls else 0.0,
+                "max_ms": round(self.max_ms, 1),
+            }
+
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def client_config(call_type="storage", max_pool_connections=None):
+    """botocore Config for a call type."""
+    from botocore.config import Config
+    settings = CALL_TYPES[call_type]
+    return Config(
+        max_pool_connections=max_pool_connections or MAX_POOL_CONNECTIONS,
+        connect_timeout=settings["connect_timeout"],
+        read_timeout=settings["read_timeout"],
+        # max_attempts counts the first attempt (botocore's "max_attempts" doesn't)
+        retries={"mode": "adaptive", "total_max_attempts": settings["max_attempts"]},
+        tcp_keepalive=True,
+    )
+
+
+def _retry_attempts(response):
+    return (response or {}).get("ResponseMetadata", {}).get("RetryAttempts", 0)
+
+
+def instrument(client, stats):
+    """Record every call of client in stats."""
+    def before_call(context, **kwargs):
+        context["_started_at"] = time.perf_counter()
+
+    def after_call(http_response, parsed, context, **kwargs):
+        elapsed = (time.perf_counter() - context.get("_started_at", time.perf_counter())) * 1000
+        stats.record(elapsed, _retry_attempts(parsed), http_response.status_code >= 300)
+
+    def after_call_error(exception, context, **kwargs):
+        elapsed = (time.perf_counter() - context.get("_started_at", time.perf_counter())) * 1000
+        stats.record(elapsed, _retry_attempts(getattr(exception, "response", None)), True)
+
+    client.meta.events.register("before-call", before_call)
+    client.meta.events.register("after-call", after_call)
+    client.meta.events.register("after-call-error", after_call_error)
+    return client
+
+
+def create_client(service_name, call_type="storage", region_name=None, max_pool_connections=None, **kwargs):
+    """Create an instrumented boto3 client tuned for call_type (see CALL_TYPES)."""
+    import boto3
+    client = boto3.client(
+        service_name, region_name=region_name,
+        config=client_config(call_type, max_pool_connections), **kwargs
+    )
+    with _stats_lock:
+        stats = _stats.setdefault(service_name, ClientStats())
+    return instrument(client, stats)
+
+
+def client_stats():
+    """{service name: counters} for every client created so far."""
+    with _stats_lock:
+        items = list(_stats.items())
+    return {name: stats.snapshot() for name, stats in items}
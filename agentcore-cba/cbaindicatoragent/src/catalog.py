@@ -0,0 +1,417 @@
+"""Structured CBA indicator/method catalog with exact attribute filtering.
+
+The CBA M&E indicator list (224 indicators, 801 methods) is ingested from
+the source spreadsheet into a compact JSON file shipped with the agent
+(data/indicator_catalog.json). At runtime it is loaded into column arrays
+with inverted indexes, so attribute queries like "low cost, high accuracy
+soil methods" are answered in-process without a Knowledge Base round trip.
+
+Rebuild the data file after the spreadsheet changes:
+
+    python src/catalog.py "../../cba_inputs/CBA ME Indicators List.xlsx"
+"""
+import json
+import os
+import posixpath
+import re
+import sys
+import zipfile
+from array import array
+from pathlib import Path
+from xml.etree import ElementTree
+
+from strands import tool
+
+CATALOG_PATH = os.getenv(
+    "CBA_CATALOG_PATH",
+    str(Path(__file__).parent / "data" / "indicator_catalog.json")
+)
+
+LEVELS = ("Low", "Medium-Low", "Medium", "Medium-High", "High")
+# Criterion cells: x = relevant, P = primary, S = secondary
+_COVERED_MARKS = {"x", "P", "S"}
+
+_NS = {
+    "m": "http://schemas.openxmlformats.org/spreadsheetml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+
+
+# --- Ingestion ---------------------------------------------------------------
+
+def _read_xlsx_sheets(path):
+    """Read every worksheet of an .xlsx file as lists of cell values (stdlib only)."""
+    with zipfile.ZipFile(path) as xlsx:
+        shared = []
+        if "xl/sharedStrings.xml" in xlsx.namelist():
+            root = ElementTree.fromstring(xlsx.read("xl/sharedStrings.xml"))
+            for si in root.findall("m:si", _NS):
+                shared.append("".join(t.text or "" for t in si.iter(f"{{{_NS['m']}}}t")))
+
+        rels = ElementTree.fromstring(xlsx.read("xl/_rels/workbook.xml.rels"))
+        targets = {rel.get("Id"): rel.get("Target") for rel in rels.findall("rel:Relationship", _NS)}
+        workbook = ElementTree.fromstring(xlsx.read("xl/workbook.xml"))
+
+        sheets = {}
+        for sheet in workbook.find("m:sheets", _NS):
+            target = targets[sheet.get(f"{{{_NS['r']}}}id")]
+            member = target.lstrip("/") if target.startswith("/") else posixpath.join("xl", target)
+            sheets[sheet.get("name")] = _read_sheet(xlsx.read(member), shared)
+        return sheets
+
+
+def _column_index(cell_ref):
+    index = 0
+    for char in cell_ref:
+        if not char.isalpha():
+            break
+        index = index * 26 + ord(char.upper()) - 64
+    return index - 1
+
+
+def _read_sheet(xml_bytes, shared):
+    rows = []
+    for row in ElementTree.fromstring(xml_bytes).iter(f"{{{_NS['m']}}}row"):
+        values = []
+        for cell in row.findall("m:c", _NS):
+            col = _column_index(cell.get("r"))
+            cell_type = cell.get("t")
+            if cell_type == "inlineStr":
+                value = "".join(t.text or "" for t in cell.iter(f"{{{_NS['m']}}}t"))
+            else:
+                v = cell.find("m:v", _NS)
+                value = v.text if v is not None else None
+                if value is not None and cell_type == "s":
+                    value = shared[int(value)]
+            values.extend([None] * (col + 1 - len(values)))
+            values[col] = value
+        rows.append(values)
+    return rows
+
+
+def _cell(row, index):
+    value = row[index] if index < len(row) else None
+    if value is None:
+        return ""
+    return str(value).strip()
+
+
+def normalize_level(value):
+    """Map spreadsheet ratings ("High*", "Low* ", "Medium-High") onto LEVELS."""
+    value = value.replace("*", "").strip().lower()
+    for level in LEVELS:
+        if value == level.lower():
+            return level
+    return ""
+
+
+def _coverage_columns(header):
+    """
+    ([(column, principle)], [(column, criterion)]) for the principle and
+    criterion columns of the Indicators sheet's header row.
+    """
+    principles, criteria = [], []
+    for col, title in enumerate(header):
+        title = (title or "").strip()
+        if title.startswith("Principle:"):
+            principles.append((col, title.split(":", 1)[1].strip()))
+        elif re.match(r"\d+\.\d+", title):
+            criteria.append((col, title))
+    return principles, criteria
+
+
+def build_catalog(xlsx_path):
+    """Convert the CBA indicator spreadsheet into the compact catalog dict."""
+    sheets = _read_xlsx_sheets(xlsx_path)
+    indicator_rows = sheets["Indicators"]
+    principle_titles, criterion_titles = _coverage_columns(indicator_rows[0])
+    principles = [title for _, title in principle_titles]
+    criteria = [title for _, title in criterion_titles]
+    principle_columns = [col for col, _ in principle_titles]
+    criterion_columns = [col for col, _ in criterion_titles]
+
+    indicators = []
+    for row in indicator_rows[1:]:
+        if not _cell(row, 0):
+            continue
+        indicators.append([
+            int(float(_cell(row, 0))),
+            _cell(row, 3),                      # name
+            _cell(row, 4),                      # unit
+            _cell(row, 1),                      # component
+            _cell(row, 2),                      # class
+            [i for i, col in enumerate(principle_columns) if _cell(row, col) in _COVERED_MARKS],
+            [i for i, col in enumerate(criterion_columns) if _cell(row, col) in _COVERED_MARKS],
+        ])
+
+    methods = []
+    for row in sheets["Methods"][1:]:
+        if not _cell(row, 0):
+            continue
+        methods.append([
+            int(float(_cell(row, 0))),          # indicator id
+            _cell(row, 3),                      # general method
+            _cell(row, 4),                      # specific method
+            normalize_level(_cell(row, 5)),     # accuracy
+            normalize_level(_cell(row, 8)),     # ease of use
+            normalize_level(_cell(row, 11)),    # financial cost
+        ])
+
+    return {
+        "principles": principles,
+        "criteria": criteria,
+        "indicator_fields": ["id", "name", "unit", "component", "class", "principles", "criteria"],
+        "indicators": indicators,
+        "method_fields": ["indicator_id", "general", "specific", "accuracy", "ease", "cost"],
+        "methods": methods,
+    }
+
+
+# --- Runtime catalog ------------------------------------------------------------
+
+class _Column:
+    """Dictionary-encoded categorical column: an array of small int codes."""
+
+    __slots__ = ("labels", "codes", "index")
+
+    def __init__(self, values):
+        self.labels = []
+        lookup = {}
+        self.codes = array("H")
+        self.index = {}
+        for row, value in enumerate(values):
+            code = lookup.get(value)
+            if code is None:
+                code = lookup[value] = len(self.labels)
+                self.labels.append(value)
+            self.codes.append(code)
+            self.index.setdefault(code, []).append(row)
+        self.index = {code: frozenset(rows) for code, rows in self.index.items()}
+
+    def label(self, row):
+        return self.labels[self.codes[row]]
+
+    def rows(self, query):
+        """Rows whose value matches any comma-separated term in query."""
+        return _union(self.index[code] for code in _match_labels(self.labels, query))
+
+
+def _match_labels(labels, query):
+    """Codes of labels matched by a query: exact, numbered prefix or substring."""
+    codes = set()
+    for term in (t.strip().lower() for t in query.split(",")):
+        if not term:
+            continue
+        exact = [code for code, label in enumerate(labels) if label.lower() == term]
+        if exact:
+            codes.update(exact)
+            continue
+        for code, label in enumerate(labels):
+            lowered = label.lower()
+            if lowered.startswith(term + " ") or lowered.startswith(term + ".") or (len(term) > 2 and term in lowered):
+                codes.add(code)
+    return codes
+
+
+def _union(sets):
+    result = set()
+    for rows in sets:
+        result |= rows
+    return result
+
+
+class IndicatorCatalog:
+    """Array-backed indicator/method catalog with inverted indexes."""
+
+    def __init__(self, data):
+        indicators = data["indicators"]
+        methods = data["methods"]
+        self.principles = data["principles"]
+        self.criteria = data["criteria"]
+
+        self.ids = array("H", (row[0] for row in indicators))
+        self.names = [row[1] for row in indicators]
+        self.units = [row[2] for row in indicators]
+        self.component = _Column(row[3] for row in indicators)
+        self.indicator_class = _Column(row[4] for row in indicators)
+        self.indicator_principles = [row[5] for row in indicators]
+        self.indicator_criteria = [row[6] for row in indicators]
+        self.principle_index = self._multi_index(self.indicator_principles)
+        self.criterion_index = self._multi_index(self.indicator_criteria)
+        self.row_by_id = {indicator_id: row for row, indicator_id in enumerate(self.ids)}
+
+        self.method_indicator = array("H", (self.row_by_id[row[0]] for row in methods))
+        self.method_general = [row[1] for row in methods]
+        self.method_specific = [row[2] for row in methods]
+        self.accuracy = _Column(row[3] for row in methods)
+        self.ease = _Column(row[4] for row in methods)
+        self.cost = _Column(row[5] for row in methods)
+        self.methods_by_indicator = {}
+        for method_row, indicator_row in enumerate(self.method_indicator):
+            self.methods_by_indicator.setdefault(indicator_row, []).append(method_row)
+
+        self.all_indicators = frozenset(range(len(self.ids)))
+        self.all_methods = frozenset(range(len(self.method_indicator)))
+
+    @staticmethod
+    def _multi_index(values):
+        index = {}
+        for row, codes in enumerate(values):
+            for code in codes:
+                index.setdefault(code, set()).add(row)
+        return {code: frozenset(rows) for code, rows in index.items()}
+
+    @classmethod
+    def load(cls, path=CATALOG_PATH):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def _label_rows(self, labels, index, query):
+        return _union(index.get(code, frozenset()) for code in _match_labels(labels, query))
+
+    def filter(self, component="", indicator_class="", principle="", criterion="",
+               cost="", accuracy="", ease="", limit=10):
+        """
+        Return indicators matching every given attribute, each with the
+        methods that satisfy the method-level filters (cost/accuracy/ease).
+        Each filter accepts comma-separated alternatives, e.g. cost="Low,Medium-Low".
+        """
+        rows = self.all_indicators
+        if component:
+            rows = rows & self.component.rows(component)
+        if indicator_class:
+            rows = rows & self.indicator_class.rows(indicator_class)
+        if principle:
+            rows = rows & self._label_rows(self.principles, self.principle_index, principle)
+        if criterion:
+            rows = rows & self._label_rows(self.criteria, self.criterion_index, criterion)
+
+        method_rows = None
+        for column, query in ((self.cost, cost), (self.accuracy, accuracy), (self.ease, ease)):
+            if query:
+                matched = column.rows(query)
+                method_rows = matched if method_rows is None else method_rows & matched
+        if method_rows is not None:
+            rows = rows & {self.method_indicator[m] for m in method_rows}
+
+        results = []
+        for row in sorted(rows, key=lambda r: self.ids[r])[:limit]:
+            methods = self.methods_by_indicator.get(row, [])
+            if method_rows is not None:
+                methods = [m for m in methods if m in method_rows]
+            results.append(self._indicator(row, methods))
+        return results, len(rows)
+
+    def get(self, indicator_id):
+        """One indicator with all its methods, principles and criteria, or None."""
+        row = self.row_by_id.get(indicator_id)
+        if row is None:
+            return None
+        indicator = self._indicator(row, self.methods_by_indicator.get(row, []))
+        indicator["principles"] = [self.principles[code] for code in self.indicator_principles[row]]
+        indicator["criteria"] = [self.criteria[code] for code in self.indicator_criteria[row]]
+        return indicator
+
+    def _indicator(self, row, methods):
+        return {
+            "id": self.ids[row],
+            "name": self.names[row],
+            "unit": self.units[row],
+            "component": self.component.label(row),
+            "class": self.indicator_class.label(row),
+            "methods": [{
+                "general": self.method_general[m],
+                "specific": self.method_specific[m],
+                "cost": self.cost.label(m),
+                "accuracy": self.accuracy.label(m),
+                "ease": self.ease.label(m),
+            } for m in methods],
+        }
+
+
+_catalog = None
+
+
+def get_catalog() -> IndicatorCatalog:
+    """Load the catalog once per process."""
+    global _catalog
+    if _catalog is None:
+        _catalog = IndicatorCatalog.load()
+    return _catalog
+
+
+@tool
+def filter_cba_indicators(
+    component: str = "",
+    indicator_class: str = "",
+    principle: str = "",
+    criterion: str = "",
+    cost: str = "",
+    accuracy: str = "",
+    ease: str = "",
+    max_results: int = 10
+) -> str:
+    """
+    Filter the CBA indicator catalog by exact attributes. Faster and more precise than
+    searching the knowledge base when the question is about structured attributes.
+
+    Args:
+        component: Indicator component: Biotic, Abiotic or Socio-economic
+        indicator_class: Indicator class, e.g. "Soil quality", "Financial well-being"
+        principle: CBA principle number or name, e.g. "1" or "Natural Environment"
+        criterion: CBA criterion number or name, e.g. "1.2" or "GHG emissions"
+        cost: Method financial cost: Low, Medium-Low, Medium, Medium-High, High (comma-separated for several)
+        accuracy: Method accuracy, same levels as cost
+        ease: Method ease of use, same levels as cost
+        max_results: Maximum number of indicators to return (default: 10)
+
+    Returns:
+        Matching indicators with their qualifying methods
+    """
+    try:
+        results, total = get_catalog().filter(
+            component=component,
+            indicator_class=indicator_class,
+            principle=principle,
+            criterion=criterion,
+            cost=cost,
+            accuracy=accuracy,
+            ease=ease,
+            limit=max_results
+        )
+    except Exception as e:
+        return f"Error filtering indicator catalog: {str(e)}"
+
+    if not results:
+        return "No indicators match these filters."
+
+    lines = [f"{total} indicators match; showing {len(results)}."]
+    for indicator in results:
+        lines.append(
+            f"\nIndicator {indicator['id']}: {indicator['name']} "
+            f"({indicator['component']} / {indicator['class']}; unit: {indicator['unit'] or 'n/a'})"
+        )
+        for method in indicator["methods"]:
+            name = " - ".join(part for part in (method["general"], method["specific"]) if part)
+            lines.append(
+                f"  - {name} | Cost: {method['cost'] or 'n/a'} | "
+                f"Accuracy: {method['accuracy'] or 'n/a'} | Ease: {method['ease'] or 'n/a'}"
+            )
+    return "\n".join(lines)
+
+
+def main(argv):
+    if len(argv) < 2:
+        print(f"Usage: python {argv[0]} <indicators.xlsx> [output.json]")
+        return 1
+    output = argv[2] if len(argv) > 2 else CATALOG_PATH
+    catalog = build_catalog(argv[1])
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(catalog, f, ensure_ascii=False, separators=(",", ":"))
+    print(f"Wrote {len(catalog['indicators'])} indicators and {len(catalog['methods'])} methods to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -1,17 +1,302 @@
 """Knowledge Base retrieval tool for CBA Indicator Selection"""
+import contextvars
+import json
+import logging
 import os
-import boto3
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from strands import tool
 
+from aws_clients import client_stats, create_client
+from usage import record_kb
+
+logger = logging.getLogger(__name__)
+
 KNOWLEDGE_BASE_ID = os.getenv("KNOWLEDGE_BASE_ID", "0ZQBMXEKDI")
 REGION = os.getenv("AWS_REGION", "us-west-2")
 
-# Initialize bedrock-agent-runtime client
-bedrock_agent_runtime = boto3.client(
-    'bedrock-agent-runtime',
-    region_name=REGION
+# Local hybrid retrieval engine (see retrieval.py):
+#   off      - Bedrock Knowledge Base only (default)
+#   primary  - local engine only, no network call
+#   fallback - Bedrock first, local engine when the KB call fails
+#   shadow   - Bedrock results are returned; the local engine runs alongside
+#              and its overlap with Bedrock is logged for comparison
+LOCAL_RETRIEVAL_MODE = os.getenv("KB_LOCAL_RETRIEVAL_MODE", "off").lower()
+
+# Cross-session retrieval cache (KB_CACHE_TTL_SECONDS=0 disables it).
+# KB_CACHE_PATH enables a persistent SQLite tier that survives restarts.
+KB_CACHE_TTL_SECONDS = float(os.getenv("KB_CACHE_TTL_SECONDS", "3600"))
+KB_CACHE_MAX_ENTRIES = int(os.getenv("KB_CACHE_MAX_ENTRIES", "512"))
+KB_CACHE_PATH = os.getenv("KB_CACHE_PATH")
+
+# Initialize bedrock-agent-runtime client: pooled for concurrent facet
+# searches, with short timeouts and adaptive retries (see aws_clients.py)
+bedrock_agent_runtime = create_client('bedrock-agent-runtime', 'search', region_name=REGION)
+
+
+class RetrievalCache:
+    """
+    LRU + TTL cache for Knowledge Base retrievals, shared by all sessions in
+    the process, with an optional persistent SQLite tier.
+
+    Keys are (knowledge base id, normalized query text, numberOfResults).
+    Each entry remembers how long the original retrieve call took, so hits
+    can report the latency they saved. Expired SQLite rows are deleted when
+    read and swept every purge_every writes, so the file stays bounded by
+    the TTL. SQLite I/O runs under its own lock, so memory hits never wait
+    on disk.
+    """
+
+    def __init__(self, ttl_seconds=3600, max_entries=512, path=None, clock=time.time, purge_every=100):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.clock = clock
+        self.purge_every = purge_every
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._db_lock = threading.Lock()
+        self._writes = 0
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS kb_cache "
+                "(cache_key TEXT PRIMARY KEY, results TEXT NOT NULL, latency_ms REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.purged = 0
+        self.latency_saved_ms = 0.0
+
+    @staticmethod
+    def make_key(query: str, max_results: int, knowledge_base_id: str) -> str:
+        normalized = " ".join(query.lower().split())
+        return f"{knowledge_base_id}|{max_results}|{normalized}"
+
+    def get(self, key):
+        """Return cached results for key, or None on a miss."""
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] <= now:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is not None:
+                return self._hit(key, entry)
+        entry = self._db_get(key, now) if self._db is not None else None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self._insert(key, entry)
+            self.persistent_hits += 1
+            return self._hit(key, entry)
+
+    def _hit(self, key, entry):
+        self._entries.move_to_end(key)
+        self.hits += 1
+        self.latency_saved_ms += entry[1]
+        return entry[0]
+
+    def _db_get(self, key, now):
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT results, latency_ms, expires_at FROM kb_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[2] <= now:
+                self._db.execute("DELETE FROM kb_cache WHERE cache_key = ?", (key,))
+                return None
+        return (json.loads(row[0]), row[1], row[2])
+
+    def put(self, key, results, latency_ms):
+        now = self.clock()
+        entry = (results, latency_ms, now + self.ttl_seconds)
+        with self._lock:
+            self._insert(key, entry)
+        if self._db is None:
+            return
+        payload = json.dumps(results, default=str)
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO kb_cache (cache_key, results, latency_ms, expires_at) VALUES (?, ?, ?, ?)",
+                (key, payload, latency_ms, entry[2])
+            )
+            self._writes += 1
+            if self._writes % self.purge_every == 0:
+                self.purged += self._db.execute("DELETE FROM kb_cache WHERE expires_at <= ?", (now,)).rowcount
+
+    def _insert(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM kb_cache")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "purged": self.purged,
+            "latency_saved_ms": round(self.latency_saved_ms, 1),
+        }
+
+
+retrieval_cache = (
+    RetrievalCache(KB_CACHE_TTL_SECONDS, KB_CACHE_MAX_ENTRIES, KB_CACHE_PATH)
+    if KB_CACHE_TTL_SECONDS > 0 else None
 )
 
+
+def get_cache_stats() -> dict:
+    """Hit/miss/latency-saved statistics for the retrieval cache."""
+    return retrieval_cache.stats() if retrieval_cache is not None else {}
+
+
+def get_client_stats() -> dict:
+    """Call, error, retry and latency counters for the Knowledge Base client."""
+    return client_stats().get('bedrock-agent-runtime', {})
+
+
+_local_retriever = None
+_local_retriever_lock = threading.Lock()
+
+
+def get_local_retriever():
+    """Load the local retrieval index once per process."""
+    global _local_retriever
+    if _local_retriever is None:
+        with _local_retriever_lock:
+            if _local_retriever is None:
+                from retrieval import INDEX_PATH, HybridRetriever
+                try:
+                    _local_retriever = HybridRetriever.load()
+                except FileNotFoundError as e:
+                    raise RuntimeError(
+                        f"KB_LOCAL_RETRIEVAL_MODE={LOCAL_RETRIEVAL_MODE} needs the local retrieval index at "
+                        f"{INDEX_PATH}; build it with: python src/retrieval.py build ../../cba_inputs"
+                    ) from e
+    return _local_retriever
+
+
+if LOCAL_RETRIEVAL_MODE in ("primary", "fallback"):
+    # Load the index at startup, so a missing file stops the container
+    # instead of failing every search
+    get_local_retriever()
+
+
+def _bedrock_retrieve(query: str, max_results: int) -> list:
+    """
+    Knowledge Base retrieve, served from the retrieval cache when possible.
+    Latency is recorded in the active invocation's usage (see usage.py).
+    """
+    start = time.perf_counter()
+    if retrieval_cache is None:
+        key = results = None
+    else:
+        key = RetrievalCache.make_key(query, max_results, KNOWLEDGE_BASE_ID)
+        results = retrieval_cache.get(key)
+    if results is not None:
+        record_kb((time.perf_counter() - start) * 1000, cached=True)
+        return results
+    try:
+        results = _bedrock_retrieve_uncached(query, max_results)
+    except Exception:
+        record_kb((time.perf_counter() - start) * 1000, error=True)
+        raise
+    latency_ms = (time.perf_counter() - start) * 1000
+    record_kb(latency_ms)
+    if key is not None:
+        retrieval_cache.put(key, results, latency_ms)
+    return results
+
+
+def _bedrock_retrieve_uncached(query: str, max_results: int) -> list:
+    response = bedrock_agent_runtime.retrieve(
+        knowledgeBaseId=KNOWLEDGE_BASE_ID,
+        retrievalQuery={
+            'text': query
+        },
+        retrievalConfiguration={
+            'vectorSearchConfiguration': {
+                'numberOfResults': max_results
+            }
+        }
+    )
+    return response.get('retrievalResults', [])
+
+
+def _shadow_compare(query: str, max_results: int, kb_results: list):
+    """Run the local engine on the same query and log its overlap with the KB."""
+    try:
+        start = time.perf_counter()
+        local_results = get_local_retriever().search(query, max_results)
+        local_ms = (time.perf_counter() - start) * 1000
+        kb_texts = {r.get('content', {}).get('text', '') for r in kb_results}
+        overlap = sum(1 for r in local_results if r['content']['text'] in kb_texts)
+        logger.info(
+            "kb_shadow query=%r kb_results=%d local_results=%d overlap=%d local_ms=%.2f",
+            query, len(kb_results), len(local_results), overlap, local_ms
+        )
+    except Exception as e:
+        logger.warning(f"Local retrieval shadow run failed: {e}")
+
+
+def retrieve(query: str, max_results: int = 10) -> list:
+    """
+    Retrieve results for a query according to KB_LOCAL_RETRIEVAL_MODE.
+    Results use the Bedrock `retrievalResults` shape in every mode.
+    """
+    if LOCAL_RETRIEVAL_MODE == "primary":
+        return get_local_retriever().search(query, max_results)
+    if LOCAL_RETRIEVAL_MODE == "fallback":
+        try:
+            return _bedrock_retrieve(query, max_results)
+        except Exception as e:
+            logger.warning(f"Knowledge Base retrieve failed, using local index: {e}")
+            return get_local_retriever().search(query, max_results)
+
+    results = _bedrock_retrieve(query, max_results)
+    if LOCAL_RETRIEVAL_MODE == "shadow":
+        threading.Thread(target=_shadow_compare, args=(query, max_results, results), daemon=True).start()
+    return results
+
+
+def outcome_query(outcome: str) -> str:
+    return f"indicators that measure {outcome} in circular bioeconomy projects"
+
+
+def budget_query(budget_range: str, commodity: str = "") -> str:
+    commodity_filter = f"for {commodity} " if commodity else ""
+    return f"measurement methods {commodity_filter}with {budget_range} budget cost-effective affordable"
+
+
+def location_query(location: str, commodity: str = "") -> str:
+    commodity_filter = f"{commodity} " if commodity else ""
+    return f"{commodity_filter}indicators and methods for {location} region location-specific considerations"
+
+
 @tool
 def search_cba_indicators(query: str, max_results: int = 10) -> str:
     """
@@ -25,21 +310,9 @@ def search_cba_indicators(query: str, max_results: int = 10) -> str:
         Formatted string with relevant indicators and methods from the knowledge base
     """
     try:
-        response = bedrock_agent_runtime.retrieve(
-            knowledgeBaseId=KNOWLEDGE_BASE_ID,
-            retrievalQuery={
-                'text': query
-            },
-            retrievalConfiguration={
-                'vectorSearchConfiguration': {
-                    'numberOfResults': max_results
-                }
-            }
-        )
-        
         # Format the results
         results = []
-        for idx, result in enumerate(response.get('retrievalResults', []), 1):
+        for idx, result in enumerate(retrieve(query, max_results), 1):
             content = result.get('content', {}).get('text', '')
             score = result.get('score', 0)
             
@@ -74,8 +347,7 @@ def search_indicators_by_outcome(outcome: str) -> str:
     Returns:
         Indicators that measure progress toward this outcome
     """
-    query = f"indicators that measure {outcome} in circular bioeconomy projects"
-    return search_cba_indicators(query, max_results=5)
+    return search_cba_indicators(outcome_query(outcome), max_results=5)
 
 
 @tool
@@ -90,9 +362,7 @@ def search_methods_by_budget(budget_range: str, commodity: str = "") -> str:
     Returns:
         Methods that fit within the specified budget
     """
-    commodity_filter = f"for {commodity} " if commodity else ""
-    query = f"measurement methods {commodity_filter}with {budget_range} budget cost-effective affordable"
-    return search_cba_indicators(query, max_results=5)
+    return search_cba_indicators(budget_query(budget_range, commodity), max_results=5)
 
 
 @tool
@@ -107,6 +377,116 @@ def search_location_specific_indicators(location: str, commodity: str = "") -> s
     Returns:
         Location-specific indicators and implementation considerations
     """
-    commodity_filter = f"{commodity} " if commodity else ""
-    query = f"{commodity_filter}indicators and methods for {location} region location-specific considerations"
-    return search_cba_indicators(query, max_results=5)
+    return search_cba_indicators(location_query(location, commodity), max_results=5)
+
+
+# Shared pool for concurrent facet searches; boto3 clients are thread-safe
+FACET_SEARCH_WORKERS = int(os.getenv("KB_FACET_SEARCH_WORKERS", "8"))
+_facet_executor = ThreadPoolExecutor(max_workers=FACET_SEARCH_WORKERS, thread_name_prefix="kb-facet")
+# Reciprocal rank fusion constant
+RRF_K = 60
+
+
+def _result_key(result: dict) -> tuple:
+    """Identify a KB chunk across facet result lists."""
+    metadata = result.get('metadata', {}) or {}
+    chunk_id = metadata.get('x-amz-bedrock-kb-chunk-id')
+    if chunk_id:
+        return ('chunk', chunk_id)
+    return (metadata.get('source', ''), result.get('content', {}).get('text', ''))
+
+
+def profile_facet_queries(location: str = "", commodity: str = "", budget_range: str = "",
+                          outcomes: str = "", max_outcomes: int = 3) -> dict:
+    """Build the facet queries the single-purpose search tools would issue."""
+    queries = {}
+    for outcome in [o.strip() for o in outcomes.split(",") if o.strip()][:max_outcomes]:
+        queries[f"outcome: {outcome}"] = outcome_query(outcome)
+    if budget_range:
+        queries["budget"] = budget_query(budget_range, commodity)
+    if location:
+        queries["location"] = location_query(location, commodity)
+    general = " ".join(part for part in (commodity, location, outcomes) if part)
+    if general:
+        queries["general"] = f"{general} monitoring and evaluation indicators"
+    return queries
+
+
+def fused_facet_search(queries: dict, results_per_facet: int = 5, max_results: int = 10) -> tuple:
+    """
+    Run all facet queries concurrently, then merge and deduplicate by chunk
+    using reciprocal rank fusion. Returns (fused results, facet errors).
+    Each fused result is (result, fused score, matched facet names).
+    """
+    # Each search runs in a copy of the caller's context so its KB latency is
+    # recorded in the invocation that asked for it
+    futures = {
+        facet: _facet_executor.submit(contextvars.copy_context().run, retrieve, query, results_per_facet)
+        for facet, query in queries.items()
+    }
+    fused = {}
+    errors = {}
+    for facet, future in futures.items():
+        try:
+            facet_results = future.result()
+        except Exception as e:
+            errors[facet] = str(e)
+            continue
+        for rank, result in enumerate(facet_results, 1):
+            key = _result_key(result)
+            entry = fused.get(key)
+            if entry is None:
+                entry = fused[key] = [result, 0.0, []]
+            entry[1] += 1.0 / (RRF_K + rank)
+            entry[2].append(facet)
+    ranked = sorted(fused.values(), key=lambda entry: entry[1], reverse=True)
+    return [tuple(entry) for entry in ranked[:max_results]], errors
+
+
+@tool
+def search_project_profile(
+    location: str = "",
+    commodity: str = "",
+    budget_range: str = "",
+    outcomes: str = "",
+    max_results: int = 10
+) -> str:
+    """
+    Search the knowledge base for a whole project profile in one call. Runs the outcome,
+    budget, location and general searches concurrently and returns one merged,
+    deduplicated, rank-ordered result list. Prefer this over calling the individual
+    search tools one after another once the profile is known.
+
+    Args:
+        location: Project location/region
+        commodity: Primary commodity/product
+        budget_range: Budget range (e.g., "low", "$10k-50k")
+        outcomes: Desired outcomes, comma-separated (e.g., "soil health, farmer income")
+        max_results: Maximum number of merged results to return (default: 10)
+
+    Returns:
+        Fused results with the facets each result matched
+    """
+    queries = profile_facet_queries(location, commodity, budget_range, outcomes)
+    if not queries:
+        return "Provide at least one of location, commodity, budget_range or outcomes."
+
+    results, errors = fused_facet_search(queries, max_results=max_results)
+    if not results:
+        if errors:
+            return f"Error searching knowledge base: {'; '.join(errors.values())}"
+        return "No relevant indicators or methods found for this project profile."
+
+    output = []
+    for idx, (result, score, facets) in enumerate(results, 1):
+        content = result.get('content', {}).get('text', '')
+        source = (result.get('metadata', {}) or {}).get('source', 'Unknown')
+        output.append(f"""
+Result {idx} (Fused score: {score:.4f}; matched: {', '.join(facets)}):
+Source: {source}
+Content: {content}
+---
+""")
+    if errors:
+        output.append(f"Note: some facet searches failed ({', '.join(errors)}).")
+    return "\n".join(output)
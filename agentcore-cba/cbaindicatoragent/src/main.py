@@ -1,5 +1,8 @@
+import asyncio
+import json
 import os
 import sys
+import time
 from pathlib import Path
 
 # Add src directory to path for imports
@@ -14,12 +17,15 @@ from bedrock_agentcore.memory.integrations.strands.session_manager import AgentC
 
 # Import MCP client
 try:
-    from mcp_client.client import get_streamable_http_mcp_client
+    from mcp_client.client import get_mcp_connection
 except ImportError:
-    from contextlib import nullcontext
-    from types import SimpleNamespace
-    def get_streamable_http_mcp_client():
-        return nullcontext(SimpleNamespace(list_tools_sync=lambda: []))
+    def get_mcp_connection():
+        return None
+
+from sessions import SessionCache
+from recommendations import RecommendationRecorder, create_recommendation_tool
+from usage import Usage, tool_snapshot
+from profiles import ProfileStore, ProjectProfile, SQLiteProfileBackend
 
 # Import model loader
 try:
@@ -35,7 +41,8 @@ try:
         search_cba_indicators,
         search_indicators_by_outcome,
         search_methods_by_budget,
-        search_location_specific_indicators
+        search_location_specific_indicators,
+        search_project_profile
     )
 except ImportError:
     # Define stub tools if import fails
@@ -51,70 +58,96 @@ except ImportError:
     @tool
     def search_location_specific_indicators(location: str, commodity: str = "") -> str:
         return "KB tool not available"
+    @tool
+    def search_project_profile(location: str = "", commodity: str = "", budget_range: str = "",
+                               outcomes: str = "", max_results: int = 10) -> str:
+        return "KB tool not available"
+
+# Import structured catalog tool
+try:
+    from catalog import filter_cba_indicators
+except ImportError:
+    @tool
+    def filter_cba_indicators(component: str = "", indicator_class: str = "", principle: str = "",
+                              criterion: str = "", cost: str = "", accuracy: str = "", ease: str = "",
+                              max_results: int = 10) -> str:
+        return "Indicator catalog not available"
 
 MEMORY_ID = os.getenv("BEDROCK_AGENTCORE_MEMORY_ID")
 REGION = os.getenv("AWS_REGION", "us-west-2")
 KNOWLEDGE_BASE_ID = os.getenv("KNOWLEDGE_BASE_ID", "0ZQBMXEKDI")
 
-# Skip MCP client for now (no Gateway configured)
-from contextlib import nullcontext
-from types import SimpleNamespace
-strands_mcp_client = nullcontext(SimpleNamespace(list_tools_sync=lambda: []))
+# Gateway tools come from one persistent MCP connection per process.
+# Without a Gateway configured the agent runs with the built-in tools only.
+mcp_connection = get_mcp_connection() if os.getenv("GATEWAY_URL") else None
+
+def get_mcp_tools() -> list:
+    """Gateway tools for a new agent, from the connection's cached tool list."""
+    if mcp_connection is None:
+        return []
+    return mcp_connection.list_tools()
+
+# Session-scoped project profiles - prevents concurrent request conflicts.
+# Bounded by size and idle time; persisted write-behind when PROFILE_DB_PATH is set.
+PROFILE_STORE_MAX_SESSIONS = int(os.getenv("PROFILE_STORE_MAX_SESSIONS", "1024"))
+PROFILE_STORE_IDLE_SECONDS = float(os.getenv("PROFILE_STORE_IDLE_SECONDS", "3600"))
+PROFILE_DB_PATH = os.getenv("PROFILE_DB_PATH")
+PROFILE_FLUSH_INTERVAL_SECONDS = float(os.getenv("PROFILE_FLUSH_INTERVAL_SECONDS", "1.0"))
 
-# Session-scoped project profiles - prevents concurrent request conflicts
-# Key: session_id, Value: profile dict
-session_profiles = {}
+profile_store = ProfileStore(
+    max_sessions=PROFILE_STORE_MAX_SESSIONS,
+    idle_seconds=PROFILE_STORE_IDLE_SECONDS,
+    backend=SQLiteProfileBackend(PROFILE_DB_PATH) if PROFILE_DB_PATH else None,
+    flush_interval=PROFILE_FLUSH_INTERVAL_SECONDS
+)
 
-def get_session_profile(session_id: str) -> dict:
+def get_session_profile(session_id: str) -> ProjectProfile:
     """Get or create profile for a session."""
-    if session_id not in session_profiles:
-        session_profiles[session_id] = {
-            "location": None,
-            "commodity": None,
-            "budget": None,
-            "outcomes": None,
-            "capacity": None
-        }
-    return session_profiles[session_id]
+    return profile_store.get(session_id)
 
 def create_profile_tools(session_id: str):
     """Create session-scoped profile tools with captured session_id."""
-    profile = get_session_profile(session_id)
-    
+
+    def update_profile(field: str, value: str):
+        # Look the profile up on every call: the agent outlives profile eviction
+        profile = get_session_profile(session_id)
+        setattr(profile, field, value)
+        profile_store.mark_dirty(session_id, profile)
+
     @tool
     def set_project_location(location: str) -> str:
         """Set the project location/region"""
-        profile["location"] = location
+        update_profile("location", location)
         return f"Location set to: {location}"
 
     @tool
     def set_project_commodity(commodity: str) -> str:
         """Set the primary commodity/product"""
-        profile["commodity"] = commodity
+        update_profile("commodity", commodity)
         return f"Commodity set to: {commodity}"
 
     @tool
     def set_project_budget(budget: str) -> str:
         """Set the project budget range"""
-        profile["budget"] = budget
+        update_profile("budget", budget)
         return f"Budget set to: {budget}"
 
     @tool
     def set_project_outcomes(outcomes: str) -> str:
         """Set the desired project outcomes"""
-        profile["outcomes"] = outcomes
+        update_profile("outcomes", outcomes)
         return f"Outcomes set to: {outcomes}"
 
     @tool
     def set_technical_capacity(capacity: str) -> str:
         """Set the technical capacity level (optional)"""
-        profile["capacity"] = capacity
+        update_profile("capacity", capacity)
         return f"Technical capacity set to: {capacity}"
 
     @tool
     def get_project_profile() -> dict:
         """Get the current project profile"""
-        return profile.copy()
+        return get_session_profile(session_id).to_dict()
     
     return [
         set_project_location,
@@ -129,39 +162,7 @@ def create_profile_tools(session_id: str):
 app = BedrockAgentCoreApp()
 log = app.logger
 
-@app.entrypoint
-async def invoke(payload, context):
-    session_id = getattr(context, 'session_id', 'default')
-
-    # Configure memory if available
-    session_manager = None
-    if MEMORY_ID:
-        session_manager = AgentCoreMemorySessionManager(
-            AgentCoreMemoryConfig(
-                memory_id=MEMORY_ID,
-                session_id=session_id,
-                actor_id="cba-user",
-                retrieval_config={
-                    "/users/cba-user/profile": RetrievalConfig(top_k=5, relevance_score=0.5),
-                }
-            ),
-            REGION
-        )
-    else:
-        log.warning("MEMORY_ID is not set. Skipping memory session manager initialization.")
-
-    with strands_mcp_client as client:
-        # Get MCP Tools
-        mcp_tools = client.list_tools_sync()
-        
-        # Create session-scoped profile tools (prevents concurrent request conflicts)
-        profile_tools = create_profile_tools(session_id)
-
-        # Create agent with Knowledge Base
-        agent = Agent(
-            model=load_model(),
-            session_manager=session_manager,
-            system_prompt=f"""
+SYSTEM_PROMPT = f"""
 You are the CBA (Circular Bioeconomy Alliance) Indicator Selection Assistant. Your role is to help users identify the most relevant monitoring and evaluation indicators for their circular bioeconomy projects.
 
 You have access to a knowledge base containing 801 methods and 224 indicators from the CBA M&E framework (Knowledge Base ID: {KNOWLEDGE_BASE_ID}).
@@ -177,11 +178,14 @@ Your workflow:
 2. Use the provided tools to:
    - Store profile information as you collect it (set_project_* tools)
    - Search the knowledge base for relevant indicators (search_cba_indicators)
+   - Filter indicators and methods by exact attributes such as component, class, principle, criterion, cost, accuracy or ease of use (filter_cba_indicators) - prefer this over knowledge base searches for attribute questions like "low cost methods with high accuracy"
    - Find indicators aligned with outcomes (search_indicators_by_outcome)
    - Identify budget-appropriate methods (search_methods_by_budget)
    - Get location-specific considerations (search_location_specific_indicators)
+   - Search for the whole profile at once (search_project_profile) - runs the outcome, budget and location searches concurrently in a single call
+   - Record the indicators you recommend (record_recommendations) so they appear on the user's results page
 
-3. Once you have the required information, use the KB search tools to recommend:
+3. Once you have the required information, call search_project_profile with the full profile (instead of calling the individual search tools one by one), then use the results to recommend the following, calling record_recommendations with every recommended indicator (ID, name, definition, cost, accuracy, ease of use and methods) before you write them out:
    - Relevant indicators aligned with their outcomes
    - Appropriate methods based on their budget and capacity
    - Location-specific considerations
@@ -193,22 +197,131 @@ Your workflow:
    - Budget and capacity requirements
 
 Be conversational, ask one question at a time, and confirm understanding before moving forward. After gathering all required information, actively search the knowledge base to provide specific, actionable recommendations.
-            """,
-            tools=profile_tools + [
-                search_cba_indicators,
-                search_indicators_by_outcome,
-                search_methods_by_budget,
-                search_location_specific_indicators
-            ] + mcp_tools
-        )
-
-        # Execute and format response
-        stream = agent.stream_async(payload.get("prompt"))
-
-        async for event in stream:
-            # Handle Text parts of the response
-            if "data" in event and isinstance(event["data"], str):
-                yield event["data"]
+"""
+
+KB_TOOLS = [
+    search_cba_indicators,
+    search_indicators_by_outcome,
+    search_methods_by_budget,
+    search_location_specific_indicators,
+    search_project_profile,
+    filter_cba_indicators
+]
+
+# Warm components reused across invocations: one model per process and an
+# LRU of per-session agents (with their memory session managers), evicted
+# when idle so a long-lived container doesn't grow without bound.
+AGENT_CACHE_MAX_SESSIONS = int(os.getenv("AGENT_CACHE_MAX_SESSIONS", "128"))
+AGENT_CACHE_IDLE_SECONDS = float(os.getenv("AGENT_CACHE_IDLE_SECONDS", "900"))
+
+_model = None
+
+def get_model():
+    """Process-wide Bedrock model, created on first use."""
+    global _model
+    if _model is None:
+        _model = load_model()
+    return _model
+
+def create_session_manager(session_id: str):
+    """Create the AgentCore memory session manager for a session, if memory is configured."""
+    if not MEMORY_ID:
+        log.warning("MEMORY_ID is not set. Skipping memory session manager initialization.")
+        return None
+    return AgentCoreMemorySessionManager(
+        AgentCoreMemoryConfig(
+            memory_id=MEMORY_ID,
+            session_id=session_id,
+            actor_id="cba-user",
+            retrieval_config={
+                "/users/cba-user/profile": RetrievalConfig(top_k=5, relevance_score=0.5),
+            }
+        ),
+        REGION
+    )
+
+class SessionAgent:
+    """
+    A session's agent, a lock that serializes its invocations, its usage
+    totals and the recommendations it has recorded.
+    """
+
+    __slots__ = ("agent", "lock", "usage", "recommendations")
+
+    def __init__(self, agent, recommendations=None):
+        self.agent = agent
+        self.lock = asyncio.Lock()
+        self.usage = Usage()
+        self.recommendations = recommendations or RecommendationRecorder()
+
+def build_session_agent(session_id: str, mcp_tools: list) -> SessionAgent:
+    """Build the agent for a session from the shared model, prompt and tools."""
+    # Session-scoped profile tools (prevents concurrent request conflicts)
+    profile_tools = create_profile_tools(session_id)
+    recommendations = RecommendationRecorder()
+    return SessionAgent(Agent(
+        model=get_model(),
+        session_manager=create_session_manager(session_id),
+        system_prompt=SYSTEM_PROMPT,
+        tools=profile_tools + [create_recommendation_tool(recommendations)] + KB_TOOLS + mcp_tools
+    ), recommendations)
+
+session_agents = SessionCache(max_sessions=AGENT_CACHE_MAX_SESSIONS, idle_seconds=AGENT_CACHE_IDLE_SECONDS)
+
+# Every invocation logs its usage (model calls, tokens, tool calls, KB latency)
+# and the session's totals. With AGENT_METADATA_FRAME=on, or "metadata": true in
+# the payload, the stream also ends with a {"metadata": {...}} frame carrying them.
+AGENT_METADATA_FRAME = os.getenv("AGENT_METADATA_FRAME", "off").lower() == "on"
+
+def log_usage(session_id: str, invocation: dict, session: dict):
+    """Log one invocation's usage and the session totals as a JSON message."""
+    log.info(json.dumps({
+        "event": "agent_usage",
+        "session_id": session_id,
+        "invocation": invocation,
+        "session": session,
+    }))
+
+@app.entrypoint
+async def invoke(payload, context):
+    session_id = getattr(context, 'session_id', 'default')
+
+    session = session_agents.get_or_create(
+        session_id,
+        lambda: build_session_agent(session_id, get_mcp_tools())
+    )
+
+    # Agents reject concurrent invocations; queue turns for the same session
+    async with session.lock:
+        usage = Usage(invocations=1)
+        tools_before = tool_snapshot(session.agent)
+        started = time.perf_counter()
+        try:
+            with usage.activate():
+                # Execute and format response
+                stream = session.agent.stream_async(payload.get("prompt"))
+
+                async for event in stream:
+                    usage.observe(event)
+                    # Handle Text parts of the response
+                    if "data" in event and isinstance(event["data"], str):
+                        yield event["data"]
+                    elif session.recommendations.pending:
+                        # Sent as soon as record_recommendations has run, ahead of the prose
+                        yield {"recommendations": session.recommendations.take()}
+
+                recorded = session.recommendations.take()
+                if recorded is not None:
+                    yield {"recommendations": recorded}
+        finally:
+            usage.duration_ms = (time.perf_counter() - started) * 1000
+            usage.record_tools(tools_before, tool_snapshot(session.agent))
+            session.usage.merge(usage)
+            invocation_usage, session_usage = usage.to_dict(), session.usage.to_dict()
+            log_usage(session_id, invocation_usage, session_usage)
+
+    if payload.get("metadata", AGENT_METADATA_FRAME):
+        yield {"metadata": {"session_id": session_id, "usage": invocation_usage, "session_usage": session_usage}}
 
 def format_response(result) -> str:
     """Format the agent response"""
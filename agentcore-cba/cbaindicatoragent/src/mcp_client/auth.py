@@ -0,0 +1,129 @@
+"""OAuth client-credentials tokens for the AgentCore Gateway.
+
+TokenManager caches the Cognito access token until shortly before it
+expires. Inside the refresh margin the cached token is still returned and a
+single background refresh is started; once the token has expired, callers
+block on one shared refresh instead of each posting to the token endpoint.
+"""
+import logging
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# (connect, read) timeouts for the token endpoint
+TOKEN_REQUEST_TIMEOUT = (3.05, 10)
+
+
+def create_http_session(pool_maxsize=10, retries=2) -> requests.Session:
+    """A requests.Session with a keep-alive connection pool and retries on transient errors."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(
+            total=retries,
+            backoff_factor=0.2,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=None,
+        ),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class TokenManager:
+    """
+    Caches a client-credentials access token and refreshes it ahead of expiry.
+
+    get_token() only touches the network when there is no usable token. A
+    token within refresh_margin seconds of expiry is still returned while a
+    background thread fetches the next one; concurrent refreshes are
+    coalesced into a single request.
+    """
+
+    def __init__(self, token_url, client_id, client_secret, scope=None, refresh_margin=60,
+                 session=None, timeout=TOKEN_REQUEST_TIMEOUT, clock=time.monotonic):
+        self.token_url = token_url
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.scope = scope
+        self.refresh_margin = refresh_margin
+        self.session = session or create_http_session()
+        self.timeout = timeout
+        self.clock = clock
+        self._token = None
+        self._expires_at = 0.0
+        self._refresh_at = 0.0
+        self._refresh_lock = threading.Lock()
+        self.refreshes = 0
+
+    def get_token(self) -> str:
+        """Return a valid access token, fetching one only if needed."""
+        now = self.clock()
+        token = self._token
+        if token is not None and now < self._expires_at:
+            if now >= self._refresh_at:
+                self._refresh_in_background()
+            return token
+        return self._refresh()
+
+    def invalidate(self):
+        """Drop the cached token, e.g. after the Gateway rejects it with 401."""
+        self._token = None
+        self._expires_at = 0.0
+        self._refresh_at = 0.0
+
+    def _refresh(self):
+        with self._refresh_lock:
+            # Another caller may have refreshed while we waited for the lock
+            if self._token is not None and self.clock() < self._refresh_at:
+                return self._token
+            return self._fetch()
+
+    def _refresh_in_background(self):
+        if not self._refresh_lock.acquire(blocking=False):
+            return  # A refresh is already in flight
+        thread = threading.Thread(target=self._background_refresh, name="token-refresh", daemon=True)
+        try:
+            thread.start()
+        except Exception:
+            self._refresh_lock.release()
+            raise
+
+    def _background_refresh(self):
+        try:
+            self._fetch()
+        except Exception as e:
+            # The current token is still valid; the next caller will retry
+            logger.warning(f"Background token refresh failed: {e}")
+        finally:
+            self._refresh_lock.release()
+
+    def _fetch(self) -> str:
+        data = {"grant_type": "client_credentials"}
+        if self.scope:
+            data["scope"] = self.scope
+        requested_at = self.clock()
+        response = self.session.post(
+            self.token_url,
+            auth=(self.client_id, self.client_secret),
+            data=data,
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        body = response.json()
+        expires_in = float(body.get("expires_in", 3600))
+        self._token = body["access_token"]
+        # Measure expiry from when the request was sent, not when it returned.
+        # Short-lived tokens refresh at half-life rather than immediately.
+        self._expires_at = requested_at + expires_in
+        self._refresh_at = requested_at + max(expires_in - self.refresh_margin, expires_in / 2)
+        self.refreshes += 1
+        return self._token
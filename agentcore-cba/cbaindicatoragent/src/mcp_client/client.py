@@ -1,35 +1,90 @@
 import os
 from mcp.client.streamable_http import streamablehttp_client
 from strands.tools.mcp.mcp_client import MCPClient
-import requests
+
+from mcp_client.auth import TokenManager
+from mcp_client.connection import MCPConnectionManager
 
 COGNITO_TOKEN_URL = os.getenv("COGNITO_TOKEN_URL")
 COGNITO_CLIENT_ID = os.getenv("COGNITO_CLIENT_ID")
 COGNITO_CLIENT_SECRET = os.getenv("COGNITO_CLIENT_SECRET")
 COGNITO_SCOPE = os.getenv("COGNITO_SCOPE")
+# Refresh the token this many seconds before it expires
+COGNITO_TOKEN_REFRESH_MARGIN_SECONDS = float(os.getenv("COGNITO_TOKEN_REFRESH_MARGIN_SECONDS", "300"))
+# How long the Gateway tool list is cached before it is listed again
+MCP_TOOLS_TTL_SECONDS = float(os.getenv("MCP_TOOLS_TTL_SECONDS", "300"))
+
+_token_manager = None
+_connection = None
+
+
+def get_token_manager() -> TokenManager:
+    """Process-wide token manager (one cached token and connection pool)."""
+    global _token_manager
+    if _token_manager is None:
+        _token_manager = TokenManager(
+            COGNITO_TOKEN_URL,
+            COGNITO_CLIENT_ID,
+            COGNITO_CLIENT_SECRET,
+            scope=COGNITO_SCOPE,
+            refresh_margin=COGNITO_TOKEN_REFRESH_MARGIN_SECONDS,
+        )
+    return _token_manager
+
 
 def _get_access_token():
     """
-    Make a POST request to the Cognito OAuth token URL using client credentials.
+    Return a Cognito access token for the Gateway, fetched with client
+    credentials and cached until shortly before it expires.
     """
-    response = requests.post(
-        COGNITO_TOKEN_URL,
-        auth=(COGNITO_CLIENT_ID, COGNITO_CLIENT_SECRET),
-        data={
-            "grant_type": "client_credentials",
-            "scope": COGNITO_SCOPE,
-        },
-        headers={"Content-Type": "application/x-www-form-urlencoded"},
-    )
-    return response.json()["access_token"]
+    return get_token_manager().get_token()
+
+
+class GatewayMCPClient(MCPClient):
+    """
+    MCPClient whose tool calls go through an MCPConnectionManager, which
+    reconnects and retries once when the Gateway session has been dropped.
+    """
+
+    def __init__(self, transport_callable, connection: MCPConnectionManager = None, **kwargs):
+        super().__init__(transport_callable, **kwargs)
+        self.connection = connection
+
+    async def call_tool_async(self, *args, **kwargs):
+        call = lambda: super(GatewayMCPClient, self).call_tool_async(*args, **kwargs)
+        if self.connection is None:
+            return await call()
+        return await self.connection.call_tool_async(call)
 
+    def call_tool_sync(self, *args, **kwargs):
+        call = lambda: super(GatewayMCPClient, self).call_tool_sync(*args, **kwargs)
+        if self.connection is None:
+            return call()
+        return self.connection.call_tool_sync(call)
 
-def get_streamable_http_mcp_client() -> MCPClient:
+
+def get_streamable_http_mcp_client(connection: MCPConnectionManager = None) -> MCPClient:
     """
     Returns an MCP Client for AgentCore Gateway compatible with Strands
     """
     gateway_url = os.getenv("GATEWAY_URL")
     if not gateway_url:
         raise RuntimeError("Missing required environment variable: GATEWAY_URL")
-    access_token = _get_access_token()
-    return MCPClient(lambda: streamablehttp_client(gateway_url, headers={"Authorization": f"Bearer {access_token}"}))
\ No newline at end of file
+    # Resolve the token when the transport connects, so a reused client never sends a stale one
+    return GatewayMCPClient(
+        lambda: streamablehttp_client(gateway_url, headers={"Authorization": f"Bearer {_get_access_token()}"}),
+        connection=connection,
+    )
+
+
+def get_mcp_connection() -> MCPConnectionManager:
+    """
+    Process-wide Gateway connection, opened on first use and kept across
+    invocations together with its tool list.
+    """
+    global _connection
+    if _connection is None:
+        _connection = MCPConnectionManager(
+            lambda: get_streamable_http_mcp_client(connection=_connection), tools_ttl=MCP_TOOLS_TTL_SECONDS
+        )
+    return _connection
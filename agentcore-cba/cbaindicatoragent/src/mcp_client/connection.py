@@ -0,0 +1,183 @@
+"""Long-lived MCP connection with a cached tool list.
+
+Opening a streamable-HTTP MCP session (initialize handshake plus a
+tools/list round trip) per user message adds Gateway latency to every
+invocation. MCPConnectionManager keeps one connected client per process,
+caches its tool list for tools_ttl seconds (or until the server sends
+notifications/tools/list_changed, which calls invalidate_tools()) and
+reconnects lazily after a failure. Tool calls routed through
+call_tool_async() reconnect and retry once when the failure proves the
+request never reached the server, e.g. because the server had dropped the
+session. Other failures (timeouts, errors after the request was sent) are
+returned as they are, since the Gateway may already have run the tool.
+"""
+import asyncio
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Prefix strands' MCPClient gives results of calls that raised on the client
+# side (transport errors, timeouts) rather than returning a server result
+CLIENT_ERROR_PREFIX = "Tool execution failed:"
+# What the MCP client reports for the 404 a server answers to a request on a
+# session it has dropped; the request was refused, not run
+SESSION_DROPPED_ERROR = "Session terminated"
+# Client-side errors raised before a request is sent: strands' "client
+# session is not running" and httpx connect failures
+UNSENT_ERROR_MARKERS = ("session is not running", "connection refused", "all connection attempts failed")
+UNSENT_ERROR_TYPES = ("ConnectError", "ConnectTimeout", "ConnectionRefusedError")
+
+
+def is_unsent_failure(error) -> bool:
+    """
+    Whether error, an exception or a tool result, proves the call never
+    reached the server, so retrying it can't run the tool twice.
+    """
+    if isinstance(error, dict):
+        if error.get("status") != "error" or error.get("cancelled"):
+            return False
+        text = str((error.get("content") or [{}])[0].get("text", ""))
+        if not text.startswith(CLIENT_ERROR_PREFIX):
+            return False
+        text = text[len(CLIENT_ERROR_PREFIX):].strip()
+    elif type(error).__name__ in UNSENT_ERROR_TYPES:
+        return True
+    else:
+        text = str(error)
+    return text == SESSION_DROPPED_ERROR or any(marker in text.lower() for marker in UNSENT_ERROR_MARKERS)
+
+
+class MCPConnectionManager:
+    """
+    One persistent MCP client per process.
+
+    client_factory() must return a client usable as a context manager with
+    list_tools_sync(), such as strands' MCPClient. The client object is
+    created once and re-entered on reconnect, so tools already handed to
+    agents keep working after a reconnect. Its on_tools_changed attribute is
+    set to invalidate_tools before it first connects.
+    """
+
+    def __init__(self, client_factory, tools_ttl=300, clock=time.monotonic):
+        self.client_factory = client_factory
+        self.tools_ttl = tools_ttl
+        self.clock = clock
+        self._client = None
+        self._connected = False
+        self._tools = None
+        self._tools_loaded_at = 0.0
+        self._lock = threading.RLock()
+        self.connects = 0
+        self.tool_listings = 0
+        self.tool_cache_hits = 0
+        self.failures = 0
+
+    def client(self):
+        """Return the connected client, connecting if needed."""
+        with self._lock:
+            if self._client is None:
+                self._client = self.client_factory()
+                # Called on notifications/tools/list_changed
+                self._client.on_tools_changed = self.invalidate_tools
+            if not self._connected:
+                self._client.__enter__()
+                self._connected = True
+                self.connects += 1
+            return self._client
+
+    def list_tools(self) -> list:
+        """Return the cached tool list, refreshing it when stale."""
+        with self._lock:
+            if self._tools is not None and self.clock() - self._tools_loaded_at < self.tools_ttl:
+                self.tool_cache_hits += 1
+                return self._tools
+            try:
+                tools = self.client().list_tools_sync()
+            except Exception as e:
+                # The session may have been dropped by the server; reconnect once
+                self.failures += 1
+                logger.warning(f"MCP tool listing failed, reconnecting: {e}")
+                self.reset()
+                tools = self.client().list_tools_sync()
+            self._tools = list(tools)
+            self._tools_loaded_at = self.clock()
+            self.tool_listings += 1
+            return self._tools
+
+    def invalidate_tools(self, *args, **kwargs):
+        """Force the next list_tools() to ask the server again."""
+        with self._lock:
+            self._tools = None
+
+    def reconnect(self, connects=None):
+        """
+        Close and reopen the connection. With connects (the value of
+        self.connects when the failed call started), skip it if another
+        caller has reconnected since.
+        """
+        with self._lock:
+            if connects is not None and connects != self.connects and self._connected:
+                return
+            self.failures += 1
+            self.reset()
+            self.client()
+
+    async def call_tool_async(self, call):
+        """
+        Await call(), a tool call on the connected client. When it fails
+        before the request was sent (see is_unsent_failure), reconnect and
+        await call() once more; any other failure is raised or returned.
+        """
+        connects = self.connects
+        try:
+            result = await call()
+        except Exception as e:
+            if not is_unsent_failure(e):
+                raise
+            error = e
+        else:
+            if not is_unsent_failure(result):
+                return result
+            error = result["content"][0]["text"]
+        logger.warning(f"MCP tool call failed, reconnecting and retrying: {error}")
+        await asyncio.to_thread(self.reconnect, connects)
+        return await call()
+
+    def call_tool_sync(self, call):
+        """Synchronous call_tool_async()."""
+        connects = self.connects
+        try:
+            result = call()
+        except Exception as e:
+            if not is_unsent_failure(e):
+                raise
+            error = e
+        else:
+            if not is_unsent_failure(result):
+                return result
+            error = result["content"][0]["text"]
+        logger.warning(f"MCP tool call failed, reconnecting and retrying: {error}")
+        self.reconnect(connects)
+        return call()
+
+    def reset(self):
+        """Close the connection; the next call reconnects."""
+        with self._lock:
+            self._tools = None
+            if self._connected:
+                self._connected = False
+                try:
+                    self._client.__exit__(None, None, None)
+                except Exception as e:
+                    logger.warning(f"Error closing MCP connection: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "connected": self._connected,
+            "connects": self.connects,
+            "tool_listings": self.tool_listings,
+            "tool_cache_hits": self.tool_cache_hits,
+            "failures": self.failures,
+        }
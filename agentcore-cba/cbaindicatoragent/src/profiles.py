@@ -0,0 +1,186 @@
+"""Session project profiles for the agent runtime.
+
+Profiles live in a size- and idle-time-bounded ProfileStore. When a backend
+is configured, changed profiles are persisted write-behind: tools only mark
+a profile dirty and a background thread batches the writes, so a profile
+survives container recycling without adding latency to the request path.
+"""
+import atexit
+import json
+import logging
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, fields
+from typing import Optional
+
+from sessions import SessionCache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class ProjectProfile:
+    """What the agent has learned about a user's project."""
+
+    location: Optional[str] = None
+    commodity: Optional[str] = None
+    budget: Optional[str] = None
+    outcomes: Optional[str] = None
+    capacity: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ProjectProfile":
+        known = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in known})
+
+
+class ProfileBackend(ABC):
+    """
+    Durable storage for profiles, keyed by session_id. Abstract, so a
+    backend missing a method fails when it is constructed rather than on the
+    background flush thread, where errors are only logged.
+    """
+
+    @abstractmethod
+    def load(self, session_id: str) -> Optional[dict]:
+        """The stored profile dict for session_id, or None."""
+
+    @abstractmethod
+    def save_many(self, items: list) -> None:
+        """Persist a batch of (session_id, profile dict) pairs."""
+
+
+class SQLiteProfileBackend(ProfileBackend):
+    """Local SQLite stand-in for a durable profile table."""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS profiles (session_id TEXT PRIMARY KEY, profile TEXT NOT NULL)"
+        )
+        self._lock = threading.Lock()
+
+    def load(self, session_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT profile FROM profiles WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_many(self, items: list) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO profiles (session_id, profile) VALUES (?, ?)",
+                    [(session_id, json.dumps(profile)) for session_id, profile in items]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+
+class ProfileStore:
+    """
+    Bounded in-memory profile store with optional write-behind persistence.
+
+    get() returns the cached profile, loading it from the backend the first
+    time a session is seen in this container. After changing a profile, call
+    mark_dirty(); dirty profiles are written by a background thread every
+    flush_interval seconds (and on flush()/interpreter exit). close() writes
+    what is pending and stops the writer.
+    """
+
+    def __init__(self, max_sessions=1024, idle_seconds=3600, backend=None, flush_interval=1.0):
+        self.backend = backend
+        self.flush_interval = flush_interval
+        self._profiles = SessionCache(max_sessions=max_sessions, idle_seconds=idle_seconds)
+        self._dirty = {}
+        self._dirty_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._writer = None
+        self.writes = 0
+        self.write_errors = 0
+        if backend is not None:
+            atexit.register(self.flush)
+
+    def get(self, session_id: str) -> ProjectProfile:
+        """Get or create the profile for a session."""
+        return self._profiles.get_or_create(session_id, lambda: self._load(session_id))
+
+    def _load(self, session_id: str) -> ProjectProfile:
+        with self._dirty_lock:
+            # An evicted profile may still be waiting to be written
+            pending = self._dirty.get(session_id)
+        if pending is not None:
+            return pending
+        if self.backend is not None:
+            try:
+                data = self.backend.load(session_id)
+                if data:
+                    return ProjectProfile.from_dict(data)
+            except Exception as e:
+                logger.warning(f"Failed to load profile for session {session_id}: {e}")
+        return ProjectProfile()
+
+    def mark_dirty(self, session_id: str, profile: ProjectProfile) -> None:
+        """Queue a profile for persistence without blocking the caller."""
+        if self.backend is None:
+            return
+        with self._dirty_lock:
+            self._dirty[session_id] = profile
+        self._ensure_writer()
+
+    def _ensure_writer(self):
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._write_loop, name="profile-writer", daemon=True)
+            self._writer.start()
+
+    def _write_loop(self):
+        while not self._closed.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        """Write all dirty profiles now. Returns the number written."""
+        with self._dirty_lock:
+            if not self._dirty or self.backend is None:
+                return 0
+            batch, self._dirty = self._dirty, {}
+        items = [(session_id, profile.to_dict()) for session_id, profile in batch.items()]
+        try:
+            self.backend.save_many(items)
+        except Exception as e:
+            self.write_errors += 1
+            logger.warning(f"Failed to persist {len(items)} profiles: {e}")
+            with self._dirty_lock:
+                # Retry on the next flush unless the profile changed again meanwhile
+                for session_id, profile in batch.items():
+                    self._dirty.setdefault(session_id, profile)
+            return 0
+        self.writes += len(items)
+        return len(items)
+
+    def close(self) -> int:
+        """Write dirty profiles, stop the writer and drop the exit hook. Returns the number written."""
+        self._closed.set()
+        self._wake.set()
+        if self.backend is not None:
+            atexit.unregister(self.flush)
+        return self.flush()
+
+    def stats(self) -> dict:
+        stats = self._profiles.stats()
+        stats.update({"pending_writes": len(self._dirty), "writes": self.writes, "write_errors": self.write_errors})
+        return stats
+
+    def __len__(self):
+        return len(self._profiles)
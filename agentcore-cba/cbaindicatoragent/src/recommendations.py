@@ -0,0 +1,143 @@
+"""Structured recommendation capture for the agent runtime.
+
+The agent records the indicators it recommends with the
+record_recommendations tool, so the app no longer has to find them in the
+prose of its answer. Each session has a RecommendationRecorder; invoke()
+sends what the tool recorded as a {"recommendations": [...]} frame on the
+response stream as soon as the tool has run, and the Lambda stores those
+records for /recommendations as they are.
+
+Records are normalized to the frontend's Indicator shape and completed from
+the indicator catalog (component, class, principles, criteria, methods)
+when the ID is a catalog indicator.
+"""
+import logging
+import threading
+from typing import Optional
+
+from pydantic import BaseModel, Field
+from strands import tool
+
+from catalog import get_catalog, normalize_level
+
+logger = logging.getLogger(__name__)
+
+MAX_DEFINITION_LENGTH = 500
+MAX_METHODS = 10
+
+
+class MethodRecord(BaseModel):
+    """A measurement method for a recommended indicator."""
+
+    name: str = Field(description="Method name, e.g. 'Dry combustion of composite soil samples'")
+    cost: str = Field(default="", description="Financial cost: Low, Medium-Low, Medium, Medium-High or High")
+    accuracy: str = Field(default="", description="Accuracy, same levels as cost")
+    ease: str = Field(default="", description="Ease of use, same levels as cost")
+
+
+class IndicatorRecord(BaseModel):
+    """One recommended indicator."""
+
+    id: int = Field(description="Indicator ID from the CBA indicator list")
+    name: str = Field(description="Indicator name")
+    definition: str = Field(default="", description="What the indicator measures, in one or two sentences")
+    cost: str = Field(default="", description="Cost of measuring it: Low, Medium or High")
+    accuracy: str = Field(default="", description="Accuracy: Low, Medium or High")
+    ease: str = Field(default="", description="Ease of use: Low, Medium or High")
+    priority: str = Field(default="Primary", description="Primary or Secondary")
+    methods: list[MethodRecord] = Field(default_factory=list, description="Recommended methods")
+
+
+def _level(value: str, default: str = "Medium") -> str:
+    return normalize_level(value or "") or default
+
+
+def _catalog_entry(indicator_id: int) -> Optional[dict]:
+    try:
+        return get_catalog().get(indicator_id)
+    except Exception as e:
+        logger.warning(f"Indicator catalog unavailable: {e}")
+        return None
+
+
+def normalize_indicator(record: dict) -> dict:
+    """An indicator record in the frontend's Indicator shape, completed from the catalog."""
+    entry = _catalog_entry(record["id"]) or {}
+    methods = [
+        {"name": m["name"], "cost": m.get("cost", ""), "accuracy": m.get("accuracy", ""), "ease": m.get("ease", "")}
+        for m in record.get("methods") or []
+    ] or [
+        {"name": " - ".join(part for part in (m["general"], m["specific"]) if part),
+         "cost": m["cost"], "accuracy": m["accuracy"], "ease": m["ease"]}
+        for m in entry.get("methods", [])
+    ]
+    return {
+        "id": record["id"],
+        "name": record.get("name") or entry.get("name", ""),
+        "definition": (record.get("definition") or entry.get("name", ""))[:MAX_DEFINITION_LENGTH],
+        "component": entry.get("component") or "Unknown",
+        "class": entry.get("class") or "Unknown",
+        "cost": _level(record.get("cost")),
+        "accuracy": _level(record.get("accuracy")),
+        "ease": _level(record.get("ease")),
+        "principle": ", ".join(entry.get("principles", [])),
+        "criterion": ", ".join(entry.get("criteria", [])),
+        "priority": record.get("priority") or "Primary",
+        "methods": [
+            {"id": i, "name": m["name"], "cost": _level(m["cost"], ""),
+             "accuracy": _level(m["accuracy"], ""), "ease": _level(m["ease"], "")}
+            for i, m in enumerate(methods[:MAX_METHODS], 1)
+        ],
+    }
+
+
+class RecommendationRecorder:
+    """A session's recorded recommendations and the batch not yet sent on the stream."""
+
+    __slots__ = ("indicators", "_pending", "_lock")
+
+    def __init__(self):
+        self.indicators = []
+        self._pending = None
+        self._lock = threading.Lock()
+
+    def record(self, records: list) -> list:
+        """Replace the session's recommendations; returns the normalized indicators."""
+        indicators = [normalize_indicator(dict(record)) for record in records]
+        with self._lock:
+            self.indicators = indicators
+            self._pending = indicators
+        return indicators
+
+    @property
+    def pending(self) -> bool:
+        return self._pending is not None
+
+    def take(self) -> Optional[list]:
+        """The indicators recorded since the last take(), or None."""
+        with self._lock:
+            pending, self._pending = self._pending, None
+        return pending
+
+
+def create_recommendation_tool(recorder: RecommendationRecorder):
+    """Create the session-scoped record_recommendations tool."""
+
+    @tool
+    def record_recommendations(indicators: list[IndicatorRecord]) -> str:
+        """
+        Record the indicators you are recommending so the app can show them on the results page.
+        Call it with the complete list every time you present recommendations, before writing
+        them out; each call replaces the previous list.
+
+        Args:
+            indicators: Every indicator you recommend, with its ID from the CBA indicator list
+
+        Returns:
+            Confirmation listing the recorded indicators
+        """
+        recorded = recorder.record(indicators)
+        names = ", ".join(f"{i['id']} {i['name']}" for i in recorded)
+        return f"Recorded {len(recorded)} indicators: {names}"
+
+    return record_recommendations
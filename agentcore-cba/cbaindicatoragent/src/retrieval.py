@@ -0,0 +1,262 @@
+"""Offline hybrid retrieval over the CBA M&E corpus.
+
+A local stand-in for the Bedrock Knowledge Base used by kb_tool. It combines
+BM25 keyword scoring with dense vectors from a locally built embedding
+matrix (TF-IDF reduced with truncated SVD, i.e. LSA), so it needs no network
+or embedding model at query time.
+
+The corpus mirrors what was loaded into the Knowledge Base: one document per
+indicator and per method from the indicator spreadsheet, plus passages from
+the background and use-case PDFs. The built index is committed as
+data/retrieval_index.npz, since the container build context doesn't include
+cba_inputs; rebuild it when the inputs change:
+
+    python src/retrieval.py build ../../cba_inputs
+
+KB_LOCAL_INDEX_PATH points at another index file.
+"""
+import json
+import math
+import os
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+
+INDEX_PATH = os.getenv(
+    "KB_LOCAL_INDEX_PATH",
+    str(Path(__file__).parent / "data" / "retrieval_index.npz")
+)
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+EMBEDDING_DIM = 128
+PASSAGE_CHARS = 1000
+# Weight of BM25 vs dense similarity in the hybrid score
+HYBRID_ALPHA = 0.5
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_STOPWORDS = frozenset("""
+a an and are as at be by for from has have in into is it its of on or that the their this to was
+were which with within what how can may use used using per e g eg i ie etc via
+""".split())
+
+
+def tokenize(text):
+    return [t for t in _TOKEN.findall(text.lower()) if len(t) > 1 and t not in _STOPWORDS]
+
+
+# --- Corpus -------------------------------------------------------------------
+
+def load_corpus(inputs_dir):
+    """Build (texts, sources) for the CBA corpus in inputs_dir."""
+    from catalog import _COVERED_MARKS, _cell, _coverage_columns, _read_xlsx_sheets
+
+    inputs_dir = Path(inputs_dir)
+    texts, sources = [], []
+
+    workbook = inputs_dir / "CBA ME Indicators List.xlsx"
+    sheets = _read_xlsx_sheets(workbook)
+    indicator_rows = sheets["Indicators"]
+    principle_columns, criterion_columns = _coverage_columns(indicator_rows[0])
+    coverage_columns = sorted(principle_columns + criterion_columns)
+    for row in indicator_rows[1:]:
+        if not _cell(row, 0):
+            continue
+        covered = [title for col, title in coverage_columns if _cell(row, col) in _COVERED_MARKS]
+        texts.append(
+            f"Indicator {_cell(row, 0)}: {_cell(row, 3)}\n"
+            f"Component: {_cell(row, 1)}. Class: {_cell(row, 2)}. Unit: {_cell(row, 4)}.\n"
+            f"Principles and criteria: {'; '.join(covered)}"
+        )
+        sources.append(f"{workbook.name}#Indicators:{_cell(row, 0)}")
+
+    method_rows = sheets["Methods"]
+    method_header = method_rows[0]
+    for number, row in enumerate(method_rows[1:], 2):
+        if not _cell(row, 0):
+            continue
+        fields = [
+            f"{(method_header[col] or '').strip()}: {_cell(row, col)}"
+            for col in range(1, 15)
+            if _cell(row, col) and _cell(row, col) != "N/A"
+        ]
+        texts.append(f"Method for indicator {_cell(row, 0)}\n" + "\n".join(fields))
+        sources.append(f"{workbook.name}#Methods:{number}")
+
+    for pdf in sorted(inputs_dir.glob("*.pdf")):
+        from pypdf import PdfReader
+        text = "\n".join(page.extract_text() or "" for page in PdfReader(str(pdf)).pages)
+        for number, passage in enumerate(_passages(text), 1):
+            texts.append(passage)
+            sources.append(f"{pdf.name}#{number}")
+
+    return texts, sources
+
+
+def _passages(text, size=PASSAGE_CHARS):
+    """Split text into roughly size-character passages on paragraph/line breaks."""
+    passages, current = [], ""
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if current and len(current) + len(line) > size:
+            passages.append(current)
+            current = ""
+        current = f"{current} {line}" if current else line
+    if current:
+        passages.append(current)
+    return passages
+
+
+# --- Index build --------------------------------------------------------------
+
+def build_index(texts, sources, dim=EMBEDDING_DIM, min_df=2):
+    """Build BM25 postings and LSA embeddings for a list of documents."""
+    doc_tokens = [tokenize(t) for t in texts]
+    df = {}
+    for tokens in doc_tokens:
+        for term in set(tokens):
+            df[term] = df.get(term, 0) + 1
+    vocab = sorted(term for term, count in df.items() if count >= min_df)
+    term_ids = {term: i for i, term in enumerate(vocab)}
+
+    n_docs, n_terms = len(texts), len(vocab)
+    doc_lengths = np.array([len(tokens) for tokens in doc_tokens], dtype=np.float32)
+    avg_length = float(doc_lengths.mean()) if n_docs else 0.0
+    idf = np.array([math.log(1 + (n_docs - df[t] + 0.5) / (df[t] + 0.5)) for t in vocab], dtype=np.float32)
+
+    # Term frequencies as a dense doc x term matrix (small corpus: ~1k x ~5k)
+    tf = np.zeros((n_docs, n_terms), dtype=np.float32)
+    for doc, tokens in enumerate(doc_tokens):
+        for token in tokens:
+            term = term_ids.get(token)
+            if term is not None:
+                tf[doc, term] += 1
+
+    # BM25 weights stored as term-major postings (CSC layout)
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths / max(avg_length, 1e-9))
+    bm25 = tf * (BM25_K1 + 1) / (tf + norm[:, None]) * idf[None, :]
+    bm25[tf == 0] = 0
+    term_docs, posting_docs, posting_weights = [0], [], []
+    for term in range(n_terms):
+        docs = np.nonzero(tf[:, term])[0]
+        posting_docs.append(docs)
+        posting_weights.append(bm25[docs, term])
+        term_docs.append(term_docs[-1] + len(docs))
+
+    # LSA: log-scaled TF-IDF, truncated SVD
+    tfidf = np.log1p(tf) * idf[None, :]
+    tfidf /= np.maximum(np.linalg.norm(tfidf, axis=1, keepdims=True), 1e-9)
+    dim = min(dim, n_docs, n_terms)
+    _, _, vt = np.linalg.svd(tfidf, full_matrices=False)
+    projection = vt[:dim].astype(np.float32)
+    embeddings = tfidf @ projection.T
+    embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-9)
+
+    return {
+        "vocab": np.array(json.dumps(vocab)),
+        "idf": idf,
+        "postings_offsets": np.array(term_docs, dtype=np.int32),
+        "postings_docs": np.concatenate(posting_docs).astype(np.int32) if posting_docs else np.zeros(0, np.int32),
+        "postings_weights": np.concatenate(posting_weights).astype(np.float32) if posting_weights else np.zeros(0, np.float32),
+        "projection": projection.astype(np.float16),
+        "embeddings": embeddings.astype(np.float16),
+        "texts": np.array(json.dumps(texts)),
+        "sources": np.array(json.dumps(sources)),
+    }
+
+
+def save_index(index, path=INDEX_PATH):
+    np.savez_compressed(path, **index)
+
+
+# --- Query --------------------------------------------------------------------
+
+class HybridRetriever:
+    """BM25 + dense (LSA) retriever over a prebuilt index."""
+
+    def __init__(self, index):
+        vocab = json.loads(str(index["vocab"]))
+        self.term_ids = {term: i for i, term in enumerate(vocab)}
+        self.idf = np.asarray(index["idf"], dtype=np.float32)
+        self.offsets = np.asarray(index["postings_offsets"])
+        self.posting_docs = np.asarray(index["postings_docs"])
+        self.posting_weights = np.asarray(index["postings_weights"], dtype=np.float32)
+        self.projection = np.asarray(index["projection"], dtype=np.float32)
+        self.embeddings = np.asarray(index["embeddings"], dtype=np.float32)
+        self.texts = json.loads(str(index["texts"]))
+        self.sources = json.loads(str(index["sources"]))
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        with np.load(path) as index:
+            return cls({key: index[key] for key in index.files})
+
+    def _term_counts(self, query):
+        counts = {}
+        for token in tokenize(query):
+            term = self.term_ids.get(token)
+            if term is not None:
+                counts[term] = counts.get(term, 0) + 1
+        return counts
+
+    def bm25_scores(self, counts):
+        scores = np.zeros(len(self.texts), dtype=np.float32)
+        for term in counts:
+            start, end = self.offsets[term], self.offsets[term + 1]
+            scores[self.posting_docs[start:end]] += self.posting_weights[start:end]
+        return scores
+
+    def dense_scores(self, counts):
+        if not counts:
+            return np.zeros(len(self.texts), dtype=np.float32)
+        terms = np.fromiter(counts, dtype=np.int64, count=len(counts))
+        weights = np.log1p(np.fromiter(counts.values(), dtype=np.float32, count=len(counts))) * self.idf[terms]
+        query = self.projection[:, terms] @ weights
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return np.zeros(len(self.texts), dtype=np.float32)
+        return self.embeddings @ (query / norm)
+
+    def search(self, query, max_results=10, alpha=HYBRID_ALPHA):
+        """
+        Return results shaped like Bedrock `retrievalResults`:
+        [{"content": {"text": ...}, "score": ..., "metadata": {"source": ...}}]
+        """
+        counts = self._term_counts(query)
+        if not counts:
+            return []
+        bm25 = self.bm25_scores(counts)
+        top = bm25.max()
+        if top > 0:
+            bm25 /= top
+        dense = np.clip(self.dense_scores(counts), 0, None)
+        scores = alpha * bm25 + (1 - alpha) * dense
+
+        k = min(max_results, len(scores))
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        ranked = candidates[np.argsort(-scores[candidates])]
+        return [{
+            "content": {"text": self.texts[doc]},
+            "score": float(scores[doc]),
+            "metadata": {"source": self.sources[doc]},
+        } for doc in ranked if scores[doc] > 0]
+
+
+def main(argv):
+    if len(argv) < 3 or argv[1] != "build":
+        print(f"Usage: python {argv[0]} build <cba_inputs dir> [output.npz]")
+        return 1
+    output = argv[3] if len(argv) > 3 else INDEX_PATH
+    texts, sources = load_corpus(argv[2])
+    save_index(build_index(texts, sources), output)
+    print(f"Indexed {len(texts)} documents to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(Path(__file__).parent))
+    sys.exit(main(sys.argv))
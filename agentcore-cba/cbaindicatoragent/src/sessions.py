@@ -0,0 +1,98 @@
+"""Bounded per-session caches for the agent runtime.
+
+A long-lived AgentCore container serves many sessions. Per-session objects
+(agents, memory session managers, profiles) are kept in a size- and
+idle-time-bounded LRU so they can be reused across invocations without
+growing without limit.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class SessionCache:
+    """
+    LRU cache keyed by session_id with idle-time eviction.
+
+    Entries unused for longer than idle_seconds are evicted on the next
+    access; when more than max_sessions are held, the least recently used
+    entries are evicted. on_evict(session_id, value) is called for every
+    evicted entry.
+    """
+
+    def __init__(self, max_sessions=256, idle_seconds=1800, on_evict=None, clock=time.monotonic):
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        self.on_evict = on_evict
+        self.clock = clock
+        self._entries = OrderedDict()  # session_id -> [value, last_used]
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, session_id):
+        """Return the cached value for session_id, or None."""
+        with self._lock:
+            self._evict_idle()
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            entry[1] = self.clock()
+            self._entries.move_to_end(session_id)
+            return entry[0]
+
+    def get_or_create(self, session_id, factory):
+        """Return the cached value for session_id, creating it with factory() on a miss."""
+        with self._lock:
+            value = self.get(session_id)
+            if value is not None:
+                self.hits += 1
+                return value
+            self.misses += 1
+            value = factory()
+            self.put(session_id, value)
+            return value
+
+    def put(self, session_id, value):
+        with self._lock:
+            self._entries[session_id] = [value, self.clock()]
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_sessions:
+                evicted_id, (evicted, _) = self._entries.popitem(last=False)
+                self._evicted(evicted_id, evicted)
+
+    def pop(self, session_id):
+        with self._lock:
+            entry = self._entries.pop(session_id, None)
+            return entry[0] if entry else None
+
+    def items(self):
+        with self._lock:
+            return [(session_id, entry[0]) for session_id, entry in self._entries.items()]
+
+    def _evict_idle(self):
+        cutoff = self.clock() - self.idle_seconds
+        # Entries are in LRU order, so idle ones are at the front
+        while self._entries:
+            session_id, (value, last_used) = next(iter(self._entries.items()))
+            if last_used > cutoff:
+                break
+            del self._entries[session_id]
+            self._evicted(session_id, value)
+
+    def _evicted(self, session_id, value):
+        self.evictions += 1
+        if self.on_evict:
+            self.on_evict(session_id, value)
+
+    def stats(self):
+        return {
+            "sessions": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def __len__(self):
+        return len(self._entries)
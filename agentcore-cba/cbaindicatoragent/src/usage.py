@@ -0,0 +1,157 @@
+"""Per-invocation and per-session usage accounting for the agent runtime.
+
+invoke() feeds every strands stream event of a turn into a Usage:
+
+- model round trips, tokens and model latency come from the model's
+  `metadata` stream events (one per model call)
+- tool calls, errors and durations per tool come from the agent's own tool
+  metrics, compared before and after the turn
+- Knowledge Base retrieve latency is recorded by kb_tool through
+  record_kb(), which goes to the invocation active in the calling context
+  (and does nothing outside an invocation)
+
+Each session's totals are kept next to its cached agent.
+"""
+import contextvars
+import threading
+from contextlib import contextmanager
+
+_active = contextvars.ContextVar("invocation_usage", default=None)
+
+# Bedrock usage keys -> reported names
+TOKEN_FIELDS = {
+    "inputTokens": "input_tokens",
+    "outputTokens": "output_tokens",
+    "totalTokens": "total_tokens",
+    "cacheReadInputTokens": "cache_read_tokens",
+    "cacheWriteInputTokens": "cache_write_tokens",
+}
+
+
+class Usage:
+    """Thread-safe usage counters for one invocation, or the totals of a session."""
+
+    def __init__(self, invocations=0):
+        self._lock = threading.Lock()
+        self.invocations = invocations
+        self.duration_ms = 0.0
+        self.model_calls = 0
+        self.model_ms = 0.0
+        self.tokens = dict.fromkeys(TOKEN_FIELDS.values(), 0)
+        self.tools = {}  # name -> [calls, errors, total_ms]
+        self.kb_retrievals = 0
+        self.kb_cache_hits = 0
+        self.kb_errors = 0
+        self.kb_ms = 0.0
+        self.kb_max_ms = 0.0
+
+    def observe(self, event):
+        """Account for one strands stream event; only model metadata events count."""
+        chunk = event.get("event")
+        if not isinstance(chunk, dict) or "metadata" not in chunk:
+            return
+        metadata = chunk["metadata"] or {}
+        usage = metadata.get("usage") or {}
+        with self._lock:
+            self.model_calls += 1
+            self.model_ms += (metadata.get("metrics") or {}).get("latencyMs", 0)
+            for key, name in TOKEN_FIELDS.items():
+                self.tokens[name] += usage.get(key, 0)
+
+    def record_tool(self, name, calls, errors, ms):
+        with self._lock:
+            entry = self.tools.setdefault(name, [0, 0, 0.0])
+            entry[0] += calls
+            entry[1] += errors
+            entry[2] += ms
+
+    def record_tools(self, before, after):
+        """Record the difference between two tool_snapshot()s."""
+        for name, (calls, errors, seconds) in after.items():
+            prev_calls, prev_errors, prev_seconds = before.get(name, (0, 0, 0.0))
+            if calls > prev_calls:
+                self.record_tool(name, calls - prev_calls, errors - prev_errors, (seconds - prev_seconds) * 1000)
+
+    def record_kb(self, ms, cached=False, error=False):
+        with self._lock:
+            self.kb_retrievals += 1
+            self.kb_cache_hits += bool(cached)
+            self.kb_errors += bool(error)
+            self.kb_ms += ms
+            self.kb_max_ms = max(self.kb_max_ms, ms)
+
+    def merge(self, other):
+        """Add a finished invocation's Usage to these totals."""
+        with self._lock:
+            self.invocations += other.invocations
+            self.duration_ms += other.duration_ms
+            self.model_calls += other.model_calls
+            self.model_ms += other.model_ms
+            for name, count in other.tokens.items():
+                self.tokens[name] += count
+            for name, entry in other.tools.items():
+                totals = self.tools.setdefault(name, [0, 0, 0.0])
+                for i, value in enumerate(entry):
+                    totals[i] += value
+            self.kb_retrievals += other.kb_retrievals
+            self.kb_cache_hits += other.kb_cache_hits
+            self.kb_errors += other.kb_errors
+            self.kb_ms += other.kb_ms
+            self.kb_max_ms = max(self.kb_max_ms, other.kb_max_ms)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "invocations": self.invocations,
+                "duration_ms": round(self.duration_ms, 1),
+                "model_calls": self.model_calls,
+                "model_ms": round(self.model_ms, 1),
+                "tokens": dict(self.tokens),
+                "tool_calls": sum(entry[0] for entry in self.tools.values()),
+                "tools": {
+                    name: {"calls": calls, "errors": errors, "total_ms": round(ms, 1)}
+                    for name, (calls, errors, ms) in self.tools.items()
+                },
+                "kb": {
+                    "retrievals": self.kb_retrievals,
+                    "cache_hits": self.kb_cache_hits,
+                    "errors": self.kb_errors,
+                    "total_ms": round(self.kb_ms, 1),
+                    "avg_ms": round(self.kb_ms / self.kb_retrievals, 1) if self.kb_retrievals else 0.0,
+                    "max_ms": round(self.kb_max_ms, 1),
+                },
+            }
+
+    @contextmanager
+    def activate(self):
+        """Make this the usage that record_kb() records into."""
+        token = _active.set(self)
+        try:
+            yield self
+        finally:
+            try:
+                _active.reset(token)
+            except ValueError:
+                # Closed from another context, e.g. an abandoned stream being collected
+                pass
+
+
+def tool_snapshot(agent) -> dict:
+    """{tool name: (calls, errors, seconds)} from a strands agent's cumulative tool metrics."""
+    metrics = getattr(getattr(agent, "event_loop_metrics", None), "tool_metrics", None) or {}
+    return {
+        name: (m.call_count, m.error_count, m.total_time)
+        for name, m in metrics.items()
+    }
+
+
+def current():
+    """The Usage of the active invocation, or None."""
+    return _active.get()
+
+
+def record_kb(ms, cached=False, error=False):
+    """Record a Knowledge Base retrieve in the active invocation, if any."""
+    usage = _active.get()
+    if usage is not None:
+        usage.record_kb(ms, cached, error)
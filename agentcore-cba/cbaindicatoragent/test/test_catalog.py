@@ -0,0 +1,70 @@
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from catalog import CATALOG_PATH, IndicatorCatalog, build_catalog, filter_cba_indicators, normalize_level
+
+XLSX_PATH = Path(__file__).parents[3] / "cba_inputs" / "CBA ME Indicators List.xlsx"
+
+SAMPLE = {
+    "principles": ["1. Natural Environment", "3. Economic Prosperity"],
+    "criteria": ["1.2 Minimize GHG emissions and enhance sinks", "3.2 Enhance livelihoods"],
+    "indicators": [
+        [1, "Soil organic carbon", "tC/ha", "Abiotic", "Soil carbon", [0], [0]],
+        [2, "Household income", "USD", "Socio-economic", "Financial well-being", [1], [1]],
+        [3, "Species richness", "count", "Biotic", "Biodiversity", [0], []],
+    ],
+    "methods": [
+        [1, "Soil sampling", "Dry combustion", "High", "Medium", "High"],
+        [1, "Soil sampling", "Loss on ignition", "Medium", "High", "Low"],
+        [2, "Interviews", "Household survey", "High", "Medium", "Low"],
+        [3, "Direct observation", "Transects", "Low", "High", "Low"],
+    ],
+}
+
+
+class TestIndicatorCatalog:
+    def test_attribute_filters_intersect(self):
+        catalog = IndicatorCatalog(SAMPLE)
+
+        results, total = catalog.filter(principle="1", cost="Low")
+        assert total == 2
+        assert [r["id"] for r in results] == [1, 3]
+        # Only methods meeting the method-level filters are returned
+        assert [m["specific"] for m in results[0]["methods"]] == ["Loss on ignition"]
+
+        results, _ = catalog.filter(cost="low", accuracy="high")
+        assert [r["id"] for r in results] == [2]
+
+    def test_label_matching(self):
+        catalog = IndicatorCatalog(SAMPLE)
+
+        assert [r["id"] for r in catalog.filter(criterion="GHG")[0]] == [1]
+        assert [r["id"] for r in catalog.filter(criterion="3.2")[0]] == [2]
+        assert [r["id"] for r in catalog.filter(component="Biotic, Abiotic")[0]] == [1, 3]
+        assert catalog.filter(indicator_class="Water quality") == ([], 0)
+
+    def test_normalize_level(self):
+        assert normalize_level("High*") == "High"
+        assert normalize_level("Low* ") == "Low"
+        assert normalize_level("Medium-High") == "Medium-High"
+        assert normalize_level("Requires analysis") == ""
+
+
+class TestCatalogData:
+    def test_shipped_catalog_matches_spreadsheet(self):
+        """The committed data file is up to date with the source spreadsheet."""
+        shipped = IndicatorCatalog.load(CATALOG_PATH)
+        assert len(shipped.ids) == 224
+        assert len(shipped.method_indicator) == 801
+
+        if XLSX_PATH.exists():
+            rebuilt = build_catalog(XLSX_PATH)
+            assert [row[1] for row in rebuilt["indicators"]] == shipped.names
+
+    def test_filter_tool_output(self):
+        output = filter_cba_indicators(component="Biotic", cost="Low", accuracy="High", max_results=2)
+        assert "indicators match; showing 2." in output
+        assert "Cost: Low" in output
@@ -0,0 +1,95 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import aws_clients
+import kb_tool
+
+
+class SlowKB:
+    """Fake KB: each query returns a shared chunk plus one unique chunk."""
+
+    def __init__(self, delay=0.1, fail_on=None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def retrieve(self, **kwargs):
+        text = kwargs["retrievalQuery"]["text"]
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            if self.fail_on and self.fail_on in text:
+                raise RuntimeError("ThrottlingException")
+            return {"retrievalResults": [
+                {"content": {"text": "Soil organic carbon"}, "score": 0.9,
+                 "metadata": {"source": "s3://kb/indicators.xlsx", "x-amz-bedrock-kb-chunk-id": "shared"}},
+                {"content": {"text": f"unique: {text}"}, "score": 0.5,
+                 "metadata": {"source": "s3://kb/methods.xlsx"}},
+            ]}
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+@pytest.fixture(autouse=True)
+def no_cache(monkeypatch):
+    monkeypatch.setattr(kb_tool, "LOCAL_RETRIEVAL_MODE", "off")
+    monkeypatch.setattr(kb_tool, "retrieval_cache", None)
+
+
+class TestProfileSearch:
+    def test_facet_queries(self):
+        queries = kb_tool.profile_facet_queries("Brazil", "coffee", "low", "soil health, farmer income")
+
+        assert list(queries) == ["outcome: soil health", "outcome: farmer income", "budget", "location", "general"]
+        assert queries["location"] == kb_tool.location_query("Brazil", "coffee")
+
+    def test_facets_run_concurrently_and_dedupe(self, monkeypatch):
+        kb = SlowKB(delay=0.2)
+        monkeypatch.setattr(kb_tool, "bedrock_agent_runtime", kb)
+        queries = kb_tool.profile_facet_queries("Brazil", "coffee", "low", "soil health")
+
+        start = time.perf_counter()
+        results, errors = kb_tool.fused_facet_search(queries)
+        elapsed = time.perf_counter() - start
+
+        assert errors == {}
+        assert kb.max_active == len(queries)
+        assert elapsed < 0.2 * len(queries)
+        # The shared chunk is returned once, ranked first, credited to every facet
+        assert [r[0]["content"]["text"] for r in results].count("Soil organic carbon") == 1
+        assert results[0][0]["content"]["text"] == "Soil organic carbon"
+        assert results[0][2] == list(queries)
+        assert len(results) == 1 + len(queries)
+
+    def test_tool_reports_partial_failures(self, monkeypatch):
+        monkeypatch.setattr(kb_tool, "bedrock_agent_runtime", SlowKB(delay=0, fail_on="budget"))
+
+        output = kb_tool.search_project_profile(location="Chad", commodity="cotton", budget_range="low")
+        assert "matched: location, general" in output
+        assert "some facet searches failed (budget)" in output
+
+    def test_tool_requires_profile(self):
+        assert kb_tool.search_project_profile().startswith("Provide at least one")
+
+
+class TestClient:
+    def test_client_is_tuned_for_search(self):
+        config = kb_tool.bedrock_agent_runtime.meta.config
+
+        assert config.retries["mode"] == "adaptive"
+        assert config.read_timeout == aws_clients.CALL_TYPES["search"]["read_timeout"]
+        assert config.max_pool_connections >= kb_tool.FACET_SEARCH_WORKERS
+        assert config.tcp_keepalive is True
+        assert set(kb_tool.get_client_stats()) == {"calls", "errors", "retries", "avg_ms", "max_ms"}
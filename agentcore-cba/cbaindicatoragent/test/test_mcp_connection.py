@@ -0,0 +1,158 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from mcp_client.connection import MCPConnectionManager, is_unsent_failure
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class StubClient:
+    """Context-manager MCP client whose session can be dropped by the server."""
+
+    def __init__(self, tools):
+        self.tools = tools
+        self.sessions = 0
+        self.open = False
+        self.listings = 0
+
+    def __enter__(self):
+        self.sessions += 1
+        self.open = True
+        return self
+
+    def __exit__(self, *exc):
+        self.open = False
+
+    def list_tools_sync(self):
+        if not self.open:
+            raise RuntimeError("session closed")
+        self.listings += 1
+        return list(self.tools)
+
+    def call_tool_sync(self, tool_use_id, name, arguments=None):
+        if not self.open:
+            return {"status": "error", "toolUseId": tool_use_id,
+                    "content": [{"text": "Tool execution failed: Session terminated"}]}
+        return {"status": "success", "toolUseId": tool_use_id, "content": [{"text": f"{name} ok"}]}
+
+
+class TestMCPConnectionManager:
+    def test_connects_once_and_caches_tools(self):
+        stub = StubClient(["a", "b"])
+        manager = MCPConnectionManager(lambda: stub, tools_ttl=60)
+        for _ in range(10):
+            assert manager.list_tools() == ["a", "b"]
+
+        assert stub.sessions == 1
+        assert stub.listings == 1
+        assert manager.stats()["tool_cache_hits"] == 9
+
+    def test_ttl_and_invalidation_refresh_tools(self):
+        clock = FakeClock()
+        stub = StubClient(["a"])
+        manager = MCPConnectionManager(lambda: stub, tools_ttl=60, clock=clock)
+        manager.list_tools()
+
+        stub.tools = ["a", "b"]
+        assert manager.list_tools() == ["a"]
+        clock.now = 61
+        assert manager.list_tools() == ["a", "b"]
+
+        stub.tools = ["c"]
+        manager.invalidate_tools()
+        assert manager.list_tools() == ["c"]
+        assert stub.sessions == 1
+
+    def test_reconnects_lazily_after_failure(self):
+        stub = StubClient(["a"])
+        factory_calls = []
+        manager = MCPConnectionManager(lambda: factory_calls.append(1) or stub, tools_ttl=0)
+        manager.list_tools()
+
+        stub.open = False  # server dropped the session
+        assert manager.list_tools() == ["a"]
+        assert stub.sessions == 2
+        assert len(factory_calls) == 1
+        assert manager.stats()["failures"] == 1
+
+    def test_list_changed_notification_invalidates_tools(self):
+        stub = StubClient(["a"])
+        manager = MCPConnectionManager(lambda: stub, tools_ttl=60)
+        manager.list_tools()
+
+        stub.tools = ["a", "b"]
+        # What MCPClient calls on notifications/tools/list_changed
+        stub.on_tools_changed(["a"], ["a", "b"])
+        assert manager.list_tools() == ["a", "b"]
+
+    def test_tool_call_reconnects_and_retries_once(self):
+        stub = StubClient(["a"])
+        manager = MCPConnectionManager(lambda: stub, tools_ttl=60)
+        manager.client()
+
+        stub.open = False  # server dropped the session
+        result = manager.call_tool_sync(lambda: stub.call_tool_sync("t1", "lookup"))
+        assert result["status"] == "success"
+        assert stub.sessions == 2
+
+        stub.open = False
+        result = asyncio.run(manager.call_tool_async(lambda: asyncio.to_thread(stub.call_tool_sync, "t2", "lookup")))
+        assert result["status"] == "success"
+        assert stub.sessions == 3
+        assert manager.stats()["failures"] == 2
+
+    def test_server_errors_are_not_retried(self):
+        stub = StubClient(["a"])
+        manager = MCPConnectionManager(lambda: stub, tools_ttl=60)
+        manager.client()
+        server_error = {"status": "error", "toolUseId": "t1", "content": [{"text": "Invalid location"}]}
+
+        assert manager.call_tool_sync(lambda: server_error) is server_error
+        assert stub.sessions == 1
+        # Locally cancelled calls aren't retried either
+        assert not is_unsent_failure({"status": "error", "cancelled": True,
+                                      "content": [{"text": "Tool execution failed: cancelled"}]})
+
+    def test_timeout_after_send_is_not_retried(self):
+        stub = StubClient(["a"])
+        manager = MCPConnectionManager(lambda: stub, tools_ttl=60)
+        manager.client()
+        calls = []
+        timeout = {"status": "error", "toolUseId": "t1", "content": [{
+            "text": "Tool execution failed: Timed out while waiting for response to ClientRequest. Waited 30.0 seconds."
+        }]}
+
+        assert manager.call_tool_sync(lambda: calls.append(1) or timeout) is timeout
+
+        def raise_timeout():
+            calls.append(1)
+            raise TimeoutError("read timed out")
+
+        with pytest.raises(TimeoutError):
+            manager.call_tool_sync(raise_timeout)
+        assert len(calls) == 2
+        assert stub.sessions == 1
+        assert manager.stats()["failures"] == 0
+
+    def test_unsent_failures(self):
+        assert is_unsent_failure(RuntimeError("the client session is not running. Ensure the agent is used within"))
+        assert is_unsent_failure(ConnectionRefusedError(111, "Connection refused"))
+        assert is_unsent_failure({"status": "error", "content": [{
+            "text": "Tool execution failed: All connection attempts failed"
+        }]})
+        assert not is_unsent_failure(ConnectionResetError("Connection reset by peer"))
+        assert not is_unsent_failure({"status": "error", "content": [{
+            "text": "Tool execution failed: Session terminated before the request completed"
+        }]})
@@ -0,0 +1,134 @@
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from profiles import ProfileBackend, ProfileStore, ProjectProfile, SQLiteProfileBackend
+
+
+class FlakyBackend(ProfileBackend):
+    def __init__(self):
+        self.saved = {}
+        self.fail = True
+
+    def load(self, session_id):
+        return self.saved.get(session_id)
+
+    def save_many(self, items):
+        if self.fail:
+            raise RuntimeError("unavailable")
+        self.saved.update(items)
+
+
+class BlockingBackend(ProfileBackend):
+    def __init__(self):
+        self.release = threading.Event()
+
+    def load(self, session_id):
+        return None
+
+    def save_many(self, items):
+        self.release.wait(5)
+
+
+@pytest.fixture
+def make_store():
+    """ProfileStore factory; stores are closed after the test so none flush at interpreter exit."""
+    stores = []
+
+    def make(**kwargs):
+        store = ProfileStore(**kwargs)
+        stores.append(store)
+        return store
+
+    yield make
+    for store in stores:
+        store.close()
+
+
+class TestProjectProfile:
+    def test_slots_and_round_trip(self):
+        profile = ProjectProfile(location="Kenya", budget="low")
+        assert not hasattr(profile, "__dict__")
+        assert ProjectProfile.from_dict({**profile.to_dict(), "unknown": 1}) == profile
+
+
+class TestProfileBackend:
+    def test_incomplete_backend_fails_at_construction(self):
+        class LoadOnly(ProfileBackend):
+            def load(self, session_id):
+                return None
+
+        with pytest.raises(TypeError, match="save_many"):
+            LoadOnly()
+
+
+class TestProfileStore:
+    def test_bounded(self):
+        store = ProfileStore(max_sessions=2)
+        for session_id in ("a", "b", "c"):
+            store.get(session_id).location = session_id
+
+        assert len(store) == 2
+        assert store.get("a").location is None
+
+    def test_write_behind_survives_restart(self, tmp_path, make_store):
+        path = str(tmp_path / "profiles.db")
+        store = make_store(backend=SQLiteProfileBackend(path), flush_interval=60)
+        profile = store.get("s1")
+        profile.commodity = "coffee"
+        store.mark_dirty("s1", profile)
+
+        assert store.flush() == 1
+        restarted = make_store(backend=SQLiteProfileBackend(path))
+        assert restarted.get("s1").commodity == "coffee"
+
+    def test_evicted_profile_reloaded_before_flush(self, make_store):
+        store = make_store(max_sessions=1, backend=FlakyBackend(), flush_interval=60)
+        profile = store.get("a")
+        profile.location = "Peru"
+        store.mark_dirty("a", profile)
+        store.get("b")
+
+        assert store.get("a").location == "Peru"
+
+    def test_failed_write_is_retried(self, make_store):
+        backend = FlakyBackend()
+        store = make_store(backend=backend, flush_interval=60)
+        store.mark_dirty("a", ProjectProfile(location="Peru"))
+
+        assert store.flush() == 0
+        assert store.stats()["pending_writes"] == 1
+        backend.fail = False
+        assert store.flush() == 1
+        assert backend.saved["a"]["location"] == "Peru"
+
+    def test_mark_dirty_does_not_block_on_slow_backend(self, make_store):
+        backend = BlockingBackend()
+        store = make_store(backend=backend, flush_interval=0.01)
+        store.mark_dirty("a", ProjectProfile())
+        finished = threading.Event()
+
+        def mark_again():
+            store.mark_dirty("a", ProjectProfile(location="Peru"))
+            finished.set()
+
+        threading.Thread(target=mark_again).start()
+        assert finished.wait(1)
+        backend.release.set()
+
+    def test_close_writes_pending_and_stops_writer(self):
+        backend = FlakyBackend()
+        backend.fail = False
+        store = ProfileStore(backend=backend, flush_interval=0.01)
+        store.mark_dirty("a", ProjectProfile(location="Peru"))
+        writer = store._writer
+
+        store.close()
+        writer.join(1)
+        assert backend.saved["a"]["location"] == "Peru"
+        assert not writer.is_alive()
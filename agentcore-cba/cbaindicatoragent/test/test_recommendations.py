@@ -0,0 +1,131 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from strands import Agent
+from strands.models import Model
+
+import main
+import recommendations
+from catalog import IndicatorCatalog
+from recommendations import RecommendationRecorder, create_recommendation_tool, normalize_indicator
+from sessions import SessionCache
+
+SAMPLE = {
+    "principles": ["1. Natural Environment"],
+    "criteria": ["1.2 Minimize GHG emissions and enhance sinks"],
+    "indicators": [[1, "Soil organic carbon", "tC/ha", "Abiotic", "Soil carbon", [0], [0]]],
+    "methods": [
+        [1, "Soil sampling", "Dry combustion", "High", "Medium", "High"],
+        [1, "Soil sampling", "Loss on ignition", "Medium", "High", "Low"],
+    ],
+}
+
+RECORD = {
+    "id": 1,
+    "name": "Soil organic carbon",
+    "definition": "Carbon stored in the topsoil",
+    "cost": "medium",
+    "accuracy": "High",
+    "ease": "",
+    "methods": [],
+}
+
+
+class RecordingModel(Model):
+    """Records one indicator with record_recommendations, then writes it out."""
+
+    def update_config(self, **model_config):
+        pass
+
+    def get_config(self):
+        return {}
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        raise NotImplementedError
+        yield
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        yield {"messageStart": {"role": "assistant"}}
+        if messages[-1]["content"][0].get("toolResult") is None:
+            yield {"contentBlockStart": {"start": {"toolUse": {"toolUseId": "r1", "name": "record_recommendations"}}}}
+            yield {"contentBlockDelta": {"delta": {"toolUse": {"input": json.dumps({"indicators": [RECORD]})}}}}
+            yield {"contentBlockStop": {}}
+            yield {"messageStop": {"stopReason": "tool_use"}}
+        else:
+            yield {"contentBlockDelta": {"delta": {"text": "1. Soil organic carbon"}}}
+            yield {"contentBlockStop": {}}
+            yield {"messageStop": {"stopReason": "end_turn"}}
+
+
+def use_sample_catalog(monkeypatch):
+    catalog = IndicatorCatalog(SAMPLE)
+    monkeypatch.setattr(recommendations, "get_catalog", lambda: catalog)
+
+
+class TestNormalizeIndicator:
+    def test_completes_record_from_catalog(self, monkeypatch):
+        use_sample_catalog(monkeypatch)
+        indicator = normalize_indicator(RECORD)
+
+        assert indicator["component"] == "Abiotic"
+        assert indicator["class"] == "Soil carbon"
+        assert indicator["principle"] == "1. Natural Environment"
+        assert indicator["criterion"] == "1.2 Minimize GHG emissions and enhance sinks"
+        assert (indicator["cost"], indicator["accuracy"], indicator["ease"]) == ("Medium", "High", "Medium")
+        # No methods recorded: the catalog's methods are used
+        assert [m["name"] for m in indicator["methods"]] == [
+            "Soil sampling - Dry combustion", "Soil sampling - Loss on ignition"
+        ]
+        assert [m["id"] for m in indicator["methods"]] == [1, 2]
+
+    def test_unknown_indicator_keeps_recorded_fields(self, monkeypatch):
+        use_sample_catalog(monkeypatch)
+        indicator = normalize_indicator({
+            "id": 999, "name": "Water use", "methods": [{"name": "Flow meters", "cost": "Low"}]
+        })
+
+        assert indicator["component"] == "Unknown"
+        assert indicator["principle"] == ""
+        assert indicator["methods"] == [{"id": 1, "name": "Flow meters", "cost": "Low", "accuracy": "", "ease": ""}]
+
+
+class TestRecommendationRecorder:
+    def test_take_returns_each_batch_once(self, monkeypatch):
+        use_sample_catalog(monkeypatch)
+        recorder = RecommendationRecorder()
+        assert not recorder.pending and recorder.take() is None
+
+        recorder.record([RECORD])
+        assert recorder.pending
+        assert [i["id"] for i in recorder.take()] == [1]
+        assert recorder.take() is None
+        # The session keeps the latest list after it has been sent
+        assert [i["id"] for i in recorder.indicators] == [1]
+
+    def test_invoke_sends_recorded_frame_before_text(self, monkeypatch):
+        use_sample_catalog(monkeypatch)
+        monkeypatch.setattr(main, "session_agents", SessionCache())
+        monkeypatch.setattr(main, "log_usage", lambda *args: None)
+
+        def build(session_id, mcp_tools):
+            recorder = RecommendationRecorder()
+            agent = Agent(model=RecordingModel(), tools=[create_recommendation_tool(recorder)], callback_handler=None)
+            return main.SessionAgent(agent, recorder)
+
+        monkeypatch.setattr(main, "build_session_agent", build)
+
+        async def run():
+            return [chunk async for chunk in main.invoke({"prompt": "recommend"}, SimpleNamespace(session_id="rec"))]
+
+        chunks = asyncio.run(run())
+        frames = [chunk for chunk in chunks if isinstance(chunk, dict)]
+
+        assert len(frames) == 1
+        assert frames[0]["recommendations"][0]["class"] == "Soil carbon"
+        assert chunks.index(frames[0]) < chunks.index("1. Soil organic carbon")
@@ -0,0 +1,164 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import kb_tool
+from retrieval import HybridRetriever, build_index, save_index
+
+DOCS = [
+    ("Soil organic carbon measured by dry combustion of soil cores", "methods#1"),
+    ("Household income from coffee sales surveyed annually", "methods#2"),
+    ("Species richness of birds counted along transects", "methods#3"),
+    ("Soil bulk density and soil moisture sampling", "methods#4"),
+    ("Water quality: nitrate concentration in streams", "methods#5"),
+]
+
+
+@pytest.fixture
+def retriever(tmp_path):
+    texts, sources = zip(*DOCS)
+    path = tmp_path / "index.npz"
+    save_index(build_index(list(texts), list(sources), dim=4, min_df=1), path)
+    return HybridRetriever.load(path)
+
+
+class FailingKB:
+    def retrieve(self, **kwargs):
+        raise RuntimeError("ThrottlingException")
+
+
+class TestHybridRetriever:
+    def test_search_ranks_relevant_documents(self, retriever):
+        results = retriever.search("soil carbon", max_results=2)
+
+        assert results[0]["metadata"]["source"] == "methods#1"
+        assert len(results) == 2
+        assert results[0]["score"] >= results[1]["score"]
+        # Same shape as Bedrock retrievalResults
+        assert set(results[0]) == {"content", "score", "metadata"}
+
+    def test_unknown_terms_return_nothing(self, retriever):
+        assert retriever.search("zzz qqq") == []
+
+
+class TestRetrievalModes:
+    def test_fallback_uses_local_index_when_kb_fails(self, retriever, monkeypatch):
+        monkeypatch.setattr(kb_tool, "LOCAL_RETRIEVAL_MODE", "fallback")
+        monkeypatch.setattr(kb_tool, "_local_retriever", retriever)
+        monkeypatch.setattr(kb_tool, "bedrock_agent_runtime", FailingKB())
+
+        output = kb_tool.search_cba_indicators("household income coffee", max_results=1)
+        assert "Source: methods#2" in output
+
+    def test_primary_never_calls_kb(self, retriever, monkeypatch):
+        monkeypatch.setattr(kb_tool, "LOCAL_RETRIEVAL_MODE", "primary")
+        monkeypatch.setattr(kb_tool, "_local_retriever", retriever)
+        monkeypatch.setattr(kb_tool, "bedrock_agent_runtime", FailingKB())
+
+        assert kb_tool.retrieve("nitrate water", 1)[0]["metadata"]["source"] == "methods#5"
+
+    def test_off_reports_kb_errors(self, monkeypatch):
+        monkeypatch.setattr(kb_tool, "LOCAL_RETRIEVAL_MODE", "off")
+        monkeypatch.setattr(kb_tool, "bedrock_agent_runtime", FailingKB())
+
+        assert kb_tool.search_cba_indicators("soil").startswith("Error searching knowledge base")
+
+
+class CountingKB:
+    def __init__(self):
+        self.calls = 0
+
+    def retrieve(self, **kwargs):
+        self.calls += 1
+        text = kwargs["retrievalQuery"]["text"]
+        return {"retrievalResults": [{"content": {"text": f"result for {text}"}, "score": 0.9, "metadata": {}}]}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRetrievalCache:
+    def test_normalized_queries_share_entries(self, monkeypatch):
+        kb = CountingKB()
+        monkeypatch.setattr(kb_tool, "LOCAL_RETRIEVAL_MODE", "off")
+        monkeypatch.setattr(kb_tool, "bedrock_agent_runtime", kb)
+        monkeypatch.setattr(kb_tool, "retrieval_cache", kb_tool.RetrievalCache())
+
+        kb_tool.retrieve("Coffee  indicators for Brazil", 5)
+        kb_tool.retrieve("coffee indicators for brazil ", 5)
+        kb_tool.retrieve("coffee indicators for brazil", 3)
+
+        assert kb.calls == 2
+        stats = kb_tool.get_cache_stats()
+        assert (stats["hits"], stats["misses"]) == (1, 2)
+        assert stats["latency_saved_ms"] >= 0
+
+    def test_lru_and_ttl(self):
+        clock = FakeClock()
+        cache = kb_tool.RetrievalCache(ttl_seconds=60, max_entries=2, clock=clock)
+        cache.put("a", [1], 100)
+        cache.put("b", [2], 100)
+        cache.get("a")
+        cache.put("c", [3], 100)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == [1]
+        clock.now += 61
+        assert cache.get("a") is None
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["expirations"] == 1
+
+    def test_persistent_tier_survives_restart(self, tmp_path):
+        path = str(tmp_path / "kb_cache.db")
+        kb_tool.RetrievalCache(path=path).put("k", [{"content": {"text": "x"}}], 250.0)
+
+        restarted = kb_tool.RetrievalCache(path=path)
+        assert restarted.get("k") == [{"content": {"text": "x"}}]
+        stats = restarted.stats()
+        assert stats["persistent_hits"] == 1
+        assert stats["latency_saved_ms"] == 250.0
+
+    def test_persistent_tier_deletes_expired_rows(self, tmp_path):
+        clock = FakeClock()
+        path = str(tmp_path / "kb_cache.db")
+        cache = kb_tool.RetrievalCache(ttl_seconds=60, path=path, clock=clock, purge_every=3)
+        cache.put("a", [1], 100)
+        cache.put("b", [2], 100)
+        clock.now += 61
+
+        # A stale read deletes its row
+        restarted = kb_tool.RetrievalCache(ttl_seconds=60, path=path, clock=clock, purge_every=3)
+        assert restarted.get("a") is None
+        rows = lambda: [row[0] for row in restarted._db.execute("SELECT cache_key FROM kb_cache ORDER BY cache_key")]
+        assert rows() == ["b"]
+
+        # Every third write sweeps the other expired rows
+        restarted.put("c", [3], 100)
+        restarted.put("d", [4], 100)
+        assert rows() == ["b", "c", "d"]
+        restarted.put("e", [5], 100)
+        assert rows() == ["c", "d", "e"]
+        assert restarted.stats()["purged"] == 1
+
+    def test_missing_index_is_a_clear_error(self, monkeypatch):
+        def missing(cls, path=None):
+            raise FileNotFoundError(path)
+
+        monkeypatch.setattr(kb_tool, "_local_retriever", None)
+        monkeypatch.setattr(HybridRetriever, "load", classmethod(missing))
+
+        with pytest.raises(RuntimeError, match="retrieval.py build"):
+            kb_tool.get_local_retriever()
+
+    def test_shipped_index_covers_the_catalog(self):
+        shipped = HybridRetriever.load()
+        assert sum(source.startswith("CBA ME Indicators List.xlsx#Indicators:") for source in shipped.sources) > 100
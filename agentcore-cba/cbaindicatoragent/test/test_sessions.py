@@ -0,0 +1,83 @@
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import main
+from sessions import SessionCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeAgent:
+    instances = 0
+
+    def __init__(self, **kwargs):
+        FakeAgent.instances += 1
+        self.kwargs = kwargs
+
+    async def stream_async(self, prompt):
+        yield {"data": f"echo: {prompt}"}
+        yield {"event": {"metadata": {}}}
+
+
+class TestSessionCache:
+    def test_lru_eviction(self):
+        evicted = []
+        cache = SessionCache(max_sessions=2, on_evict=lambda sid, value: evicted.append(sid))
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert evicted == ["b"]
+        assert cache.get("a") == 1 and cache.get("c") == 3
+
+    def test_idle_eviction(self):
+        clock = FakeClock()
+        cache = SessionCache(idle_seconds=60, clock=clock)
+        cache.put("a", 1)
+        clock.now = 30
+        cache.put("b", 2)
+        clock.now = 61
+
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert cache.stats()["evictions"] == 1
+
+    def test_get_or_create_counts(self):
+        cache = SessionCache()
+        assert cache.get_or_create("s", lambda: "agent") == "agent"
+        assert cache.get_or_create("s", lambda: "other") == "agent"
+        assert (cache.hits, cache.misses) == (1, 1)
+
+
+class TestWarmInvoke:
+    def test_agent_and_model_reused_per_session(self, monkeypatch):
+        monkeypatch.setattr(main, "Agent", FakeAgent)
+        monkeypatch.setattr(main, "MEMORY_ID", None)
+        monkeypatch.setattr(main, "session_agents", SessionCache())
+        FakeAgent.instances = 0
+
+        async def run(session_id, prompt):
+            context = SimpleNamespace(session_id=session_id)
+            return [chunk async for chunk in main.invoke({"prompt": prompt}, context)]
+
+        assert asyncio.run(run("s1", "hi")) == ["echo: hi"]
+        assert asyncio.run(run("s1", "again")) == ["echo: again"]
+        assert FakeAgent.instances == 1
+
+        asyncio.run(run("s2", "hello"))
+        assert FakeAgent.instances == 2
+        agents = [session.agent for _, session in main.session_agents.items()]
+        assert agents[0].kwargs["model"] is agents[1].kwargs["model"]
+        assert agents[0].kwargs["system_prompt"] is main.SYSTEM_PROMPT
@@ -0,0 +1,117 @@
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from mcp_client.auth import TokenManager
+
+
+class TokenEndpoint(BaseHTTPRequestHandler):
+    """Local stand-in for the Cognito /oauth2/token endpoint."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        self.rfile.read(int(self.headers["Content-Length"]))
+        with server.lock:
+            server.requests += 1
+            server.client_ports.add(self.client_address[1])
+            token = f"token-{server.requests}"
+        time.sleep(server.delay)
+        body = json.dumps({"access_token": token, "expires_in": server.expires_in, "token_type": "Bearer"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def endpoint():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), TokenEndpoint)
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.client_ports = set()
+    server.delay = 0.0
+    server.expires_in = 3600
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/oauth2/token"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_manager(endpoint, **kwargs):
+    return TokenManager(endpoint.url, "client", "secret", scope="gateway/invoke", **kwargs)
+
+
+class TestTokenManager:
+    def test_token_is_cached(self, endpoint):
+        manager = make_manager(endpoint)
+        tokens = {manager.get_token() for _ in range(20)}
+
+        assert tokens == {"token-1"}
+        assert endpoint.requests == 1
+
+    def test_concurrent_callers_share_one_refresh(self, endpoint):
+        endpoint.delay = 0.2
+        manager = make_manager(endpoint)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(manager.get_token())) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == ["token-1"] * 16
+        assert endpoint.requests == 1
+
+    def test_refreshes_in_background_before_expiry(self, endpoint):
+        clock = FakeClock()
+        manager = make_manager(endpoint, refresh_margin=60, clock=clock)
+        assert manager.get_token() == "token-1"
+
+        clock.now += 3600 - 30  # inside the refresh margin, still valid
+        assert manager.get_token() == "token-1"
+        deadline = time.time() + 5
+        while manager.refreshes < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        assert manager.get_token() == "token-2"
+        assert endpoint.requests == 2
+
+    def test_expired_token_is_refreshed_synchronously(self, endpoint):
+        clock = FakeClock()
+        manager = make_manager(endpoint, clock=clock)
+        manager.get_token()
+        clock.now += 3601
+
+        assert manager.get_token() == "token-2"
+
+    def test_connections_are_reused(self, endpoint):
+        manager = make_manager(endpoint)
+        for _ in range(5):
+            manager.invalidate()
+            manager.get_token()
+
+        assert endpoint.requests == 5
+        assert len(endpoint.client_ports) == 1
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from strands import Agent, tool
+from strands.models import Model
+
+import kb_tool
+import main
+import usage
+from sessions import SessionCache
+from usage import Usage, tool_snapshot
+
+
+class ScriptedModel(Model):
+    """Answers with a tool call on the first turn and text once the tool result is in."""
+
+    def update_config(self, **model_config):
+        pass
+
+    def get_config(self):
+        return {}
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        raise NotImplementedError
+        yield
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        yield {"messageStart": {"role": "assistant"}}
+        if messages[-1]["content"][0].get("toolResult") is None:
+            yield {"contentBlockStart": {"start": {"toolUse": {"toolUseId": "t1", "name": "kb_search"}}}}
+            yield {"contentBlockDelta": {"delta": {"toolUse": {"input": json.dumps({"query": "soil"})}}}}
+            yield {"contentBlockStop": {}}
+            yield {"messageStop": {"stopReason": "tool_use"}}
+            tokens = (100, 20)
+        else:
+            yield {"contentBlockDelta": {"delta": {"text": "Soil organic carbon"}}}
+            yield {"contentBlockStop": {}}
+            yield {"messageStop": {"stopReason": "end_turn"}}
+            tokens = (150, 30)
+        yield {"metadata": {
+            "usage": {"inputTokens": tokens[0], "outputTokens": tokens[1], "totalTokens": sum(tokens)},
+            "metrics": {"latencyMs": 250},
+        }}
+
+
+@tool
+def kb_search(query: str) -> str:
+    """Search the knowledge base."""
+    kb_tool.fused_facet_search({"a": query, "b": query + " b"})
+    return "results"
+
+
+class StubKnowledgeBase:
+    def retrieve(self, **kwargs):
+        return {"retrievalResults": [{"content": {"text": kwargs["retrievalQuery"]["text"]}}]}
+
+
+def collect(payload, session_id):
+    async def run():
+        return [chunk async for chunk in main.invoke(payload, SimpleNamespace(session_id=session_id))]
+    return asyncio.run(run())
+
+
+class TestUsage:
+    def test_observe_counts_model_metadata(self):
+        u = Usage()
+        u.observe({"data": "text"})
+        u.observe({"event": {"contentBlockStop": {}}})
+        u.observe({"event": {"metadata": {"usage": {"inputTokens": 10, "outputTokens": 5, "totalTokens": 15},
+                                          "metrics": {"latencyMs": 120}}}})
+        result = u.to_dict()
+        assert result["model_calls"] == 1
+        assert result["model_ms"] == 120
+        assert result["tokens"]["input_tokens"] == 10 and result["tokens"]["total_tokens"] == 15
+
+    def test_record_tools_diffs_snapshots(self):
+        u = Usage()
+        u.record_tools({"a": (1, 0, 0.5)}, {"a": (3, 1, 1.0), "b": (1, 0, 0.25)})
+        tools = u.to_dict()["tools"]
+        assert tools == {"a": {"calls": 2, "errors": 1, "total_ms": 500.0},
+                         "b": {"calls": 1, "errors": 0, "total_ms": 250.0}}
+
+    def test_record_kb_only_inside_an_invocation(self):
+        usage.record_kb(5.0)
+        u = Usage()
+        with u.activate():
+            usage.record_kb(10.0)
+            usage.record_kb(2.0, cached=True)
+        usage.record_kb(5.0)
+        kb = u.to_dict()["kb"]
+        assert kb["retrievals"] == 2 and kb["cache_hits"] == 1
+        assert kb["total_ms"] == 12.0 and kb["max_ms"] == 10.0
+
+    def test_merge(self):
+        total = Usage()
+        for _ in range(2):
+            u = Usage(invocations=1)
+            u.record_tool("x", 1, 0, 10.0)
+            u.record_kb(4.0)
+            total.merge(u)
+        result = total.to_dict()
+        assert result["invocations"] == 2
+        assert result["tools"]["x"] == {"calls": 2, "errors": 0, "total_ms": 20.0}
+        assert result["kb"]["retrievals"] == 2
+
+    def test_tool_snapshot_of_agent_without_metrics(self):
+        assert tool_snapshot(object()) == {}
+
+
+class TestInvokeAccounting:
+    @staticmethod
+    def use_scripted_agents(monkeypatch):
+        monkeypatch.setattr(main, "session_agents", SessionCache())
+        monkeypatch.setattr(main, "build_session_agent", lambda session_id, mcp_tools: main.SessionAgent(
+            Agent(model=ScriptedModel(), tools=[kb_search], callback_handler=None)
+        ))
+        monkeypatch.setattr(kb_tool, "bedrock_agent_runtime", StubKnowledgeBase())
+        monkeypatch.setattr(kb_tool, "retrieval_cache", None)
+
+    def test_invocation_and_session_usage(self, monkeypatch):
+        self.use_scripted_agents(monkeypatch)
+        logged = []
+        monkeypatch.setattr(main, "log_usage", lambda *args: logged.append(args))
+
+        chunks = collect({"prompt": "hi", "metadata": True}, "usage-session")
+        metadata = chunks[-1]["metadata"]
+        invocation = metadata["usage"]
+
+        assert "Soil organic carbon" in chunks[:-1]
+        assert invocation["model_calls"] == 2
+        assert invocation["tokens"]["input_tokens"] == 250
+        assert invocation["tokens"]["output_tokens"] == 50
+        assert invocation["tool_calls"] == 1
+        assert invocation["tools"]["kb_search"]["calls"] == 1
+        # Both facet searches ran in pool threads and were still attributed
+        assert invocation["kb"]["retrievals"] == 2
+        assert logged[0][0] == "usage-session" and logged[0][1] == invocation
+
+        collect({"prompt": "again"}, "usage-session")
+        session = logged[-1][2]
+        assert session["invocations"] == 2
+        assert session["model_calls"] == 4
+        assert session["kb"]["retrievals"] == 4
+
+    def test_no_metadata_frame_by_default(self, monkeypatch):
+        self.use_scripted_agents(monkeypatch)
+        monkeypatch.setattr(main, "log_usage", lambda *args: None)
+
+        chunks = collect({"prompt": "hi"}, "plain-session")
+        assert all(isinstance(chunk, str) for chunk in chunks)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Time-to-first-byte benchmark: buffered /chat vs streaming /chat/stream.
+
+Replays a synthetic AgentCore SSE stream with a fixed per-chunk delay and
+reports when the client would see its first byte on each path.
+
+Usage:
+    python benchmarks/bench_chat_ttfb.py [--chunks 200] [--delay-ms 20]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import lambda_function
+
+
+class FakeAgentCore:
+    """Stand-in for the bedrock-agentcore client that emits delayed SSE chunks."""
+
+    def __init__(self, chunks, delay):
+        self.chunks = chunks
+        self.delay = delay
+
+    def invoke_agent_runtime(self, **kwargs):
+        def body():
+            for i in range(self.chunks):
+                time.sleep(self.delay)
+                yield f'data: "token {i} "\n\n'.encode('utf-8')
+        return {'response': body()}
+
+
+def time_buffered(message, session_id):
+    start = time.perf_counter()
+    result = lambda_function.handle_chat({'body': json.dumps({'message': message, 'session_id': session_id})})
+    elapsed = time.perf_counter() - start
+    assert result['statusCode'] == 200
+    # The whole body is returned at once, so first byte == last byte
+    return elapsed, elapsed
+
+
+def time_streaming(message, session_id):
+    start = time.perf_counter()
+    ttfb = None
+    for _ in lambda_function.stream_chat(message, session_id):
+        if ttfb is None:
+            ttfb = time.perf_counter() - start
+    return ttfb, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--chunks', type=int, default=200, help='SSE chunks per response')
+    parser.add_argument('--delay-ms', type=float, default=20.0, help='delay before each chunk')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    lambda_function.agentcore = FakeAgentCore(args.chunks, args.delay_ms / 1000)
+
+    print(f"{args.chunks} chunks x {args.delay_ms:.1f} ms, {args.runs} runs")
+    print(f"{'path':<12}{'TTFB p50 (ms)':>16}{'total p50 (ms)':>16}")
+    for name, fn in (('buffered', time_buffered), ('streaming', time_streaming)):
+        ttfbs, totals = [], []
+        for run in range(args.runs):
+            ttfb, total = fn('What indicators fit coffee in Brazil?', f'bench-{name}-{run}')
+            ttfbs.append(ttfb * 1000)
+            totals.append(total * 1000)
+        print(f"{name:<12}{statistics.median(ttfbs):>16.1f}{statistics.median(totals):>16.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for lambda_function: import time plus first-invocation
+latency of each route, each measured in a fresh interpreter.
+
+boto3 clients are real (so their creation cost is counted), but their HTTP
+requests are answered locally by a botocore before-send hook. The /upload
+route analyzes cba_inputs/Use Case Coffee Brazil.pdf, whose fields are all
+found without a model call.
+
+Exits with status 1 if the median import + first call of any route exceeds
+its threshold (--threshold route=ms overrides a default).
+
+Usage:
+    python benchmarks/bench_cold_start.py [--runs 5] [--threshold options=150]
+"""
+
+import argparse
+import base64
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PDF_PATH = os.path.join(ROOT, 'cba_inputs', 'Use Case Coffee Brazil.pdf')
+
+# Median import + first call (ms) above which a route counts as regressed.
+# Set well above measured values (1 vCPU): importing boto3 and creating a
+# client is ~250 ms, pypdf ~100 ms.
+THRESHOLDS = {
+    'options': 150,
+    'recommendations': 150,
+    'chat': 700,
+    'presign': 700,
+    'upload': 1200,
+}
+
+
+def route_event(route):
+    if route == 'options':
+        return {'rawPath': '/prod/chat', 'requestContext': {'http': {'method': 'OPTIONS'}}}
+    if route == 'recommendations':
+        return {
+            'rawPath': '/prod/recommendations', 'requestContext': {'http': {'method': 'GET'}},
+            'queryStringParameters': {'session_id': 'bench'}
+        }
+    if route == 'chat':
+        return {
+            'rawPath': '/prod/chat', 'requestContext': {'http': {'method': 'POST'}},
+            'body': json.dumps({'message': 'Indicators for coffee in Brazil?', 'session_id': 'bench-' + '0' * 32})
+        }
+    if route == 'presign':
+        return {'rawPath': '/prod/upload/presign', 'requestContext': {'http': {'method': 'POST'}}, 'body': '{}'}
+    if route == 'upload':
+        with open(PDF_PATH, 'rb') as f:
+            body = base64.b64encode(f.read()).decode()
+        return {
+            'rawPath': '/prod/upload', 'requestContext': {'http': {'method': 'POST'}},
+            'body': body, 'isBase64Encoded': True
+        }
+    raise ValueError(route)
+
+
+def answer_locally(client):
+    """Answer every request of a boto3 client in-process instead of over HTTP."""
+    from botocore.awsrequest import AWSResponse
+
+    class Raw:
+        def __init__(self, body):
+            self.body = body
+
+        def stream(self, **kwargs):
+            yield self.body
+
+        def read(self, *args, **kwargs):
+            body, self.body = self.body, b''
+            return body
+
+    def send(request, **kwargs):
+        if client.meta.service_model.service_name == 'bedrock-agentcore':
+            headers, body = {'Content-Type': 'text/event-stream'}, b'data: "Soil organic carbon"\n\n'
+        else:
+            headers, body = {}, b''
+        return AWSResponse(request.url, 200, headers, Raw(body))
+
+    client.meta.events.register('before-send', send)
+    return client
+
+
+def child(route):
+    """Run one route in this (fresh) interpreter and print timings as JSON."""
+    os.environ.setdefault('AWS_ACCESS_KEY_ID', 'bench')
+    os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'bench')
+    event = route_event(route)
+    sys.path.insert(0, ROOT)
+
+    start = time.perf_counter()
+    import lambda_function
+    imported = time.perf_counter()
+
+    create_client = lambda_function.create_client
+    lambda_function.create_client = lambda *args, **kwargs: answer_locally(create_client(*args, **kwargs))
+
+    first_start = time.perf_counter()
+    result = lambda_function.lambda_handler(event, None)
+    first_end = time.perf_counter()
+    lambda_function.lambda_handler(event, None)
+    warm = time.perf_counter() - first_end
+
+    assert result['statusCode'] < 500, result
+    print(json.dumps({
+        'import': (imported - start) * 1000,
+        'first': (first_end - first_start) * 1000,
+        'warm': warm * 1000,
+        'modules': sorted(name for name in ('boto3', 'pypdf') if name in sys.modules),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--threshold', action='append', default=[], metavar='ROUTE=MS')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args.child)
+
+    thresholds = dict(THRESHOLDS)
+    for item in args.threshold:
+        route, ms = item.split('=')
+        thresholds[route] = float(ms)
+
+    print(f"{'route':<18}{'import (ms)':>12}{'1st call (ms)':>15}{'total (ms)':>12}{'warm (ms)':>11}"
+          f"{'limit':>8}  loaded")
+    regressed = []
+    for route in THRESHOLDS:
+        samples = []
+        for _ in range(args.runs):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--child', route],
+                check=True, capture_output=True, text=True
+            ).stdout
+            samples.append(json.loads(output.strip().splitlines()[-1]))
+        imported = statistics.median(s['import'] for s in samples)
+        first = statistics.median(s['first'] for s in samples)
+        total = statistics.median(s['import'] + s['first'] for s in samples)
+        warm = statistics.median(s['warm'] for s in samples)
+        flag = '' if total <= thresholds[route] else '  REGRESSED'
+        if flag:
+            regressed.append(route)
+        print(f"{route:<18}{imported:>12.1f}{first:>15.1f}{total:>12.1f}{warm:>11.1f}"
+              f"{thresholds[route]:>8.0f}  {','.join(samples[-1]['modules']) or '-'}{flag}")
+
+    if regressed:
+        print(f"\nCold start over threshold: {', '.join(regressed)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
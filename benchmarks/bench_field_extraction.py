@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark: deterministic upload field extraction (cba_api/fields.py) on the
+PDFs in cba_inputs/.
+
+For each document, prints the extracted location, commodity and budget with
+their confidences, the extractor's run time and which fields would still be
+sent to Claude. The summary gives the share of uploads and of fields that no
+longer need a model call, and the estimated analysis latency saved, using
+--llm-ms as the latency of one Sonnet call.
+
+Usage:
+    python benchmarks/bench_field_extraction.py [--threshold 0.6] [--llm-ms 4000] [--runs 20]
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from cba_api.fields import FIELD_CONFIDENCE_THRESHOLD, FIELD_NAMES, confident_fields, extract_fields
+from cba_api.pdf import extract_text
+
+CHAR_BUDGET = 60000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threshold', type=float, default=FIELD_CONFIDENCE_THRESHOLD)
+    parser.add_argument('--llm-ms', type=float, default=4000, help='assumed latency of one Claude call')
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    documents = []
+    for path in sorted(glob.glob(os.path.join(ROOT, 'cba_inputs', '*.pdf'))):
+        with open(path, 'rb') as f:
+            documents.append((os.path.basename(path), extract_text(f.read(), max_chars=CHAR_BUDGET)))
+
+    avoided_calls = resolved_fields = 0
+    extractor_ms = []
+    for name, text in documents:
+        times = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            extracted = extract_fields(text)
+            times.append((time.perf_counter() - start) * 1000)
+        ms = statistics.median(times)
+        extractor_ms.append(ms)
+        resolved, missing = confident_fields(extracted, args.threshold)
+        avoided_calls += not missing
+        resolved_fields += len(resolved)
+
+        print(f"{name}  ({len(text)} chars, {ms:.1f} ms)")
+        for field in FIELD_NAMES:
+            result = extracted[field]
+            source = 'claude' if field in missing else 'local'
+            print(f"    {field:<10} {str(result['value']):<40} {result['confidence']:>5.2f}  {source}")
+
+    count = len(documents)
+    print()
+    print(f"{'uploads without a Claude call':<36}{avoided_calls}/{count} ({avoided_calls / count:.0%})")
+    print(f"{'fields resolved locally':<36}{resolved_fields}/{count * len(FIELD_NAMES)}"
+          f" ({resolved_fields / (count * len(FIELD_NAMES)):.0%})")
+    print(f"{'median extractor time':<36}{statistics.median(extractor_ms):.1f} ms")
+    # Every upload used to make one call; now only those with missing fields do
+    saved = avoided_calls * args.llm_ms - sum(extractor_ms)
+    print(f"{'mean analysis latency saved':<36}{saved / count:.0f} ms/upload (at {args.llm_ms:.0f} ms per call)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark: streaming indicator extractor vs the original regex-based
+extract_indicators_from_response on long responses with 50+ indicators.
+
+Also reports how many indicators each implementation attributes correctly
+when indicator names repeat across blocks.
+
+Usage:
+    python benchmarks/bench_indicator_extractor.py [--indicators 60] [--runs 20]
+"""
+
+import argparse
+import os
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cba_api.indicators import IndicatorExtractor, extract_indicators
+
+LEVELS = ('High', 'Medium', 'Low')
+
+
+def build_response(count):
+    """Synthetic agent response; names repeat every 10 indicators."""
+    blocks = ["Here are the indicators that fit your coffee project in Minas Gerais.\n"]
+    expected = []
+    for n in range(1, count + 1):
+        accuracy, cost, ease = LEVELS[n % 3], LEVELS[(n + 1) % 3], LEVELS[(n + 2) % 3]
+        expected.append((n, accuracy, cost, ease))
+        blocks.append(
+            f"\n**INDICATOR #{n}**\n"
+            f"- **ID:** {n}\n"
+            f"- **Name:** Indicator family {n % 10}\n"
+            f"- **Definition:** Measures outcome {n} for smallholder coffee farms,\n"
+            f"  including soil, water and income dimensions. " + "Detail. " * 40 + "\n"
+            f"Why it matters: aligns with your stated outcomes.\n"
+            f"Recommended method: field survey with {n} plots.\n"
+            f"Attributes:\n- Accuracy: {accuracy}\n- Cost: {cost}\n- Ease of Use: {ease}\n"
+        )
+    return ''.join(blocks), expected
+
+
+def legacy_extract(response_text):
+    """The original regex implementation, kept here for comparison only."""
+    indicators = []
+    indicator_pattern = r'INDICATOR #(\d+).*?ID:\s*([^\n]+).*?Name:\s*([^\n]+).*?(?:Full Definition|Definition):\s*([^\n]+(?:\n(?!Recommended|Why|Attributes|Mapping|DOI)[^\n]+)*)'
+    matches = re.findall(indicator_pattern, response_text, re.DOTALL | re.IGNORECASE)
+    for match in matches:
+        indicator = {'id': int(match[1].strip().strip('*').strip()) if match[1].strip().strip('*').strip().isdigit() else 0,
+                     'name': match[2].strip(), 'cost': 'Medium', 'accuracy': 'Medium', 'ease': 'Medium'}
+        attr_match = re.search(r'Accuracy:\s*(\w+)', response_text[response_text.find(match[2]):])
+        if attr_match:
+            indicator['accuracy'] = attr_match.group(1)
+        cost_match = re.search(r'Cost:\s*(\w+)', response_text[response_text.find(match[2]):])
+        if cost_match:
+            indicator['cost'] = cost_match.group(1)
+        ease_match = re.search(r'Ease[^:]*:\s*(\w+)', response_text[response_text.find(match[2]):])
+        if ease_match:
+            indicator['ease'] = ease_match.group(1)
+        indicators.append(indicator)
+    return indicators
+
+
+def streaming_extract(response_text, chunk_size=64):
+    extractor = IndicatorExtractor()
+    for i in range(0, len(response_text), chunk_size):
+        extractor.feed(response_text[i:i + chunk_size])
+    return extractor.close()
+
+
+def correct_count(indicators, expected):
+    by_position = {n: (accuracy, cost, ease) for n, accuracy, cost, ease in expected}
+    return sum(
+        1 for position, ind in enumerate(indicators, 1)
+        if by_position.get(position) == (ind['accuracy'], ind['cost'], ind['ease'])
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--indicators', type=int, default=60)
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    text, expected = build_response(args.indicators)
+    print(f"{args.indicators} indicators, {len(text) / 1000:.0f} kB response, {args.runs} runs")
+    print(f"{'extractor':<26}{'p50 (ms)':>10}{'found':>8}{'correct attrs':>15}")
+    for name, fn in (('legacy regex', legacy_extract),
+                     ('state machine (whole)', extract_indicators),
+                     ('state machine (64B feed)', streaming_extract)):
+        times = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            result = fn(text)
+            times.append((time.perf_counter() - start) * 1000)
+        print(f"{name:<26}{statistics.median(times):>10.2f}{len(result):>8}{correct_count(result, expected):>15}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark: what Claude is sent for upload analysis, the first 15000
+characters of the document (the original prompt) vs relevance-ranked
+passages packed into a token budget (cba_api/passages.py).
+
+"Fields found" counts the fields that the deterministic extractor
+(cba_api/fields.py) finds in the text sent, out of those it finds in the
+whole document: a proxy for what the model can answer on the first try.
+
+The cba_inputs/ use cases are short, so each is also wrapped into a long
+report: cover page and table of contents, --filler pages of background
+text, the use case, and a budget annex at the end.
+
+Usage:
+    python benchmarks/bench_passage_selection.py [--budgets 1000,2000,3000] [--filler 10]
+"""
+
+import argparse
+import glob
+import os
+import re
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from cba_api.fields import confident_fields, extract_fields
+from cba_api.passages import estimate_tokens, select_passages
+from cba_api.pdf import extract_text
+
+HEAD_CHARS = 15000
+EXTRACT_CHARS = 60000
+
+TOC = '\n'.join(
+    f'{n}. {title} ' + '.' * 40 + f' {page}'
+    for n, (title, page) in enumerate([
+        ('Executive summary', 3), ('Background', 5), ('Location and context', 12),
+        ('Commodity systems', 15), ('Activities', 18), ('Monitoring', 24), ('Budget', 30),
+    ], 1)
+)
+BUDGET_ANNEX = (
+    'Annex 1: Budget\n\n'
+    'The total project budget is USD 1.8 million over four years, of which 60% funds '
+    'field activities, 25% monitoring and evaluation, and 15% coordination.'
+)
+
+
+def long_report(use_case, background, filler_pages):
+    filler = (background * (filler_pages * 3000 // max(len(background), 1) + 1))[:filler_pages * 3000]
+    return '\n\n'.join(['Living Lab Project Report', TOC, filler, use_case, BUDGET_ANNEX])
+
+
+def _terms(value):
+    # "Lac and Logone Occidental, Chad" and "Logone Occidental and Lac, Chad" are the same answer
+    return sorted(re.split(r', | and ', value or ''))
+
+
+def fields_found(sent, truth):
+    resolved, _ = confident_fields(extract_fields(sent))
+    return sum(1 for name in truth if _terms(resolved.get(name)) == _terms(truth[name]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budgets', default='1000,2000,3000', help='token budgets to compare')
+    parser.add_argument('--filler', type=int, default=10, help='pages of background in the long reports')
+    args = parser.parse_args()
+    budgets = [int(b) for b in args.budgets.split(',')]
+
+    texts = {}
+    for path in sorted(glob.glob(os.path.join(ROOT, 'cba_inputs', '*.pdf'))):
+        with open(path, 'rb') as f:
+            texts[os.path.basename(path)] = extract_text(f.read(), max_chars=EXTRACT_CHARS)
+    background = texts.get('CBA ME Background.pdf', '')
+    documents = list(texts.items())
+    for name, text in texts.items():
+        if name != 'CBA ME Background.pdf':
+            documents.append((f'{name} (long report)', long_report(text, background, args.filler)))
+
+    strategies = [(f'first {HEAD_CHARS} chars', lambda text: text[:HEAD_CHARS])]
+    strategies += [(f'passages @{b} tok', lambda text, b=b: select_passages(text, token_budget=b)) for b in budgets]
+
+    totals = {name: [0, 0, []] for name, _ in strategies}
+    present = 0
+    print(f"{'document':<52}{'strategy':<22}{'tokens':>8}{'found':>8}{'ms':>8}")
+    for name, text in documents:
+        resolved, _ = confident_fields(extract_fields(text))
+        truth = {field: value for field, value in resolved.items() if value is not None}
+        present += len(truth)
+        for strategy, select in strategies:
+            start = time.perf_counter()
+            sent = select(text)
+            ms = (time.perf_counter() - start) * 1000
+            tokens, found = estimate_tokens(sent), fields_found(sent, truth)
+            totals[strategy][0] += tokens
+            totals[strategy][1] += found
+            totals[strategy][2].append(ms)
+            print(f"{name[:50]:<52}{strategy:<22}{tokens:>8}{f'{found}/{len(truth)}':>8}{ms:>8.1f}")
+        print()
+
+    print(f"{'total':<52}{'strategy':<22}{'tokens':>8}{'found':>8}{'ms':>8}")
+    for strategy, (tokens, found, times) in totals.items():
+        print(f"{'':<52}{strategy:<22}{tokens:>8}{f'{found}/{present}':>8}{statistics.median(times):>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark: full-document PDF extraction (the original handle_upload loop)
+vs lazy extraction that stops at the 60000-character analysis budget, with
+and without a process pool.
+
+Runs over the PDFs in cba_inputs/. Those are short (5-9 pages), so each is
+also repeated to --pages pages to stand in for long project reports.
+
+Usage:
+    python benchmarks/bench_pdf_extraction.py [--pages 200] [--workers 4] [--runs 3]
+"""
+
+import argparse
+import glob
+import io
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from pypdf import PdfReader, PdfWriter
+
+from cba_api.pdf import extract_text
+
+CHAR_BUDGET = 60000
+
+
+def legacy_extract(data):
+    reader = PdfReader(io.BytesIO(data))
+    return "\n".join(text for text in (page.extract_text() for page in reader.pages) if text)
+
+
+def repeat_pages(data, pages):
+    """Build a pages-long PDF by cycling through the pages of data."""
+    reader = PdfReader(io.BytesIO(data))
+    writer = PdfWriter()
+    for i in range(pages):
+        writer.add_page(reader.pages[i % len(reader.pages)])
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+def timed(fn, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=200, help='pages in the synthetic long report (0 to skip)')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    documents = []
+    for path in sorted(glob.glob(os.path.join(ROOT, 'cba_inputs', '*.pdf'))):
+        with open(path, 'rb') as f:
+            data = f.read()
+        documents.append((os.path.basename(path), data))
+        if args.pages:
+            documents.append((f"{os.path.basename(path)} x{args.pages}p", repeat_pages(data, args.pages)))
+
+    modes = (
+        ('full', lambda data: legacy_extract(data)),
+        ('lazy', lambda data: extract_text(data, max_chars=CHAR_BUDGET)),
+        (f'lazy+{args.workers}p', lambda data: extract_text(data, max_chars=CHAR_BUDGET, workers=args.workers)),
+        (f'full+{args.workers}p', lambda data: extract_text(data, workers=args.workers)),
+    )
+    print(f"{'document':<48}" + ''.join(f"{name + ' (ms)':>16}" for name, _ in modes) + f"{'chars full/lazy':>18}")
+    for name, data in documents:
+        row, chars = [], []
+        for _, fn in modes:
+            ms, text = timed(lambda: fn(data), args.runs)
+            row.append(ms)
+            chars.append(len(text))
+        print(f"{name:<48}" + ''.join(f"{ms:>16.1f}" for ms in row) + f"{f'{chars[0]}/{chars[1]}':>18}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Offline end-to-end replay benchmark: recorded coffee and cotton
+conversations (benchmarks/recordings/) through lambda_function.lambda_handler
+and the agent's main.invoke, with the AWS calls answered by the local
+stand-ins in benchmarks/local_aws.py.
+
+Routes, each run in a fresh interpreter so peak RSS is per route:
+
+  chat             POST /chat for every turn
+  chat_stream      POST /chat/stream through the WSGI app; TTFB is the
+                   first SSE frame
+  recommendations  GET /recommendations once per turn, after the session's
+                   turns have been stored
+  upload           POST /upload of the session's PDF; the upload cache is
+                   disabled so every upload is analyzed
+  agent            main.invoke with a model replaying the recorded turns
+                   (including its Knowledge Base tool calls) and a fake KB
+                   retrieve; the retrieval cache is disabled
+
+Sessions alternate between the recordings and replay their turns in order;
+--concurrency sessions run at once (threads for the Lambda routes, asyncio
+tasks for the agent). Latency percentiles use the nearest-rank method.
+
+Usage:
+    python benchmarks/bench_replay.py [--sessions 16] [--concurrency 4] [--routes chat,agent]
+        [--first-chunk-ms 300] [--chunk-ms 5] [--s3-ms 30] [--model-ms 1500] [--kb-ms 80]
+"""
+
+import argparse
+import asyncio
+import base64
+import contextlib
+import io
+import json
+import math
+import os
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AGENT_SRC = os.path.join(ROOT, 'agentcore-cba', 'cbaindicatoragent', 'src')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from local_aws import (
+    FakeAgentCore, FakeBedrockRuntime, FakeKnowledgeBase, FakeS3, load_recordings, turns_by_message
+)
+
+ROUTES = ('chat', 'chat_stream', 'recommendations', 'upload', 'agent')
+
+
+def percentile(samples, q):
+    """Nearest-rank percentile of a list of samples."""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))]
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def session_id(index):
+    # AgentCore runtime session ids are at least 33 characters
+    return f'replay-{index:033d}'
+
+
+def sessions(recordings, count):
+    """(session id, recording) pairs alternating between the recordings."""
+    names = sorted(recordings)
+    return [(session_id(i), recordings[names[i % len(names)]]) for i in range(count)]
+
+
+class NoCache:
+    """Upload cache that never hits, so every upload is analyzed."""
+
+    def get(self, key):
+        return None
+
+    def put(self, key, value, expires_at=None):
+        pass
+
+
+def post(path, body, **extra):
+    return {'rawPath': f'/prod{path}', 'requestContext': {'http': {'method': 'POST'}}, 'body': body, **extra}
+
+
+# ---------------------------------------------------------------------------
+# Lambda routes
+# ---------------------------------------------------------------------------
+
+def setup_lambda(args, recordings):
+    import lambda_function
+    from cba_api.store import MemoryStore
+
+    lambda_function.agentcore = FakeAgentCore(recordings, args.first_chunk_ms / 1000, args.chunk_ms / 1000)
+    lambda_function.s3 = FakeS3(args.s3_ms / 1000)
+    lambda_function.bedrock_runtime = FakeBedrockRuntime(recordings, args.model_ms / 1000)
+    lambda_function.recommendations_store = MemoryStore()
+    lambda_function.upload_status_store = MemoryStore()
+    lambda_function.upload_cache = NoCache()
+    if args.model_fields:
+        lambda_function.FIELD_CONFIDENCE_THRESHOLD = 1.01
+    return lambda_function
+
+
+def timed(fn, *fn_args):
+    """Run fn and return (latency ms, None, ok)."""
+    start = time.perf_counter()
+    result = fn(*fn_args)
+    return (time.perf_counter() - start) * 1000, None, result['statusCode'] == 200
+
+
+def replay_chat(lambda_function, sid, recording):
+    return [
+        timed(lambda_function.lambda_handler,
+              post('/chat', json.dumps({'message': turn['message'], 'session_id': sid})), None)
+        for turn in recording['turns']
+    ]
+
+
+def replay_chat_stream(lambda_function, sid, recording):
+    samples = []
+    for turn in recording['turns']:
+        body = json.dumps({'message': turn['message'], 'session_id': sid}).encode()
+        environ = {
+            'REQUEST_METHOD': 'POST', 'PATH_INFO': '/prod/chat/stream',
+            'CONTENT_LENGTH': str(len(body)), 'wsgi.input': io.BytesIO(body),
+        }
+        status = []
+        start = time.perf_counter()
+        ttfb = None
+        frames = b''
+        for frame in lambda_function.chat_stream_app(environ, lambda s, headers: status.append(s)):
+            if ttfb is None:
+                ttfb = (time.perf_counter() - start) * 1000
+            frames += frame
+        elapsed = (time.perf_counter() - start) * 1000
+        samples.append((elapsed, ttfb, status[0].startswith('200') and b'event: done' in frames))
+    return samples
+
+
+def replay_recommendations(lambda_function, sid, recording):
+    event = {
+        'rawPath': '/prod/recommendations', 'requestContext': {'http': {'method': 'GET'}},
+        'queryStringParameters': {'session_id': sid}
+    }
+    samples = []
+    for _ in recording['turns']:
+        latency, _, ok = timed(lambda_function.lambda_handler, event, None)
+        samples.append((latency, None, ok))
+    return samples
+
+
+def replay_upload(lambda_function, sid, recording, documents):
+    return [timed(lambda_function.lambda_handler,
+                  post('/upload', documents[recording['document']], isBase64Encoded=True), None)]
+
+
+def run_lambda_route(route, args, recordings):
+    lambda_function = setup_lambda(args, recordings)
+    pairs = sessions(recordings, args.sessions)
+
+    if route == 'chat':
+        replay = lambda sid, rec: replay_chat(lambda_function, sid, rec)
+    elif route == 'chat_stream':
+        replay = lambda sid, rec: replay_chat_stream(lambda_function, sid, rec)
+    elif route == 'recommendations':
+        # Store every session's recommendations first (untimed, no delays)
+        agentcore = lambda_function.agentcore
+        lambda_function.agentcore = FakeAgentCore(recordings)
+        for sid, rec in pairs:
+            replay_chat(lambda_function, sid, rec)
+        lambda_function.agentcore = agentcore
+        replay = lambda sid, rec: replay_recommendations(lambda_function, sid, rec)
+    else:
+        documents = {}
+        for rec in recordings.values():
+            with open(os.path.join(ROOT, 'cba_inputs', rec['document']), 'rb') as f:
+                documents[rec['document']] = base64.b64encode(f.read()).decode()
+        replay = lambda sid, rec: replay_upload(lambda_function, sid, rec, documents)
+
+    def run_session(pair):
+        try:
+            return replay(*pair)
+        except Exception:
+            return [(0.0, None, False)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(run_session, pairs))
+    return [sample for samples in results for sample in samples], time.perf_counter() - start
+
+
+# ---------------------------------------------------------------------------
+# Agent route
+# ---------------------------------------------------------------------------
+
+def replay_model(recordings, first_chunk_delay, chunk_delay):
+    """A strands model that replays each turn's recorded tool calls and text."""
+    from strands.models import Model
+
+    turns = turns_by_message(recordings)
+
+    def prompt_of(messages):
+        for message in reversed(messages):
+            if message['role'] == 'user':
+                for block in message['content']:
+                    if 'text' in block:
+                        return block['text']
+        return ''
+
+    class ReplayModel(Model):
+        def update_config(self, **model_config):
+            pass
+
+        def get_config(self):
+            return {}
+
+        async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+            raise NotImplementedError
+            yield
+
+        async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+            turn = turns[prompt_of(messages)]
+            answered = any('toolResult' in block for block in messages[-1]['content'])
+            await asyncio.sleep(first_chunk_delay)
+            yield {'messageStart': {'role': 'assistant'}}
+            output = 0
+            if turn['tool_calls'] and not answered:
+                for i, call in enumerate(turn['tool_calls']):
+                    yield {'contentBlockStart': {'start': {'toolUse': {'toolUseId': f'tool-{i}', 'name': call['name']}}}}
+                    yield {'contentBlockDelta': {'delta': {'toolUse': {'input': json.dumps(call['input'])}}}}
+                    yield {'contentBlockStop': {}}
+                yield {'messageStop': {'stopReason': 'tool_use'}}
+            else:
+                for i, chunk in enumerate(turn['chunks']):
+                    if i and chunk_delay:
+                        await asyncio.sleep(chunk_delay)
+                    output += len(chunk)
+                    yield {'contentBlockDelta': {'delta': {'text': chunk}}}
+                yield {'contentBlockStop': {}}
+                yield {'messageStop': {'stopReason': 'end_turn'}}
+            input_tokens = sum(len(json.dumps(m)) for m in messages) // 4
+            yield {'metadata': {
+                'usage': {'inputTokens': input_tokens, 'outputTokens': output // 4,
+                          'totalTokens': input_tokens + output // 4},
+                'metrics': {'latencyMs': 0},
+            }}
+
+    return ReplayModel()
+
+
+def run_agent_route(args, recordings):
+    import logging
+    from types import SimpleNamespace
+
+    os.environ.pop('BEDROCK_AGENTCORE_MEMORY_ID', None)
+    os.environ.pop('GATEWAY_URL', None)
+    sys.path.insert(0, AGENT_SRC)
+    import kb_tool
+    import main
+
+    logging.disable(logging.WARNING)
+    kb_tool.bedrock_agent_runtime = FakeKnowledgeBase(recordings, args.kb_ms / 1000)
+    kb_tool.retrieval_cache = None
+    main._model = replay_model(recordings, args.first_chunk_ms / 1000, args.chunk_ms / 1000)
+
+    async def turn(sid, message):
+        start = time.perf_counter()
+        ttfb = None
+        text = []
+        async for chunk in main.invoke({'prompt': message}, SimpleNamespace(session_id=sid)):
+            if ttfb is None and isinstance(chunk, str):
+                ttfb = (time.perf_counter() - start) * 1000
+            if isinstance(chunk, str):
+                text.append(chunk)
+        return (time.perf_counter() - start) * 1000, ttfb, bool(text)
+
+    async def run():
+        limit = asyncio.Semaphore(args.concurrency)
+
+        async def run_session(sid, rec):
+            async with limit:
+                try:
+                    return [await turn(sid, t['message']) for t in rec['turns']]
+                except Exception:
+                    return [(0.0, None, False)]
+
+        results = await asyncio.gather(*(run_session(sid, rec) for sid, rec in sessions(recordings, args.sessions)))
+        return [sample for samples in results for sample in samples]
+
+    start = time.perf_counter()
+    samples = asyncio.run(run())
+    return samples, time.perf_counter() - start
+
+
+# ---------------------------------------------------------------------------
+
+def child(route, args):
+    """Run one route in this (fresh) interpreter and print its results as JSON."""
+    os.environ.setdefault('AWS_ACCESS_KEY_ID', 'bench')
+    os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'bench')
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-west-2')
+    recordings = load_recordings()
+    # Keep EMF metric lines out of the result line
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        if route == 'agent':
+            samples, wall = run_agent_route(args, recordings)
+        else:
+            samples, wall = run_lambda_route(route, args, recordings)
+    print(json.dumps({
+        'latencies': [s[0] for s in samples if s[2]],
+        'ttfb': [s[1] for s in samples if s[2] and s[1] is not None],
+        'errors': sum(1 for s in samples if not s[2]),
+        'wall': wall,
+        'rss_mb': peak_rss_mb(),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=16, help='conversations replayed per route')
+    parser.add_argument('--concurrency', type=int, default=4, help='sessions in flight at once')
+    parser.add_argument('--routes', default=','.join(ROUTES), help=f"comma-separated subset of {','.join(ROUTES)}")
+    parser.add_argument('--first-chunk-ms', type=float, default=300, help='model/agent delay before the first chunk')
+    parser.add_argument('--chunk-ms', type=float, default=5, help='delay between streamed chunks')
+    parser.add_argument('--s3-ms', type=float, default=30, help='latency of each S3 request')
+    parser.add_argument('--model-ms', type=float, default=1500, help='latency of invoke_model')
+    parser.add_argument('--kb-ms', type=float, default=80, help='latency of each Knowledge Base retrieve')
+    parser.add_argument('--model-fields', action='store_true',
+                        help='send every upload field to invoke_model instead of extracting it locally')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args.child, args)
+
+    routes = [r for r in args.routes.split(',') if r]
+    unknown = set(routes) - set(ROUTES)
+    if unknown:
+        parser.error(f"unknown routes: {', '.join(sorted(unknown))}")
+
+    print(f"{args.sessions} sessions ({', '.join(sorted(load_recordings()))}), concurrency {args.concurrency}; "
+          f"first chunk {args.first_chunk_ms:.0f} ms, chunk {args.chunk_ms:.0f} ms, S3 {args.s3_ms:.0f} ms, "
+          f"model {args.model_ms:.0f} ms, KB {args.kb_ms:.0f} ms")
+    print(f"{'route':<17}{'requests':>9}{'errors':>7}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}"
+          f"{'TTFB p50':>10}{'req/s':>8}{'peak RSS (MB)':>15}")
+    for route in routes:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), *sys.argv[1:], '--child', route],
+            check=True, capture_output=True, text=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        latencies = result['latencies']
+        count = len(latencies) + result['errors']
+        if latencies:
+            p50, p95, p99 = (f"{percentile(latencies, q):>10.1f}" for q in (50, 95, 99))
+        else:
+            p50 = p95 = p99 = f"{'-':>10}"
+        ttfb = f"{percentile(result['ttfb'], 50):>10.1f}" if result['ttfb'] else f"{'-':>10}"
+        print(f"{route:<17}{count:>9}{result['errors']:>7}{p50}{p95}{p99}{ttfb}"
+              f"{count / result['wall']:>8.1f}{result['rss_mb']:>15.1f}")
+
+
+if __name__ == '__main__':
+    main()
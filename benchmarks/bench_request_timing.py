@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Overhead of per-request stage timing (cba_api/timing.py): lambda_handler
+with REQUEST_METRICS on (Server-Timing header + EMF log line) vs off.
+
+Routes run against in-process fakes with no network latency, so overhead
+relative to the fake is a worst case; real /chat and /upload requests take
+seconds, so overhead is also shown relative to --typical-ms. EMF output
+goes to /dev/null during timing.
+
+Usage:
+    python benchmarks/bench_request_timing.py [--requests 200] [--chunks 200]
+"""
+
+import argparse
+import base64
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import lambda_function
+from cba_api.store import MemoryStore
+
+PDF_PATH = os.path.join(ROOT, 'cba_inputs', 'Use Case Coffee Brazil.pdf')
+
+
+class FakeAgentCore:
+    def __init__(self, chunks):
+        text = 'INDICATOR #1\nID: 42\nName: Soil organic carbon\nDefinition: Carbon stored in soil\n'
+        self.frames = [f'data: {json.dumps(text if i == 0 else f"token {i} ")}\n\n'.encode() for i in range(chunks)]
+
+    def invoke_agent_runtime(self, **kwargs):
+        return {'response': iter(self.frames)}
+
+
+class DiscardS3:
+    def put_object(self, **kwargs):
+        kwargs['Body'].read()
+
+
+def events(chunks):
+    with open(PDF_PATH, 'rb') as f:
+        pdf = base64.b64encode(f.read()).decode()
+    return {
+        'chat': {
+            'rawPath': '/prod/chat', 'requestContext': {'http': {'method': 'POST'}},
+            'body': json.dumps({'message': 'Indicators for coffee?', 'session_id': 'bench'})
+        },
+        'recommendations': {
+            'rawPath': '/prod/recommendations', 'requestContext': {'http': {'method': 'GET'}},
+            'queryStringParameters': {'session_id': 'bench'}
+        },
+        'upload': {
+            'rawPath': '/prod/upload', 'requestContext': {'http': {'method': 'POST'}},
+            'body': pdf, 'isBase64Encoded': True
+        },
+    }
+
+
+def time_route(event, requests, metrics, fresh_upload_cache=False):
+    lambda_function.REQUEST_METRICS = metrics
+    times = []
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(requests):
+            if fresh_upload_cache:
+                lambda_function.upload_cache = MemoryStore()
+            start = time.perf_counter()
+            result = lambda_function.lambda_handler(event, None)
+            times.append((time.perf_counter() - start) * 1000)
+            assert result['statusCode'] == 200, result
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--chunks', type=int, default=200, help='SSE frames per /chat response')
+    parser.add_argument('--typical-ms', type=float, default=1000, help='duration of a real request, for scale')
+    args = parser.parse_args()
+
+    lambda_function.agentcore = FakeAgentCore(args.chunks)
+    lambda_function.recommendations_store = MemoryStore()
+    lambda_function.s3 = DiscardS3()
+    lambda_function.bedrock_runtime = None  # not called: the test PDF needs no model call
+
+    print(f"{'route':<18}{'off (ms)':>10}{'on (ms)':>10}{'overhead (us)':>15}{'vs fake':>10}"
+          f"{f'vs {args.typical_ms:.0f} ms':>12}")
+    for route, event in events(args.chunks).items():
+        requests = args.requests if route != 'upload' else max(1, args.requests // 40)
+        fresh = route == 'upload'
+        # Alternate to spread drift evenly; keep the best of three rounds
+        rounds = [(time_route(event, requests, False, fresh), time_route(event, requests, True, fresh))
+                  for _ in range(3)]
+        off = min(r[0] for r in rounds)
+        on = min(r[1] for r in rounds)
+        overhead = on - off
+        print(f"{route:<18}{off:>10.3f}{on:>10.3f}{overhead * 1000:>15.1f}{overhead / off:>10.2%}"
+              f"{overhead / args.typical_ms:>12.3%}")
+
+
+if __name__ == '__main__':
+    main()
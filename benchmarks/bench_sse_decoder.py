@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: incremental SSE decoder vs the original per-chunk
+split/strip parsing from handle_chat.
+
+Builds a multi-megabyte synthetic AgentCore stream (JSON-encoded text frames
+with escapes and non-ASCII characters), slices it into fixed-size chunks that
+ignore frame boundaries, and times both decoders. Allocations are measured
+with tracemalloc while the decoded text is streamed and discarded, so the
+peak is each decoder's own working set rather than the joined output.
+
+Usage:
+    python benchmarks/bench_sse_decoder.py [--megabytes 8] [--chunk-size 1024] [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cba_api.sse import iter_events
+
+SAMPLE_TEXT = [
+    'INDICATOR #1\nID: 101\nName: Soil organic carbon ',
+    'Definition: "Stock" of carbon in the top 30 cm ',
+    'Accuracy: High\nCost: Medium\nEase: Low ',
+    'Região do Cerrado – café arábica ☕ ',
+]
+
+
+def build_stream(megabytes):
+    frame_list = [f"data: {json.dumps(t)}\n\n".encode('utf-8') for t in SAMPLE_TEXT]
+    out = bytearray()
+    i = 0
+    while len(out) < megabytes * 1024 * 1024:
+        out += frame_list[i % len(frame_list)]
+        i += 1
+    return bytes(out), i
+
+
+def legacy_texts(chunks):
+    """The original handle_chat parsing, kept here for comparison only."""
+    for chunk in chunks:
+        decoded = chunk.decode('utf-8', errors='replace')
+        for line in decoded.split('\n'):
+            line = line.strip()
+            if line.startswith('data: '):
+                text = line[6:].strip().strip('"')
+                if text:
+                    yield text
+
+
+def legacy_decode(chunks):
+    return ''.join(legacy_texts(chunks)).replace('\\n', '\n')
+
+
+def incremental_texts(chunks):
+    for event in iter_events(chunks):
+        text = event.text
+        if text:
+            yield text
+
+
+def incremental_decode(chunks):
+    return ''.join(incremental_texts(chunks))
+
+
+def measure_allocations(texts, chunks):
+    """Peak traced bytes while draining texts(chunks)."""
+    tracemalloc.start()
+    for _ in texts(chunks):
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--megabytes', type=float, default=8)
+    parser.add_argument('--chunk-size', type=int, default=1024)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    stream, frame_count = build_stream(args.megabytes)
+    chunks = [stream[i:i + args.chunk_size] for i in range(0, len(stream), args.chunk_size)]
+    expected = ''.join(SAMPLE_TEXT[i % len(SAMPLE_TEXT)] for i in range(frame_count))
+
+    print(f"{len(stream) / 1e6:.1f} MB, {frame_count} frames, {len(chunks)} chunks of {args.chunk_size} B")
+    print(f"{'decoder':<14}{'time (ms)':>12}{'MB/s':>10}{'peak alloc (KB)':>18}{'correct':>10}")
+    for name, decode, texts in (
+        ('legacy', legacy_decode, legacy_texts),
+        ('incremental', incremental_decode, incremental_texts),
+    ):
+        # Best of --repeat runs without tracemalloc overhead, then measure
+        # peak allocations separately
+        elapsed = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = decode(chunks)
+            elapsed = min(elapsed, time.perf_counter() - start)
+        peak = measure_allocations(texts, chunks)
+        print(f"{name:<14}{elapsed * 1000:>12.1f}{len(stream) / 1e6 / elapsed:>10.1f}"
+              f"{peak / 1e3:>18.1f}{str(result == expected):>10}")
+
+
+if __name__ == '__main__':
+    main()
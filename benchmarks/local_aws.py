@@ -0,0 +1,188 @@
+"""
+In-process stand-ins for the AWS calls made by lambda_function and the
+agent, for offline benchmarks.
+
+Each fake answers the same calls, with the same response shapes, as the
+real client, after a configurable delay:
+
+- FakeAgentCore: invoke_agent_runtime, replaying a recorded conversation
+  turn as AgentCore SSE frames (first-chunk delay plus per-chunk delay)
+- FakeS3: put_object / get_object / multipart uploads / presigned posts,
+  kept in memory
+- FakeBedrockRuntime: invoke_model, answering upload field prompts from
+  the recording of the uploaded document
+- FakeKnowledgeBase: retrieve for kb_tool, returning passages from the
+  recordings
+
+Recordings (benchmarks/recordings/*.json) hold one conversation each: the
+user's messages, the agent's streamed response chunks for each turn (one
+element per SSE data frame), the tool calls it made, the document the user
+uploads and the fields a model call returns for it.
+"""
+
+import glob
+import json
+import os
+import threading
+import time
+
+RECORDINGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recordings')
+
+
+def load_recordings(names=None):
+    """Recorded conversations by name, e.g. {'coffee_brazil': {...}}."""
+    recordings = {}
+    for path in sorted(glob.glob(os.path.join(RECORDINGS_DIR, '*.json'))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        if names is None or name in names:
+            with open(path, encoding='utf-8') as f:
+                recordings[name] = json.load(f)
+    return recordings
+
+
+def turns_by_message(recordings):
+    """{user message: recorded turn} across all recordings."""
+    return {turn['message']: turn for recording in recordings.values() for turn in recording['turns']}
+
+
+def sse_frame(text):
+    """Encode one text chunk the way AgentCore streams it."""
+    return f'data: {json.dumps(text)}\n\n'.encode('utf-8')
+
+
+class FakeAgentCore:
+    """bedrock-agentcore client replaying recorded turns, matched by prompt."""
+
+    def __init__(self, recordings, first_chunk_delay=0.0, chunk_delay=0.0):
+        self.turns = turns_by_message(recordings)
+        self.first_chunk_delay = first_chunk_delay
+        self.chunk_delay = chunk_delay
+
+    def invoke_agent_runtime(self, **kwargs):
+        prompt = json.loads(kwargs['payload'])['prompt']
+        frames = [sse_frame(chunk) for chunk in self.turns[prompt]['chunks']]
+
+        def body():
+            time.sleep(self.first_chunk_delay)
+            for i, frame in enumerate(frames):
+                if i and self.chunk_delay:
+                    time.sleep(self.chunk_delay)
+                yield frame
+
+        return {'response': body(), 'contentType': 'text/event-stream', 'statusCode': 200}
+
+
+class _Body:
+    """The read() side of a botocore StreamingBody."""
+
+    def __init__(self, data):
+        self._data = bytes(data)
+
+    def read(self, *args):
+        data, self._data = self._data, b''
+        return data
+
+
+class FakeS3:
+    """In-memory S3 bucket store with a fixed per-request delay."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.objects = {}
+        self._uploads = {}
+        self._lock = threading.Lock()
+
+    def _request(self):
+        if self.delay:
+            time.sleep(self.delay)
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self._request()
+        data = Body.read() if hasattr(Body, 'read') else bytes(Body)
+        with self._lock:
+            self.objects[(Bucket, Key)] = data
+        return {'ETag': f'"{len(data)}"'}
+
+    def get_object(self, Bucket, Key, **kwargs):
+        self._request()
+        with self._lock:
+            data = self.objects[(Bucket, Key)]
+        return {'Body': _Body(data), 'ContentLength': len(data)}
+
+    def create_multipart_upload(self, Bucket, Key, **kwargs):
+        self._request()
+        with self._lock:
+            upload_id = f'upload-{len(self._uploads) + 1}'
+            self._uploads[upload_id] = {}
+        return {'UploadId': upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body, **kwargs):
+        self._request()
+        with self._lock:
+            self._uploads[UploadId][PartNumber] = Body.read()
+        return {'ETag': f'"{PartNumber}"'}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload, **kwargs):
+        self._request()
+        with self._lock:
+            parts = self._uploads.pop(UploadId)
+            self.objects[(Bucket, Key)] = b''.join(parts[p['PartNumber']] for p in MultipartUpload['Parts'])
+        return {}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId, **kwargs):
+        with self._lock:
+            self._uploads.pop(UploadId, None)
+        return {}
+
+    def generate_presigned_post(self, Bucket, Key, **kwargs):
+        return {'url': f'https://{Bucket}.s3.amazonaws.com/', 'fields': {'key': Key}}
+
+
+class FakeBedrockRuntime:
+    """
+    bedrock-runtime client answering upload field prompts. The answer comes
+    from the recording whose document shares the most words with the prompt.
+    """
+
+    def __init__(self, recordings, delay=0.0):
+        self.answers = [
+            (set(recording['document_terms']), json.dumps(recording['model_fields']))
+            for recording in recordings.values()
+        ]
+        self.delay = delay
+        self.calls = 0
+
+    def invoke_model(self, **kwargs):
+        if self.delay:
+            time.sleep(self.delay)
+        self.calls += 1
+        prompt = json.loads(kwargs['body'])['messages'][0]['content'].lower()
+        _, answer = max(self.answers, key=lambda item: sum(term in prompt for term in item[0]))
+        body = {'content': [{'type': 'text', 'text': answer}], 'stop_reason': 'end_turn'}
+        return {'body': _Body(json.dumps(body).encode('utf-8')), 'contentType': 'application/json'}
+
+
+class FakeKnowledgeBase:
+    """bedrock-agent-runtime client whose retrieve returns recorded passages."""
+
+    def __init__(self, recordings, delay=0.0):
+        self.passages = [p for recording in recordings.values() for p in recording['kb_passages']]
+        self.delay = delay
+        self.calls = 0
+
+    def retrieve(self, knowledgeBaseId, retrievalQuery, retrievalConfiguration, **kwargs):
+        if self.delay:
+            time.sleep(self.delay)
+        self.calls += 1
+        words = set(retrievalQuery['text'].lower().split())
+        ranked = sorted(self.passages, key=lambda p: -len(words & set(p['text'].lower().split())))
+        count = retrievalConfiguration['vectorSearchConfiguration']['numberOfResults']
+        return {'retrievalResults': [
+            {
+                'content': {'text': p['text']},
+                'location': {'type': 'S3', 's3Location': {'uri': p['source']}},
+                'metadata': {'source': p['source']},
+                'score': round(1.0 - rank * 0.05, 2),
+            }
+            for rank, p in enumerate(ranked[:count])
+        ]}
@@ -49,6 +49,7 @@ function ChatPageContent() {
   ]);
   const [input, setInput] = useState("");
   const [isLoading, setIsLoading] = useState(false);
+  const [isStreaming, setIsStreaming] = useState(false);
   const [profile, setProfile] = useState<ProjectProfile>(initialProfile);
   const [hasRecommendations, setHasRecommendations] = useState(false);
   const messagesEndRef = useRef<HTMLDivElement>(null);
@@ -71,7 +72,20 @@ function ChatPageContent() {
 
     try {
       const { api } = await import("@/lib/api");
-      const response = await api.chat(userMessage, sessionId, profile);
+      // Render the answer as it streams in: the first chunk adds the assistant
+      // message, later chunks replace it
+      let started = false;
+      const showText = (text: string) => {
+        const first = !started;
+        started = true;
+        setIsStreaming(true);
+        setMessages((prev) =>
+          first
+            ? [...prev, { role: "assistant", content: text }]
+            : [...prev.slice(0, -1), { role: "assistant", content: text }]
+        );
+      };
+      const response = await api.chatStream(userMessage, sessionId, profile, showText);
       
       // Extract profile information from the conversation
       extractProfileFromMessage(userMessage, response.response);
@@ -81,12 +95,17 @@ function ChatPageContent() {
         setHasRecommendations(true);
       }
       
-      setMessages((prev) => [...prev, { role: "assistant", content: response.response }]);
+      if (started) {
+        setMessages((prev) => [...prev.slice(0, -1), { role: "assistant", content: response.response }]);
+      } else {
+        setMessages((prev) => [...prev, { role: "assistant", content: response.response }]);
+      }
     } catch (error) {
       console.error("Chat failed:", error);
       setMessages((prev) => [...prev, { role: "assistant", content: "Sorry, I encountered an error. Please try again." }]);
     } finally {
       setIsLoading(false);
+      setIsStreaming(false);
     }
   };
 
@@ -268,7 +287,7 @@ function ChatPageContent() {
               ))}
             </AnimatePresence>
 
-            {isLoading && (
+            {isLoading && !isStreaming && (
               <motion.div
                 initial={{ opacity: 0 }}
                 animate={{ opacity: 1 }}
@@ -1,6 +1,14 @@
 // API URL from environment variable with fallback for development
 const API_URL = process.env.NEXT_PUBLIC_API_URL || "https://pjuuem2fn8.execute-api.us-west-2.amazonaws.com/prod";
 
+// Upload straight to S3 with a presigned POST (requires the S3 event trigger, see DEPLOYMENT.md)
+const DIRECT_UPLOAD = process.env.NEXT_PUBLIC_DIRECT_UPLOAD === "true";
+const UPLOAD_POLL_INTERVAL_MS = 1000;
+// Streaming chat is served from a Lambda Function URL (API Gateway buffers responses,
+// see DEPLOYMENT.md); without it chat uses the buffered /chat route
+const CHAT_STREAM_URL = process.env.NEXT_PUBLIC_CHAT_STREAM_URL;
+const UPLOAD_POLL_TIMEOUT_MS = 120000;
+
 if (!process.env.NEXT_PUBLIC_API_URL && typeof window !== 'undefined') {
   console.warn("NEXT_PUBLIC_API_URL not set, using fallback. Set this in production.");
 }
@@ -42,6 +50,19 @@ export interface UploadResponse {
   s3_uri?: string;
 }
 
+interface PresignResponse {
+  upload_id: string;
+  url: string;
+  fields: Record<string, string>;
+  expires_in: number;
+}
+
+interface UploadStatusResponse extends Partial<UploadResponse> {
+  upload_id: string;
+  status: "pending" | "processing" | "complete" | "failed";
+  error?: string;
+}
+
 export interface RecommendationsResponse {
   indicators: Indicator[];
   session_id?: string;
@@ -62,7 +83,92 @@ export const api = {
     return res.json();
   },
 
+  /**
+   * Chat over /chat/stream, calling onText with the response so far as each
+   * chunk arrives. Falls back to the buffered /chat when no stream URL is
+   * configured or the stream can't be opened.
+   */
+  async chatStream(
+    message: string,
+    sessionId: string | undefined,
+    profile: any,
+    onText: (text: string) => void
+  ): Promise<ChatResponse> {
+    if (!CHAT_STREAM_URL || typeof ReadableStream === "undefined") {
+      return api.chat(message, sessionId, profile);
+    }
+    let res: Response;
+    try {
+      res = await fetch(`${CHAT_STREAM_URL}/chat/stream`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ message, session_id: sessionId, profile }),
+      });
+    } catch (error) {
+      console.warn("Chat stream unavailable, using /chat:", error);
+      return api.chat(message, sessionId, profile);
+    }
+    if (!res.ok || !res.body) {
+      return api.chat(message, sessionId, profile);
+    }
+
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    let text = "";
+    let result: ChatResponse | null = null;
+
+    // Returns the final response for the `done` event
+    const handleEvent = (raw: string): ChatResponse | null => {
+      let event = "message";
+      const data: string[] = [];
+      for (const line of raw.split("\n")) {
+        if (line.startsWith("event:")) {
+          event = line.slice(6).trim();
+        } else if (line.startsWith("data:")) {
+          data.push(line.slice(5).replace(/^ /, ""));
+        }
+      }
+      if (!data.length) {
+        return null;
+      }
+      const payload = JSON.parse(data.join("\n"));
+      if (event === "done") {
+        return { response: text, session_id: payload.session_id, has_recommendations: payload.has_recommendations };
+      } else if (event === "error") {
+        throw new Error(payload.error || "Chat failed");
+      } else if (event === "message" && typeof payload === "string") {
+        // Agent text chunks; typed frames (recommendations, metadata) are stored server-side
+        text += payload;
+        onText(text);
+      }
+      return null;
+    };
+
+    for (;;) {
+      const { done, value } = await reader.read();
+      buffer += decoder.decode(value, { stream: !done });
+      const events = buffer.split(/\r?\n\r?\n/);
+      buffer = done ? "" : events.pop() || "";
+      for (const raw of events) {
+        if (raw.trim()) {
+          result = handleEvent(raw) || result;
+        }
+      }
+      if (done) {
+        break;
+      }
+    }
+    if (!result) {
+      throw new Error("Chat stream ended unexpectedly");
+    }
+    return result;
+  },
+
   async uploadFile(file: File): Promise<UploadResponse> {
+    if (DIRECT_UPLOAD) {
+      return api.uploadFileDirect(file);
+    }
     // Convert file to base64 for Lambda compatibility
     const buffer = await file.arrayBuffer();
     const bytes = new Uint8Array(buffer);
@@ -86,6 +192,49 @@ export const api = {
     return res.json();
   },
 
+  async uploadFileDirect(file: File): Promise<UploadResponse> {
+    // 1. Get a presigned POST for the upload bucket
+    const presignRes = await fetch(`${API_URL}/upload/presign`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({}),
+    });
+    if (!presignRes.ok) {
+      const error = await presignRes.json().catch(() => ({ error: "Upload failed" }));
+      throw new Error(error.error || "Upload failed");
+    }
+    const presign: PresignResponse = await presignRes.json();
+
+    // 2. Send the file to S3 as-is (no base64, no Lambda in the path)
+    const form = new FormData();
+    Object.entries(presign.fields).forEach(([key, value]) => form.append(key, value));
+    form.append("file", file);
+    const uploadRes = await fetch(presign.url, { method: "POST", body: form });
+    if (!uploadRes.ok) {
+      throw new Error("Upload failed");
+    }
+
+    // 3. Poll until the S3-triggered analysis finishes
+    const deadline = Date.now() + UPLOAD_POLL_TIMEOUT_MS;
+    while (Date.now() < deadline) {
+      await new Promise((resolve) => setTimeout(resolve, UPLOAD_POLL_INTERVAL_MS));
+      const statusRes = await fetch(
+        `${API_URL}/upload/status?upload_id=${encodeURIComponent(presign.upload_id)}`
+      );
+      if (!statusRes.ok) {
+        continue;
+      }
+      const status: UploadStatusResponse = await statusRes.json();
+      if (status.status === "complete") {
+        return { found: status.found || {}, missing: status.missing || [], s3_uri: status.s3_uri };
+      }
+      if (status.status === "failed") {
+        throw new Error(status.error || "Upload failed");
+      }
+    }
+    throw new Error("Document analysis timed out");
+  },
+
   async getRecommendations(sessionId: string): Promise<RecommendationsResponse> {
     const res = await fetch(`${API_URL}/recommendations?session_id=${encodeURIComponent(sessionId)}`, {
       method: "GET",
@@ -0,0 +1 @@
+"""Helper modules for the CBA Indicator API Lambda (lambda_function.py)."""
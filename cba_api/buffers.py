@@ -0,0 +1,135 @@
+"""
+Low-copy handling of uploaded file bodies.
+
+A 10MB upload arrives as a ~13MB base64 string. Decoding it the usual way
+(base64.b64decode) first makes a full ASCII copy of the string, and handing
+the result to S3 and pypdf through BytesIO or bytes() slices can copy it
+again. Here the body is decoded chunk by chunk into one preallocated buffer,
+and every consumer reads that buffer through a memoryview:
+
+- decode_base64: str -> memoryview over a single bytearray
+- BufferReader: read-only, seekable file object over a memoryview (for
+  pypdf and botocore) that only copies what each read() asks for
+- put_object: single PUT for small bodies, multipart upload of memoryview
+  slices for large ones
+"""
+
+import base64
+import binascii
+import io
+import re
+
+# Base64 characters decoded per step; a multiple of 4 so chunks decode independently
+DECODE_CHUNK_CHARS = 256 * 1024
+_BASE64_CHUNK = re.compile(r'[A-Za-z0-9+/]*={0,2}')
+
+MULTIPART_THRESHOLD = 8 * 1024 * 1024
+MULTIPART_PART_SIZE = 5 * 1024 * 1024  # S3 minimum for all but the last part
+
+
+def decode_base64(text, validate=False, chunk_chars=DECODE_CHUNK_CHARS):
+    """
+    Decode a base64 str into a memoryview over a single bytearray.
+
+    With validate=True, characters outside the base64 alphabet raise
+    binascii.Error (like base64.b64decode(validate=True)). Otherwise they
+    are discarded; bodies containing them take the slower one-shot path.
+    """
+    buffer = bytearray(len(text) // 4 * 3 + 3)
+    view = memoryview(buffer)
+    length = 0
+    try:
+        for start in range(0, len(text), chunk_chars):
+            chunk = text[start:start + chunk_chars]
+            if validate and not _BASE64_CHUNK.fullmatch(chunk):
+                raise binascii.Error('Non-base64 character in body')
+            decoded = binascii.a2b_base64(chunk)
+            view[length:length + len(decoded)] = decoded
+            length += len(decoded)
+    except (binascii.Error, ValueError):
+        if validate:
+            raise
+        # Whitespace or other stray characters shift the 4-character groups
+        view.release()
+        return memoryview(base64.b64decode(text))
+    return view[:length]
+
+
+class BufferReader(io.RawIOBase):
+    """Seekable, read-only file object over a bytes-like object, without copying it."""
+
+    def __init__(self, data):
+        self._view = memoryview(data).cast('B')
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, target):
+        end = min(self._pos + len(target), len(self._view))
+        count = end - self._pos
+        target[:count] = self._view[self._pos:end]
+        self._pos = end
+        return count
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = len(self._view) - self._pos
+        end = min(self._pos + size, len(self._view))
+        data = self._view[self._pos:end].tobytes()
+        self._pos = end
+        return data
+
+    def readall(self):
+        return self.read()
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._pos + offset
+        elif whence == io.SEEK_END:
+            position = len(self._view) + offset
+        else:
+            raise ValueError(f'Invalid whence: {whence}')
+        if position < 0:
+            raise ValueError('Negative seek position')
+        self._pos = position
+        return position
+
+    def tell(self):
+        return self._pos
+
+    def __len__(self):
+        return len(self._view)
+
+
+def put_object(s3, bucket, key, data, multipart_threshold=MULTIPART_THRESHOLD,
+               part_size=MULTIPART_PART_SIZE, **kwargs):
+    """
+    Upload a bytes-like object to S3 without copying it. Bodies larger than
+    multipart_threshold are sent as a multipart upload of part_size slices.
+    """
+    view = memoryview(data).cast('B')
+    if len(view) <= multipart_threshold:
+        s3.put_object(Bucket=bucket, Key=key, Body=BufferReader(view), **kwargs)
+        return
+
+    upload_id = s3.create_multipart_upload(Bucket=bucket, Key=key, **kwargs)['UploadId']
+    try:
+        parts = []
+        for number, start in enumerate(range(0, len(view), part_size), 1):
+            part = s3.upload_part(
+                Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=number,
+                Body=BufferReader(view[start:start + part_size])
+            )
+            parts.append({'PartNumber': number, 'ETag': part['ETag']})
+        s3.complete_multipart_upload(
+            Bucket=bucket, Key=key, UploadId=upload_id, MultipartUpload={'Parts': parts}
+        )
+    except Exception:
+        s3.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+        raise
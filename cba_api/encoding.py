@@ -0,0 +1,154 @@
+"""
+Compressed, conditional JSON responses for the polled GET routes.
+
+The results and compare pages poll /recommendations, which returns the same
+indicator list (every definition and method) until the next chat turn. To
+cut bytes on the wire and work on repeat polls:
+
+- etag / etag_matches: a weak ETag hashed from the JSON body; a request whose
+  If-None-Match matches gets an empty 304 instead of the body
+- choose_encoding / compress: brotli or gzip by the request's Accept-Encoding
+  q-values; brotli only when the optional `brotli` package is installed
+- parse_fields / project: return only the requested indicator attributes
+- paginate: limit/cursor pages; the cursor is an opaque offset tied to the
+  stored record's version, so a page request after the list was replaced is
+  rejected instead of mixing two lists
+
+ETags are weak (W/"...") because the same JSON is sent with different
+Content-Encodings, which strong validators must not share.
+"""
+
+import base64
+import binascii
+import gzip
+import hashlib
+import json
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+_brotli = None
+
+
+def brotli_module():
+    """The brotli module, or None when it isn't installed (imported on first use)."""
+    global _brotli
+    if _brotli is None:
+        try:
+            import brotli
+            _brotli = brotli
+        except ImportError:
+            _brotli = False
+    return _brotli or None
+
+
+def etag(body):
+    """Weak ETag of a response body (bytes)."""
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match, tag):
+    """Whether an If-None-Match header value matches tag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque = tag.removeprefix('W/')
+    return any(candidate.strip().removeprefix('W/') == opaque for candidate in if_none_match.split(','))
+
+
+def accepted_encodings(accept_encoding):
+    """{coding: q} from an Accept-Encoding header value."""
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        coding, _, params = part.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def choose_encoding(accept_encoding):
+    """'br', 'gzip' or None for an Accept-Encoding header value; ties prefer brotli."""
+    accepted = accepted_encodings(accept_encoding)
+    wildcard = accepted.get('*', 0.0)
+    candidates = ['br', 'gzip'] if brotli_module() else ['gzip']
+    best, best_q = None, 0.0
+    for coding in candidates:
+        q = accepted.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(body, encoding):
+    """Compress body (bytes) with a coding returned by choose_encoding."""
+    if encoding == 'br':
+        return brotli_module().compress(body, quality=BROTLI_QUALITY)
+    if encoding == 'gzip':
+        # mtime=0 keeps the output identical for identical bodies
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def parse_fields(value, allowed):
+    """
+    The attribute names of a comma-separated fields= value, or None for all.
+    Raises ValueError naming any attribute not in allowed.
+    """
+    if not value:
+        return None
+    fields = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def project(items, fields):
+    """items with only the given keys (plus 'id', which clients key rows by)."""
+    if fields is None:
+        return items
+    keys = ['id'] + [name for name in fields if name != 'id']
+    return [{key: item[key] for key in keys if key in item} for item in items]
+
+
+def encode_cursor(offset, version):
+    return base64.urlsafe_b64encode(json.dumps([offset, version]).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """(offset, version) of a cursor; raises ValueError if it is malformed."""
+    try:
+        offset, version = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(offset, int) or offset < 0:
+        raise ValueError("Invalid cursor")
+    return offset, version
+
+
+def paginate(items, limit, cursor, version):
+    """
+    (page, next_cursor) of items. limit=None returns everything from the
+    cursor on; next_cursor is None on the last page. Raises ValueError for a
+    malformed cursor or one issued for a different version of the list.
+    """
+    offset = 0
+    if cursor:
+        offset, cursor_version = decode_cursor(cursor)
+        if cursor_version != version:
+            raise ValueError("Cursor is from an earlier set of recommendations; start again without it")
+    if limit is None:
+        return items[offset:], None
+    end = offset + limit
+    return items[offset:end], encode_cursor(end, version) if end < len(items) else None
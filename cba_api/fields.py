@@ -0,0 +1,162 @@
+"""
+Deterministic extraction of an uploaded document's location, commodity and
+budget.
+
+Project documents usually state these plainly: a country and region in the
+title, a dominant commodity, and currency amounts next to words like
+"budget". extract_fields() scores gazetteer and pattern matches and returns
+a value and a confidence in [0, 1] for each field. handle_upload only asks
+Claude about fields below FIELD_CONFIDENCE_THRESHOLD.
+
+A field can be confidently None: a document with no currency amounts or
+budget wording has no budget to find, and Claude would return null too.
+"""
+
+import re
+from collections import Counter
+
+from cba_api.gazetteer import (
+    BIOMES, COMMODITIES, COUNTRIES, COUNTRY_ALIASES, CURRENCY_CODES, CURRENCY_SYMBOLS, CURRENCY_WORDS,
+    REGIONS, SUPRANATIONAL_REGIONS,
+)
+
+FIELD_NAMES = ('location', 'commodity', 'budget')
+FIELD_CONFIDENCE_THRESHOLD = 0.6
+
+# Mentions in the title area count extra
+TITLE_CHARS = 400
+# Characters around an amount searched for budget wording
+BUDGET_CUE_WINDOW = 80
+
+
+def _alternation(terms):
+    # Longest first so "Mato Grosso do Sul" wins over "Mato Grosso"
+    return '|'.join(re.escape(term) for term in sorted(terms, key=len, reverse=True))
+
+
+_COUNTRY_NAMES = {name: name for name in COUNTRIES}
+_COUNTRY_NAMES.update(COUNTRY_ALIASES)
+_PLACE = re.compile(
+    r'(?<![\w-])(' + _alternation(list(_COUNTRY_NAMES) + list(REGIONS) + list(BIOMES) + list(SUPRANATIONAL_REGIONS)) + r')(?![\w-])'
+)
+_COMMODITY_TERMS = {term: name for name, terms in COMMODITIES.items() for term in terms}
+_COMMODITY = re.compile(r'\b(' + _alternation(_COMMODITY_TERMS) + r')(?:e?s)?\b', re.I)
+
+_NUMBER = r'\d{1,3}(?:[,.\s]\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?'
+_SCALE = r'(?:\s?(?:million|mn|m|thousand|k|billion|bn)\b)?'
+_CURRENCY_PREFIX = r'(?:' + _alternation(CURRENCY_SYMBOLS) + r'|\b(?:' + _alternation(CURRENCY_CODES) + r')\b)'
+_CURRENCY_SUFFIX = r'\s?(?:' + _alternation(CURRENCY_CODES + CURRENCY_WORDS) + r')\b'
+_AMOUNT = re.compile(
+    rf'{_CURRENCY_PREFIX}\s?(?:{_NUMBER}){_SCALE}(?:\s?(?:-|–|to)\s?(?:{_CURRENCY_PREFIX}\s?)?(?:{_NUMBER}){_SCALE})?'
+    rf'|(?<![\w.,])(?:{_NUMBER}){_SCALE}(?:\s?(?:-|–|to)\s?(?:{_NUMBER}){_SCALE})?{_CURRENCY_SUFFIX}',
+    re.I
+)
+_BUDGET_CUE = re.compile(r'\b(?:budget|funding|financing|investment|grant|costs?|costing)\b', re.I)
+_QUALITATIVE_BUDGET = re.compile(
+    r'\b(very low|low|limited|small|modest|medium|moderate|large|high|significant)[- ](?:budget|funding)\b', re.I
+)
+
+
+def _dominance(counts):
+    """
+    Confidence that the most frequent candidate is the answer: 1.0 for a
+    lone candidate mentioned 3+ times, 0.5 for a tie with the runner-up.
+    """
+    ranked = counts.most_common(2)
+    top = ranked[0][1]
+    runner_up = ranked[1][1] if len(ranked) > 1 else 0
+    saturation = min(1.0, top / 3)
+    return saturation * (0.5 + 0.5 * (top - runner_up) / top)
+
+
+def extract_location(text):
+    countries, regions, areas = Counter(), Counter(), Counter()
+    title = text[:TITLE_CHARS]
+    for match in _PLACE.finditer(text):
+        name = match.group(1)
+        weight = 2 if match.start() < TITLE_CHARS else 1
+        if name in REGIONS:
+            regions[name] += weight
+            countries[REGIONS[name]] += weight
+        elif name in BIOMES:
+            countries[BIOMES[name]] += weight
+        elif name in _COUNTRY_NAMES:
+            countries[_COUNTRY_NAMES[name]] += weight
+        else:
+            areas[name] += weight
+
+    if not countries:
+        if not areas:
+            return None, 0.0
+        area = areas.most_common(1)[0][0]
+        return area, _dominance(areas) * 0.8
+
+    country = countries.most_common(1)[0][0]
+    confidence = _dominance(countries)
+    if country in title:
+        confidence = min(1.0, confidence + 0.1)
+
+    # Name the main region(s) of that country as well, e.g. "Minas Gerais, Brazil"
+    in_country = Counter({name: n for name, n in regions.items() if REGIONS[name] == country})
+    ranked = [name for name, n in in_country.most_common(2) if n >= 2]
+    if len(ranked) == 2 and in_country[ranked[1]] * 2 < in_country[ranked[0]]:
+        ranked = ranked[:1]
+    if ranked:
+        return f"{' and '.join(ranked)}, {country}", confidence
+    return country, confidence
+
+
+def extract_commodity(text):
+    counts = Counter()
+    for match in _COMMODITY.finditer(text):
+        weight = 2 if match.start() < TITLE_CHARS else 1
+        counts[_COMMODITY_TERMS[match.group(1).lower()]] += weight
+    if not counts:
+        return None, 0.0
+    return counts.most_common(1)[0][0], _dominance(counts)
+
+
+def extract_budget(text):
+    amounts = list(_AMOUNT.finditer(text))
+    for match in amounts:
+        window = text[max(0, match.start() - BUDGET_CUE_WINDOW):match.end() + BUDGET_CUE_WINDOW]
+        if _BUDGET_CUE.search(window):
+            return ' '.join(match.group(0).split()), 0.85
+    qualitative = _QUALITATIVE_BUDGET.search(text)
+    if qualitative:
+        return qualitative.group(1).capitalize(), 0.65
+    if amounts:
+        # Amounts without budget wording may be prices or revenues; let Claude decide
+        return ' '.join(amounts[0].group(0).split()), 0.4
+    # Nothing that could be a budget
+    return None, 0.8
+
+
+def cue_counts(text):
+    """
+    Count the matches in text that bear on each field: place names,
+    commodity terms, and currency amounts plus budget wording.
+    """
+    return {
+        'location': sum(1 for _ in _PLACE.finditer(text)),
+        'commodity': sum(1 for _ in _COMMODITY.finditer(text)),
+        'budget': (
+            2 * sum(1 for _ in _AMOUNT.finditer(text)) + sum(1 for _ in _BUDGET_CUE.finditer(text))
+            + sum(1 for _ in _QUALITATIVE_BUDGET.finditer(text))
+        ),
+    }
+
+
+def extract_fields(text):
+    """Return {field: {'value': str or None, 'confidence': float}} for location, commodity and budget."""
+    results = {}
+    for name, extract in (('location', extract_location), ('commodity', extract_commodity), ('budget', extract_budget)):
+        value, confidence = extract(text)
+        results[name] = {'value': value, 'confidence': round(confidence, 2)}
+    return results
+
+
+def confident_fields(extracted, threshold=FIELD_CONFIDENCE_THRESHOLD):
+    """Split extract_fields() output into ({field: value} resolved, [unresolved field names])."""
+    resolved = {name: result['value'] for name, result in extracted.items() if result['confidence'] >= threshold}
+    return resolved, [name for name in FIELD_NAMES if name not in resolved]
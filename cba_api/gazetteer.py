@@ -0,0 +1,136 @@
+"""
+Vocabularies for the deterministic upload field extractor (cba_api/fields.py):
+countries, sub-national and supranational regions, commodities and
+currencies.
+"""
+
+COUNTRIES = (
+    'Afghanistan', 'Albania', 'Algeria', 'Andorra', 'Angola', 'Antigua and Barbuda', 'Argentina',
+    'Armenia', 'Australia', 'Austria', 'Azerbaijan', 'Bahamas', 'Bahrain', 'Bangladesh', 'Barbados',
+    'Belarus', 'Belgium', 'Belize', 'Benin', 'Bhutan', 'Bolivia', 'Bosnia and Herzegovina', 'Botswana',
+    'Brazil', 'Brunei', 'Bulgaria', 'Burkina Faso', 'Burundi', 'Cabo Verde', 'Cambodia', 'Cameroon',
+    'Canada', 'Central African Republic', 'Chad', 'Chile', 'China', 'Colombia', 'Comoros', 'Congo',
+    'Costa Rica', "Côte d'Ivoire", 'Croatia', 'Cuba', 'Cyprus', 'Czechia', 'Democratic Republic of the Congo',
+    'Denmark', 'Djibouti', 'Dominica', 'Dominican Republic', 'Ecuador', 'Egypt', 'El Salvador',
+    'Equatorial Guinea', 'Eritrea', 'Estonia', 'Eswatini', 'Ethiopia', 'Fiji', 'Finland', 'France',
+    'Gabon', 'Gambia', 'Georgia', 'Germany', 'Ghana', 'Greece', 'Grenada', 'Guatemala', 'Guinea',
+    'Guinea-Bissau', 'Guyana', 'Haiti', 'Honduras', 'Hungary', 'Iceland', 'India', 'Indonesia', 'Iran',
+    'Iraq', 'Ireland', 'Israel', 'Italy', 'Jamaica', 'Japan', 'Jordan', 'Kazakhstan', 'Kenya', 'Kiribati',
+    'Kuwait', 'Kyrgyzstan', 'Laos', 'Latvia', 'Lebanon', 'Lesotho', 'Liberia', 'Libya', 'Liechtenstein',
+    'Lithuania', 'Luxembourg', 'Madagascar', 'Malawi', 'Malaysia', 'Maldives', 'Mali', 'Malta',
+    'Marshall Islands', 'Mauritania', 'Mauritius', 'Mexico', 'Micronesia', 'Moldova', 'Monaco',
+    'Mongolia', 'Montenegro', 'Morocco', 'Mozambique', 'Myanmar', 'Namibia', 'Nauru', 'Nepal',
+    'Netherlands', 'New Zealand', 'Nicaragua', 'Niger', 'Nigeria', 'North Korea', 'North Macedonia',
+    'Norway', 'Oman', 'Pakistan', 'Palau', 'Palestine', 'Panama', 'Papua New Guinea', 'Paraguay', 'Peru',
+    'Philippines', 'Poland', 'Portugal', 'Qatar', 'Romania', 'Russia', 'Rwanda', 'Saint Kitts and Nevis',
+    'Saint Lucia', 'Saint Vincent and the Grenadines', 'Samoa', 'San Marino', 'Sao Tome and Principe',
+    'Saudi Arabia', 'Senegal', 'Serbia', 'Seychelles', 'Sierra Leone', 'Singapore', 'Slovakia',
+    'Slovenia', 'Solomon Islands', 'Somalia', 'South Africa', 'South Korea', 'South Sudan', 'Spain',
+    'Sri Lanka', 'Sudan', 'Suriname', 'Sweden', 'Switzerland', 'Syria', 'Taiwan', 'Tajikistan',
+    'Tanzania', 'Thailand', 'Timor-Leste', 'Togo', 'Tonga', 'Trinidad and Tobago', 'Tunisia', 'Turkey',
+    'Turkmenistan', 'Tuvalu', 'Uganda', 'Ukraine', 'United Arab Emirates', 'United Kingdom',
+    'United States', 'Uruguay', 'Uzbekistan', 'Vanuatu', 'Venezuela', 'Vietnam', 'Yemen', 'Zambia',
+    'Zimbabwe',
+)
+
+# Alternative spellings -> canonical country name
+COUNTRY_ALIASES = {
+    'Brasil': 'Brazil',
+    'Cape Verde': 'Cabo Verde',
+    "Cote d'Ivoire": "Côte d'Ivoire",
+    "Côte d’Ivoire": "Côte d'Ivoire",
+    'Ivory Coast': "Côte d'Ivoire",
+    'Czech Republic': 'Czechia',
+    'DRC': 'Democratic Republic of the Congo',
+    'DR Congo': 'Democratic Republic of the Congo',
+    'Swaziland': 'Eswatini',
+    'Burma': 'Myanmar',
+    'Lao PDR': 'Laos',
+    'Türkiye': 'Turkey',
+    'UK': 'United Kingdom',
+    'USA': 'United States',
+    'U.S.': 'United States',
+    'United States of America': 'United States',
+    'Viet Nam': 'Vietnam',
+    'East Timor': 'Timor-Leste',
+}
+
+# Sub-national regions -> country, for the producing regions of CBA projects
+REGIONS = {
+    # Brazil: states
+    'Acre': 'Brazil', 'Alagoas': 'Brazil', 'Amapá': 'Brazil', 'Amazonas': 'Brazil', 'Bahia': 'Brazil',
+    'Ceará': 'Brazil', 'Espírito Santo': 'Brazil', 'Goiás': 'Brazil', 'Maranhão': 'Brazil',
+    'Mato Grosso': 'Brazil', 'Mato Grosso do Sul': 'Brazil', 'Minas Gerais': 'Brazil', 'Pará': 'Brazil',
+    'Paraíba': 'Brazil', 'Paraná': 'Brazil', 'Pernambuco': 'Brazil', 'Piauí': 'Brazil',
+    'Rio de Janeiro': 'Brazil', 'Rio Grande do Norte': 'Brazil', 'Rio Grande do Sul': 'Brazil',
+    'Rondônia': 'Brazil', 'Roraima': 'Brazil', 'Santa Catarina': 'Brazil', 'São Paulo': 'Brazil',
+    'Sergipe': 'Brazil', 'Tocantins': 'Brazil',
+    # Chad: provinces
+    'Batha': 'Chad', 'Borkou': 'Chad', 'Chari-Baguirmi': 'Chad', 'Ennedi': 'Chad', 'Guéra': 'Chad',
+    'Hadjer-Lamis': 'Chad', 'Kanem': 'Chad', 'Lac': 'Chad', 'Logone Occidental': 'Chad',
+    'Logone Oriental': 'Chad', 'Mandoul': 'Chad', 'Mayo-Kebbi Est': 'Chad', 'Mayo-Kebbi Ouest': 'Chad',
+    'Moyen-Chari': 'Chad', 'Ouaddaï': 'Chad', 'Salamat': 'Chad', 'Sila': 'Chad', 'Tandjilé': 'Chad',
+    'Tibesti': 'Chad', 'Wadi Fira': 'Chad', "N'Djamena": 'Chad',
+    # Other coffee, cocoa and cotton regions
+    'Antioquia': 'Colombia', 'Caldas': 'Colombia', 'Huila': 'Colombia', 'Nariño': 'Colombia',
+    'Tolima': 'Colombia', 'Cauca': 'Colombia', 'Quindío': 'Colombia', 'Risaralda': 'Colombia',
+    'Oromia': 'Ethiopia', 'Sidama': 'Ethiopia', 'Amhara': 'Ethiopia', 'Tigray': 'Ethiopia',
+    'Chiapas': 'Mexico', 'Oaxaca': 'Mexico', 'Veracruz': 'Mexico',
+    'Sumatra': 'Indonesia', 'Java': 'Indonesia', 'Sulawesi': 'Indonesia', 'Kalimantan': 'Indonesia',
+    'Central Highlands': 'Vietnam', 'Punjab': 'India', 'Gujarat': 'India', 'Maharashtra': 'India',
+    'Karnataka': 'India', 'Kerala': 'India', 'Ashanti': 'Ghana',
+}
+
+# Biomes and landscapes within one country; they point to the country but
+# aren't named in the extracted location
+BIOMES = {
+    'Cerrado': 'Brazil', 'Caatinga': 'Brazil', 'Mata Atlântica': 'Brazil', 'Atlantic Forest': 'Brazil',
+    'Pantanal': 'Brazil', 'Lake Chad': 'Chad',
+}
+
+# Areas larger than a country; used when no country is named
+SUPRANATIONAL_REGIONS = (
+    'Sahel', 'West Africa', 'East Africa', 'Central Africa', 'Southern Africa', 'North Africa',
+    'Sub-Saharan Africa', 'Horn of Africa', 'Latin America', 'Central America', 'South America',
+    'Caribbean', 'Amazon', 'Andes', 'Southeast Asia', 'South Asia', 'Central Asia', 'Middle East',
+    'Pacific Islands', 'Mediterranean',
+)
+
+# Canonical commodity -> terms that name it (matched case-insensitively, plurals allowed)
+COMMODITIES = {
+    'Coffee': ('coffee', 'arabica', 'robusta'),
+    'Cocoa': ('cocoa', 'cacao'),
+    'Cotton': ('cotton',),
+    'Palm oil': ('palm oil', 'oil palm'),
+    'Cattle': ('cattle', 'beef', 'livestock'),
+    'Dairy': ('dairy', 'milk'),
+    'Soy': ('soy', 'soya', 'soybean'),
+    'Sugarcane': ('sugarcane', 'sugar cane'),
+    'Tea': ('tea',),
+    'Rice': ('rice', 'paddy'),
+    'Maize': ('maize', 'corn'),
+    'Wheat': ('wheat',),
+    'Sorghum': ('sorghum',),
+    'Millet': ('millet',),
+    'Cassava': ('cassava',),
+    'Timber': ('timber',),
+    'Rubber': ('rubber',),
+    'Bamboo': ('bamboo',),
+    'Cashew': ('cashew',),
+    'Shea': ('shea',),
+    'Vanilla': ('vanilla',),
+    'Banana': ('banana',),
+    'Avocado': ('avocado',),
+    'Coconut': ('coconut',),
+    'Honey': ('honey',),
+    'Olive': ('olive',),
+    'Seaweed': ('seaweed',),
+}
+
+# Currency symbols and codes that mark a budget amount
+CURRENCY_SYMBOLS = ('US$', 'R$', '$', '€', '£')
+CURRENCY_CODES = (
+    'USD', 'EUR', 'GBP', 'BRL', 'XAF', 'XOF', 'FCFA', 'CFA', 'KES', 'ETB', 'COP', 'MXN', 'INR', 'IDR',
+    'GHS', 'NGN', 'UGX', 'TZS', 'CHF',
+)
+CURRENCY_WORDS = ('dollars', 'euros', 'pounds', 'reais', 'francs')
@@ -0,0 +1,194 @@
+"""
+Streaming extractor for indicator recommendations in agent responses.
+
+The agent formats each recommendation as a block:
+
+    INDICATOR #1
+    ID: 42
+    Name: Soil organic carbon
+    Definition: Carbon stored in the top 30 cm of soil
+    ...
+    Accuracy: High
+    Cost: Low
+    Ease of Use: Medium
+
+IndicatorExtractor is a line-oriented state machine that can be fed text as
+it streams in. Attributes (accuracy/cost/ease) are scoped to the block they
+appear in, so repeated indicator names never pick up another block's values.
+Several fields may share a line, e.g. `ID: 42 | Name: Soil organic carbon`
+or `**Attributes:** Accuracy: High, Cost: Low, Ease of Use: High`.
+
+Agents with the record_recommendations tool also send the indicators as a
+typed `{"recommendations": [...]}` frame; recommendations_from_frame() reads
+those, and the text is then not parsed at all.
+"""
+
+import json
+import re
+import zlib
+
+_HEADER = re.compile(r'INDICATOR\s*#\s*(\d+)', re.IGNORECASE)
+_FIELD = re.compile(
+    r'\b(ID|Name|Full Definition|Definition|Accuracy|Cost|Ease[^:|,;]*?)[*_\s]*:',
+    re.IGNORECASE
+)
+# Stripped from both ends of a field value, including separators between fields
+_VALUE_STRIP = ' \t*_|,;'
+
+_WORD = re.compile(r'\w+')
+# Lines starting with these end a multi-line definition
+_DEFINITION_STOP = ('recommended', 'why', 'attributes', 'mapping', 'doi')
+
+MAX_DEFINITION_LENGTH = 500
+
+
+def _indicator_id(value):
+    value = value.strip()
+    if value.isdigit():
+        return int(value)
+    # Stable fallback for non-numeric IDs
+    return zlib.crc32(value.encode('utf-8')) % 1000
+
+
+class IndicatorExtractor:
+    """
+    Incremental indicator extractor.
+
+    feed() accepts arbitrary text chunks and returns indicators completed by
+    that chunk; close() flushes the last block. All extracted indicators are
+    also available on the `indicators` attribute.
+    """
+
+    def __init__(self):
+        self.indicators = []
+        self._partial = ''
+        self._block = None
+        self._in_definition = False
+
+    def feed(self, text):
+        start_count = len(self.indicators)
+        lines = (self._partial + text).split('\n')
+        self._partial = lines.pop()
+        for line in lines:
+            self._line(line)
+        return self.indicators[start_count:]
+
+    def close(self):
+        if self._partial:
+            self._line(self._partial)
+            self._partial = ''
+        self._finish_block()
+        return self.indicators
+
+    def _line(self, line):
+        # Cheap substring checks skip the regexes for most prose lines
+        header = _HEADER.search(line) if '#' in line else None
+        if header:
+            self._finish_block()
+            self._block = {}
+            self._in_definition = False
+            # Fields may follow the header on the same line
+            line = line[header.end():]
+
+        block = self._block
+        if block is None:
+            return
+
+        fields = list(_FIELD.finditer(line)) if ':' in line else None
+        if fields:
+            self._in_definition = False
+            for field, following in zip(fields, fields[1:] + [None]):
+                key = field.group(1).lower()
+                if key.endswith('definition'):
+                    # Definitions are prose and run to the end of the line
+                    value = line[field.end():].strip(' \t*_')
+                    if 'definition' not in block and value:
+                        block['definition'] = [value]
+                        self._in_definition = True
+                    break
+                value = line[field.end():following.start() if following else None].strip(_VALUE_STRIP)
+                if key == 'id':
+                    block.setdefault('id', value)
+                elif key == 'name':
+                    block.setdefault('name', value)
+                else:
+                    attribute = 'ease' if key.startswith('ease') else key
+                    word = _WORD.match(value)
+                    if word:
+                        block.setdefault(attribute, word.group(0))
+            return
+
+        if self._in_definition:
+            stripped = line.strip()
+            if not stripped or stripped.lower().startswith(_DEFINITION_STOP):
+                self._in_definition = False
+            else:
+                block['definition'].append(stripped)
+
+    def _finish_block(self):
+        block = self._block
+        self._block = None
+        self._in_definition = False
+        if not block or not all(key in block for key in ('id', 'name', 'definition')):
+            return
+        self.indicators.append(make_indicator({
+            'id': _indicator_id(block['id']),
+            'name': block['name'],
+            'definition': '\n'.join(block['definition']),
+            'cost': block.get('cost'),
+            'accuracy': block.get('accuracy'),
+            'ease': block.get('ease'),
+        }))
+
+
+def make_indicator(fields):
+    """An indicator in the shape /recommendations returns, with defaults for missing attributes."""
+    return {
+        'id': fields['id'],
+        'name': fields['name'],
+        'definition': (fields.get('definition') or '')[:MAX_DEFINITION_LENGTH],
+        'component': fields.get('component') or 'Unknown',
+        'class': fields.get('class') or 'Unknown',
+        'cost': fields.get('cost') or 'Medium',
+        'accuracy': fields.get('accuracy') or 'Medium',
+        'ease': fields.get('ease') or 'Medium',
+        'principle': fields.get('principle') or '',
+        'criterion': fields.get('criterion') or '',
+        'priority': fields.get('priority') or 'Primary',
+        'methods': list(fields.get('methods') or [])
+    }
+
+
+# Attribute names of a /recommendations indicator, for fields= projection
+INDICATOR_FIELDS = tuple(make_indicator({'id': 0, 'name': ''}))
+
+def recommendations_from_frame(data):
+    """
+    Indicators from the JSON data of a `{"recommendations": [...]}` frame, or
+    None for any other frame. Records without an integer id and a name are
+    skipped.
+    """
+    # Text frames are JSON strings; only objects need parsing, and frames are
+    # small enough to parse whatever their key order or whitespace
+    if not data.lstrip().startswith('{'):
+        return None
+    try:
+        frame = json.loads(data)
+    except ValueError:
+        return None
+    records = frame.get('recommendations') if isinstance(frame, dict) else None
+    if not isinstance(records, list):
+        return None
+    indicators = []
+    for record in records:
+        if not isinstance(record, dict) or not isinstance(record.get('id'), int) or not record.get('name'):
+            continue
+        indicators.append(make_indicator(record))
+    return indicators
+
+
+def extract_indicators(text):
+    """Extract all indicator blocks from a complete response."""
+    extractor = IndicatorExtractor()
+    extractor.feed(text)
+    return extractor.close()
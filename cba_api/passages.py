@@ -0,0 +1,113 @@
+"""
+Relevance-ranked passage selection for document analysis prompts.
+
+Sending Claude the first N characters of a document spends most of the
+tokens on the cover page, table of contents and background, and cuts off
+budget sections near the end. Instead the extracted text is split into
+passages of about PASSAGE_CHARS characters, each passage is scored by the
+location, commodity and budget cues it contains (cba_api.fields.cue_counts),
+and the best passages are packed into a token budget and returned in
+document order.
+"""
+
+import math
+import re
+
+from cba_api.fields import FIELD_NAMES, cue_counts
+
+PASSAGE_CHARS = 800
+# Rough size of a token in English prose
+CHARS_PER_TOKEN = 4
+# Marks text left out between selected passages
+OMITTED = '[...]'
+
+_PARAGRAPH_BREAK = re.compile(r'\n[ \t]*\n')
+# Table of contents lines: "Budget ........ 12"
+_TOC_LINE = re.compile(r'(?:\.\s?){4,}\s*\d+\s*$', re.M)
+
+
+def estimate_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _pieces(paragraph, size):
+    """Split a paragraph longer than size at line breaks, then hard at size."""
+    if len(paragraph) <= size:
+        yield paragraph
+        return
+    for line in paragraph.splitlines(keepends=True):
+        for start in range(0, len(line), size):
+            yield line[start:start + size]
+
+
+def split_passages(text, size=PASSAGE_CHARS):
+    """Split text into passages of at most about size characters, at paragraph boundaries where possible."""
+    passages, current = [], ''
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        for piece in _pieces(paragraph, size):
+            if current and len(current) + len(piece) + 2 > size:
+                passages.append(current)
+                current = ''
+            current = f'{current}\n\n{piece}' if current else piece
+    if current:
+        passages.append(current)
+    return passages
+
+
+def _score(passage, counts, fields):
+    score = sum(math.log1p(counts[name]) for name in fields)
+    if len(_TOC_LINE.findall(passage)) >= 3:
+        score *= 0.2
+    return score
+
+
+def score_passage(passage, fields=FIELD_NAMES):
+    """
+    Lexical relevance of a passage to the given fields. Each field's cue
+    count is log-damped, so a passage touching several fields beats one
+    repeating the same commodity; tables of contents are discounted.
+    """
+    return _score(passage, cue_counts(passage), fields)
+
+
+def select_passages(text, fields=FIELD_NAMES, token_budget=2000, size=PASSAGE_CHARS):
+    """
+    Return the passages of text most relevant to fields that fit in
+    token_budget, in document order, with OMITTED marking the gaps. Text
+    that already fits is returned unchanged.
+
+    The first passage (title and opening) is always kept, then the best
+    passage for each field, then the rest by score.
+    """
+    if estimate_tokens(text) <= token_budget:
+        return text
+    passages = split_passages(text, size)
+    counts = [cue_counts(passage) for passage in passages]
+    scores = [_score(passage, c, fields) for passage, c in zip(passages, counts)]
+
+    order = [0]
+    for name in fields:
+        with_cues = [i for i in range(len(passages)) if counts[i][name]]
+        if with_cues:
+            order.append(max(with_cues, key=lambda i: (counts[i][name], scores[i])))
+    order += sorted(range(len(passages)), key=lambda i: -scores[i])
+
+    budget = token_budget * CHARS_PER_TOKEN
+    selected, used = set(), 0
+    for i in order:
+        # Each passage also costs a separator and possibly an OMITTED marker
+        cost = len(passages[i]) + len(OMITTED) + 4
+        if i in selected or used + cost > budget:
+            continue
+        selected.add(i)
+        used += cost
+
+    parts, previous = [], -1
+    for i in sorted(selected):
+        if i != previous + 1:
+            parts.append(OMITTED)
+        parts.append(passages[i])
+        previous = i
+    if previous != len(passages) - 1:
+        parts.append(OMITTED)
+    return '\n\n'.join(parts)
@@ -0,0 +1,97 @@
+"""
+Lazy PDF text extraction for uploaded documents.
+
+handle_upload only sends the first few thousand characters of a document to
+the model, so pages are extracted one at a time and extraction stops as soon
+as the character budget is reached. Pages can optionally be extracted in a
+process pool (a few pages ahead of the consumer, so early termination still
+skips the rest). AWS Lambda has no /dev/shm, so if the pool cannot be created
+extraction falls back to a single process.
+"""
+
+import io
+import logging
+from collections import deque
+
+from cba_api.buffers import BufferReader
+
+logger = logging.getLogger(__name__)
+
+# Per-process reader used by pool workers
+_worker_reader = None
+
+
+def open_pdf(data):
+    from pypdf import PdfReader
+    # BytesIO shares a bytes object's buffer; other buffers are read in place
+    stream = io.BytesIO(data) if isinstance(data, bytes) else BufferReader(data)
+    return PdfReader(stream)
+
+
+def _init_worker(data):
+    global _worker_reader
+    _worker_reader = open_pdf(data)
+
+
+def _extract_page(index):
+    return _worker_reader.pages[index].extract_text() or ''
+
+
+def _create_pool(data, workers):
+    # Imported here: multiprocessing adds ~15 ms to every cold start otherwise
+    from concurrent.futures import ProcessPoolExecutor
+    try:
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(bytes(data),))
+    except (OSError, NotImplementedError, ImportError) as e:
+        logger.warning(f"Process pool unavailable ({e}); extracting PDF pages in-process")
+        return None
+
+
+def iter_pages(data, workers=0):
+    """
+    Yield the text of each page of a PDF, in order, extracting lazily.
+
+    With workers > 1, up to 2 * workers pages are extracted ahead of the
+    consumer in a process pool. Closing the generator early cancels the
+    remaining pages.
+    """
+    reader = open_pdf(data)
+    page_count = len(reader.pages)
+    pool = _create_pool(data, workers) if workers > 1 and page_count > 1 else None
+    if pool is None:
+        for page in reader.pages:
+            yield page.extract_text() or ''
+        return
+
+    pending = deque()
+    next_page = 0
+    try:
+        while next_page < page_count or pending:
+            while next_page < page_count and len(pending) < 2 * workers:
+                pending.append(pool.submit(_extract_page, next_page))
+                next_page += 1
+            yield pending.popleft().result()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def extract_text(data, max_chars=None, workers=0):
+    """
+    Extract text from PDF bytes, stopping once max_chars characters have
+    been collected (the result may run past max_chars by part of a page).
+    Pages without text are skipped; pages are joined with newlines.
+    """
+    parts = []
+    total = 0
+    pages = iter_pages(data, workers=workers)
+    try:
+        for text in pages:
+            if not text:
+                continue
+            parts.append(text)
+            total += len(text) + 1
+            if max_chars is not None and total >= max_chars:
+                break
+    finally:
+        pages.close()
+    return '\n'.join(parts)
@@ -0,0 +1,143 @@
+"""
+Incremental Server-Sent Events decoder for AgentCore runtime responses.
+
+AgentCore streams `data: <json>\n\n` frames, but chunk boundaries are
+arbitrary: a frame (or a multi-byte UTF-8 character) can be split across
+chunks. SSEDecoder buffers raw bytes in a single bytearray, scans it for line
+boundaries in place and decodes each complete payload once, so split frames
+and characters are reassembled correctly without per-line copies.
+"""
+
+from json.decoder import scanstring
+
+_DATA = b'data:'
+_EVENT = b'event:'
+
+
+class SSEEvent:
+    """A single dispatched server-sent event."""
+
+    __slots__ = ('event', 'data')
+
+    def __init__(self, data, event='message'):
+        self.event = event
+        self.data = data
+
+    @property
+    def text(self):
+        """
+        The JSON-decoded string payload, or None if the payload is not a
+        JSON string (e.g. an object frame or malformed data).
+        """
+        data = self.data
+        if data[:1] != '"':
+            return None
+        # scanstring is the C string scanner behind json.loads; calling it
+        # directly skips the generic decoder for the common string-only frame
+        try:
+            value, end = scanstring(data, 1)
+        except ValueError:
+            return None
+        return value if end == len(data) else None
+
+    def encode(self):
+        """Re-encode the event as SSE wire bytes."""
+        lines = [] if self.event == 'message' else [f"event: {self.event}"]
+        lines.extend(f"data: {line}" for line in self.data.split('\n'))
+        return ('\n'.join(lines) + '\n\n').encode('utf-8')
+
+    def __eq__(self, other):
+        return isinstance(other, SSEEvent) and (self.event, self.data) == (other.event, other.data)
+
+    def __repr__(self):
+        return f"SSEEvent(event={self.event!r}, data={self.data!r})"
+
+
+class SSEDecoder:
+    """
+    Incremental SSE decoder.
+
+    Feed raw byte chunks with feed(); each call returns the events completed
+    by that chunk. Call close() at end of stream to flush a trailing event
+    that was not terminated by a blank line.
+    """
+
+    def __init__(self):
+        self._buf = bytearray()
+        self._data = []
+        self._event = None
+
+    def feed(self, chunk):
+        buf = self._buf
+        buf += chunk
+        end = buf.rfind(b'\n')
+        if end < 0:
+            return []
+        events = []
+        data = self._data
+        find = buf.find
+        startswith = buf.startswith
+        pos = 0
+        # Newlines never occur inside a UTF-8 multi-byte sequence, so complete
+        # lines are found by offset and each payload is decoded straight from
+        # the buffer; the partial tail stays in the buffer for the next chunk.
+        while pos <= end:
+            nl = find(b'\n', pos)
+            # Fast paths for the common "data: ..." line and the blank line
+            # ending a single-line unnamed event; everything else (event
+            # names, CRLF, comments, multi-line data) goes through _line
+            if startswith(b'data: ', pos) and buf[nl - 1] != 13:
+                value = buf[pos + 6:nl].decode()
+                if nl < end and buf[nl + 1] == 10 and not data and self._event is None:
+                    events.append(SSEEvent(value))
+                    nl += 1
+                else:
+                    data.append(value)
+            elif nl == pos and len(data) == 1 and self._event is None:
+                events.append(SSEEvent(data.pop()))
+            else:
+                self._line(bytes(buf[pos:nl]), events)
+            pos = nl + 1
+        # Compact once per chunk
+        del buf[:pos]
+        return events
+
+    def close(self):
+        events = []
+        if self._buf:
+            self._line(bytes(self._buf), events)
+            self._buf.clear()
+        self._dispatch(events)
+        return events
+
+    def _line(self, line, events):
+        if line[-1:] == b'\r':  # CRLF
+            line = line[:-1]
+        if not line:
+            self._dispatch(events)
+        elif line.startswith(_DATA):
+            self._data.append(_field_value(line, 5))
+        elif line.startswith(_EVENT):
+            self._event = _field_value(line, 6)
+        # Comments (":...") and unknown fields (id, retry) are ignored
+
+    def _dispatch(self, events):
+        if self._data:
+            events.append(SSEEvent('\n'.join(self._data), self._event or 'message'))
+            self._data.clear()
+        self._event = None
+
+
+def _field_value(line, offset):
+    # A single space after the colon is part of the syntax, not the value
+    if line[offset:offset + 1] == b' ':
+        offset += 1
+    return line[offset:].decode('utf-8')
+
+
+def iter_events(chunks):
+    """Yield SSEEvents from an iterable of byte chunks as they complete."""
+    decoder = SSEDecoder()
+    for chunk in chunks:
+        yield from decoder.feed(chunk)
+    yield from decoder.close()
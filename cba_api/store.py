@@ -0,0 +1,286 @@
+"""
+Keyed TTL storage for the Lambda.
+
+Stores implement a small key-value interface (get/put/delete) with per-entry
+expiry. They back the recommendations (keyed by session_id), the upload
+cache (by content hash) and the upload status records (by upload id):
+
+- MemoryStore: bounded LRU with TTL expiry, local to one container
+- SQLiteStore: durable local stand-in (also useful for tests and dev)
+- DynamoDBStore: durable store shared by all Lambda instances
+- TieredStore: MemoryStore in front of a durable store, read-through and
+  write-through
+
+Every store keeps hit/miss/eviction counters available via stats().
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class StoreStats:
+    """Counters shared by all store implementations."""
+
+    __slots__ = ('hits', 'misses', 'writes', 'evictions', 'expirations')
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self):
+        stats = {name: getattr(self, name) for name in self.__slots__}
+        stats['hit_rate'] = round(self.hit_rate, 4)
+        return stats
+
+
+class KeyValueStore:
+    """Interface for string-keyed stores of JSON-serializable values with a TTL."""
+
+    def __init__(self, ttl_seconds, clock=time.time):
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.counters = StoreStats()
+
+    def get(self, key):
+        """Return the stored value for key, or None if missing or expired."""
+        raise NotImplementedError
+
+    def put(self, key, value, expires_at=None):
+        """Store a JSON-serializable value. expires_at defaults to now + ttl."""
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def stats(self):
+        return self.counters.as_dict()
+
+    def _expires_at(self, expires_at):
+        return expires_at if expires_at is not None else self.clock() + self.ttl_seconds
+
+
+# Name from before the stores also backed the upload cache and status
+RecommendationsStore = KeyValueStore
+
+
+class MemoryStore(KeyValueStore):
+    """In-memory LRU store bounded by entry count, with per-entry TTL."""
+
+    def __init__(self, max_entries=1000, ttl_seconds=86400, clock=time.time):
+        super().__init__(ttl_seconds, clock)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self.get_entry(key)[0]
+
+    def get_entry(self, key):
+        """Return (value, expires_at), or (None, None) if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.counters.misses += 1
+                return None, None
+            if entry[1] <= self.clock():
+                del self._entries[key]
+                self.counters.expirations += 1
+                self.counters.misses += 1
+                return None, None
+            self._entries.move_to_end(key)
+            self.counters.hits += 1
+            return entry
+
+    def put(self, key, value, expires_at=None):
+        with self._lock:
+            self._entries[key] = (value, self._expires_at(expires_at))
+            self._entries.move_to_end(key)
+            self.counters.writes += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteStore(KeyValueStore):
+    """
+    Durable key-value store in a local SQLite file (stand-in for DynamoDB),
+    keyed by the TEXT column `key_column` (`session_id` by default).
+    """
+
+    def __init__(self, path=':memory:', ttl_seconds=86400, clock=time.time, table='recommendations',
+                 key_column='session_id'):
+        super().__init__(ttl_seconds, clock)
+        self.table = table
+        self.key_column = key_column
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            f'CREATE TABLE IF NOT EXISTS {table} '
+            f'({key_column} TEXT PRIMARY KEY, payload TEXT NOT NULL, expires_at REAL NOT NULL)'
+        )
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self.get_entry(key)[0]
+
+    def get_entry(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                f'SELECT payload, expires_at FROM {self.table} WHERE {self.key_column} = ?', (key,)
+            ).fetchone()
+            if row is None:
+                self.counters.misses += 1
+                return None, None
+            if row[1] <= self.clock():
+                self._conn.execute(f'DELETE FROM {self.table} WHERE {self.key_column} = ?', (key,))
+                self.counters.expirations += 1
+                self.counters.misses += 1
+                return None, None
+            self.counters.hits += 1
+            return json.loads(row[0]), row[1]
+
+    def put(self, key, value, expires_at=None):
+        with self._lock:
+            self._conn.execute(
+                f'INSERT OR REPLACE INTO {self.table} ({self.key_column}, payload, expires_at) VALUES (?, ?, ?)',
+                (key, json.dumps(value), self._expires_at(expires_at))
+            )
+            self.counters.writes += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute(f'DELETE FROM {self.table} WHERE {self.key_column} = ?', (key,))
+
+    def purge_expired(self):
+        """Delete all expired rows. Returns the number removed."""
+        with self._lock:
+            removed = self._conn.execute(
+                f'DELETE FROM {self.table} WHERE expires_at <= ?', (self.clock(),)
+            ).rowcount
+            self.counters.evictions += removed
+            return removed
+
+
+class DynamoDBStore(KeyValueStore):
+    """
+    Durable store in a DynamoDB table with partition key `key_attribute`
+    (S, `session_id` by default).
+    Enable DynamoDB TTL on the `expires_at` attribute so expired items are
+    deleted; reads also ignore items past expiry since TTL deletion is lazy.
+    Point `client` at DynamoDB Local (endpoint_url) for local testing.
+    """
+
+    def __init__(self, table_name, client, ttl_seconds=86400, clock=time.time, key_attribute='session_id'):
+        super().__init__(ttl_seconds, clock)
+        self.table_name = table_name
+        self.key_attribute = key_attribute
+        self.client = client
+
+    def get(self, key):
+        return self.get_entry(key)[0]
+
+    def get_entry(self, key):
+        item = self.client.get_item(
+            TableName=self.table_name,
+            Key={self.key_attribute: {'S': key}},
+            ConsistentRead=True
+        ).get('Item')
+        if item is None:
+            self.counters.misses += 1
+            return None, None
+        expires_at = float(item['expires_at']['N'])
+        if expires_at <= self.clock():
+            self.counters.expirations += 1
+            self.counters.misses += 1
+            return None, None
+        self.counters.hits += 1
+        return json.loads(item['payload']['S']), expires_at
+
+    def put(self, key, value, expires_at=None):
+        self.client.put_item(
+            TableName=self.table_name,
+            Item={
+                self.key_attribute: {'S': key},
+                'payload': {'S': json.dumps(value)},
+                # DynamoDB TTL requires epoch seconds as an integer
+                'expires_at': {'N': str(int(self._expires_at(expires_at)))}
+            }
+        )
+        self.counters.writes += 1
+
+    def delete(self, key):
+        self.client.delete_item(TableName=self.table_name, Key={self.key_attribute: {'S': key}})
+
+
+class TieredStore(KeyValueStore):
+    """
+    A MemoryStore in front of a durable store.
+    Reads go to memory first and fall back to the durable store, populating
+    memory on a hit (read-through). Writes go to both (write-through), so
+    other Lambda instances see them immediately.
+
+    Memory entries live for the memory store's own ttl_seconds (capped at the
+    durable expiry), so a value another instance overwrites in the durable
+    store is picked up once the local copy expires. Keep it short for keys
+    that are rewritten, such as a session's recommendations.
+    """
+
+    def __init__(self, memory, durable):
+        super().__init__(durable.ttl_seconds, memory.clock)
+        self.memory = memory
+        self.durable = durable
+
+    def _memory_expires_at(self, expires_at):
+        return min(expires_at, self.clock() + self.memory.ttl_seconds)
+
+    def get(self, key):
+        value, _ = self.memory.get_entry(key)
+        if value is not None:
+            self.counters.hits += 1
+            return value
+        value, expires_at = self.durable.get_entry(key)
+        if value is None:
+            self.counters.misses += 1
+            return None
+        self.counters.hits += 1
+        self.memory.put(key, value, self._memory_expires_at(expires_at))
+        return value
+
+    def put(self, key, value, expires_at=None):
+        expires_at = self._expires_at(expires_at)
+        # Memory first, so this instance still serves the value if the durable write fails
+        self.memory.put(key, value, self._memory_expires_at(expires_at))
+        self.durable.put(key, value, expires_at)
+        self.counters.writes += 1
+
+    def delete(self, key):
+        self.durable.delete(key)
+        self.memory.delete(key)
+
+    def stats(self):
+        stats = self.counters.as_dict()
+        stats['memory'] = self.memory.stats()
+        stats['durable'] = self.durable.stats()
+        return stats
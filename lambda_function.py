@@ -1,56 +1,214 @@
+import base64
 import json
-import boto3
 import uuid
-import base64
+import hashlib
 import os
-import io
 import logging
+import time
+from http import HTTPStatus
+from urllib.parse import parse_qsl, unquote_plus
+
+from cba_api import timing
+from cba_api.aws import create_client as create_aws_client
+from cba_api.buffers import decode_base64, put_object as put_s3_object
+from cba_api.encoding import choose_encoding, compress, etag, etag_matches, paginate, parse_fields, project
+from cba_api.indicators import INDICATOR_FIELDS, IndicatorExtractor, extract_indicators, recommendations_from_frame
+from cba_api.sse import iter_events
+from cba_api.store import DynamoDBStore, MemoryStore, SQLiteStore, TieredStore
+from cba_api.timing import RequestTimer
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# PDF extraction - pypdf must be included in Lambda layer
-try:
-    from pypdf import PdfReader
-    PDF_SUPPORT = True
-except ImportError:
-    logger.warning("pypdf not available - PDF text extraction disabled")
-    PDF_SUPPORT = False
-
 # Get configuration from environment variables (with fallbacks for local dev)
 AGENT_ARN = os.environ.get('BEDROCK_AGENTCORE_ARN', 'arn:aws:bedrock-agentcore:us-west-2:687995992314:runtime/cbaindicatoragent_Agent-buoE288RIT')
 UPLOAD_BUCKET = os.environ.get('UPLOAD_BUCKET_NAME', 'cba-indicator-uploads')
 AWS_REGION = os.environ.get('AWS_REGION', 'us-west-2')
 
-agentcore = boto3.client('bedrock-agentcore', region_name=AWS_REGION)
-s3 = boto3.client('s3', region_name=AWS_REGION)
-bedrock_runtime = boto3.client('bedrock-runtime', region_name=AWS_REGION)
+# Per-request stage timings as CloudWatch EMF log lines and a Server-Timing header
+REQUEST_METRICS = os.environ.get('REQUEST_METRICS', 'on').lower() != 'off'
+METRICS_NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'CBAIndicatorApi')
+# JSON bodies smaller than this are sent uncompressed
+COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', '1024'))
+
+# Characters of document text extracted for analysis
+DOCUMENT_CHAR_LIMIT = 60000
+# Approximate tokens of the most relevant passages sent to the model
+DOCUMENT_TOKEN_BUDGET = int(os.environ.get('DOCUMENT_TOKEN_BUDGET', '2000'))
+# Processes used to extract PDF pages (0 = in-process; Lambda has no /dev/shm)
+PDF_EXTRACT_WORKERS = int(os.environ.get('PDF_EXTRACT_WORKERS', '0'))
+# Fields extracted deterministically at or above this confidence aren't sent to Claude
+FIELD_CONFIDENCE_THRESHOLD = float(os.environ.get('FIELD_CONFIDENCE_THRESHOLD', '0.6'))
+# How each field is described to Claude
+FIELD_PROMPTS = {
+    'location': 'Location/Region',
+    'commodity': 'Primary Commodity/Product',
+    'budget': 'Budget Range',
+}
+
+# AWS clients and stores are created on first use, so a cold start only pays
+# for what its route needs (OPTIONS needs nothing; importing boto3 and
+# creating a client each take ~100 ms). Tests replace these globals directly.
+agentcore = None
+s3 = None
+bedrock_runtime = None
+recommendations_store = None
+upload_cache = None
+upload_status_store = None
+
+def lazy_global(name, factory):
+    """Return module global name, creating it with factory() on first use."""
+    value = globals()[name]
+    if value is None:
+        value = globals()[name] = factory()
+    return value
+
+def create_client(service_name, call_type='storage', **kwargs):
+    """Pooled, instrumented client with timeouts and retries for call_type (see cba_api/aws.py)."""
+    return create_aws_client(service_name, call_type, region_name=AWS_REGION, **kwargs)
+
+def get_agentcore():
+    return lazy_global('agentcore', lambda: create_client('bedrock-agentcore', 'stream'))
+
+def get_s3():
+    return lazy_global('s3', lambda: create_client('s3'))
+
+def get_bedrock_runtime():
+    return lazy_global('bedrock_runtime', lambda: create_client('bedrock-runtime', 'model'))
+
+# Recommendations store: a bounded LRU+TTL memory tier, optionally in front of
+# a durable tier shared by all Lambda instances (DynamoDB, or SQLite locally)
+RECOMMENDATIONS_TABLE_NAME = os.environ.get('RECOMMENDATIONS_TABLE_NAME')
+RECOMMENDATIONS_DB_PATH = os.environ.get('RECOMMENDATIONS_DB_PATH')
+RECOMMENDATIONS_TTL_SECONDS = int(os.environ.get('RECOMMENDATIONS_TTL_SECONDS', '86400'))
+RECOMMENDATIONS_CACHE_SIZE = int(os.environ.get('RECOMMENDATIONS_CACHE_SIZE', '1000'))
+# How long an instance serves its memory copy before re-reading the durable
+# tier, where another instance may have stored a newer list for the session
+RECOMMENDATIONS_MEMORY_TTL_SECONDS = int(os.environ.get('RECOMMENDATIONS_MEMORY_TTL_SECONDS', '5'))
+
+def create_dynamodb_client():
+    # endpoint_url: e.g. DynamoDB Local
+    return create_client('dynamodb', endpoint_url=os.environ.get('DYNAMODB_ENDPOINT_URL'))
+
+def create_store(name, table_name, db_path, ttl_seconds, cache_size, key_attribute='session_id',
+                 memory_ttl_seconds=None, key_column='session_id'):
+    """
+    Build a memory store, tiered in front of DynamoDB or SQLite when configured.
+    memory_ttl_seconds bounds how long the memory tier of a tiered store keeps
+    a value (default: ttl_seconds, for values that never change).
+    """
+    if table_name or db_path:
+        memory_ttl = min(ttl_seconds, memory_ttl_seconds if memory_ttl_seconds is not None else ttl_seconds)
+    else:
+        memory_ttl = ttl_seconds
+    memory = MemoryStore(max_entries=cache_size, ttl_seconds=memory_ttl)
+    if table_name:
+        durable = DynamoDBStore(table_name, create_dynamodb_client(), ttl_seconds=ttl_seconds, key_attribute=key_attribute)
+    elif db_path:
+        durable = SQLiteStore(db_path, ttl_seconds=ttl_seconds, table=name, key_column=key_column)
+    else:
+        logger.warning(f"No durable {name} store configured - using per-container memory only")
+        return memory
+    return TieredStore(memory, durable)
+
+def create_recommendations_store():
+    """Build the recommendations store from environment configuration."""
+    return create_store(
+        'recommendations', RECOMMENDATIONS_TABLE_NAME, RECOMMENDATIONS_DB_PATH,
+        RECOMMENDATIONS_TTL_SECONDS, RECOMMENDATIONS_CACHE_SIZE,
+        memory_ttl_seconds=RECOMMENDATIONS_MEMORY_TTL_SECONDS
+    )
+
+def get_recommendations_store():
+    return lazy_global('recommendations_store', create_recommendations_store)
+
+# Upload cache: analysis results keyed by SHA-256 of the uploaded file, so a
+# re-uploaded document skips S3, text extraction and the model call
+UPLOAD_CACHE_TABLE_NAME = os.environ.get('UPLOAD_CACHE_TABLE_NAME')
+UPLOAD_CACHE_DB_PATH = os.environ.get('UPLOAD_CACHE_DB_PATH')
+UPLOAD_CACHE_TTL_SECONDS = int(os.environ.get('UPLOAD_CACHE_TTL_SECONDS', '604800'))
+UPLOAD_CACHE_SIZE = int(os.environ.get('UPLOAD_CACHE_SIZE', '256'))
 
-# In-memory store for recommendations (in production, use DynamoDB)
-recommendations_store = {}
+def create_upload_cache():
+    """Build the upload cache from environment configuration."""
+    return create_store(
+        'upload_cache', UPLOAD_CACHE_TABLE_NAME, UPLOAD_CACHE_DB_PATH,
+        UPLOAD_CACHE_TTL_SECONDS, UPLOAD_CACHE_SIZE, key_attribute='content_sha256', key_column='sha256'
+    )
+
+def get_upload_cache():
+    return lazy_global('upload_cache', create_upload_cache)
+
+# Direct-to-S3 uploads: the browser POSTs the file to a presigned URL under
+# INCOMING_PREFIX, an S3 event runs the analysis, and the client polls
+# /upload/status. Status records have no memory tier so that every Lambda
+# instance sees the latest state.
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+INCOMING_PREFIX = 'incoming/'
+PRESIGNED_UPLOAD_EXPIRES_SECONDS = int(os.environ.get('PRESIGNED_UPLOAD_EXPIRES_SECONDS', '900'))
+UPLOAD_STATUS_TABLE_NAME = os.environ.get('UPLOAD_STATUS_TABLE_NAME')
+UPLOAD_STATUS_TTL_SECONDS = 86400
+
+def create_upload_status_store():
+    """Build the upload status store from environment configuration."""
+    if UPLOAD_STATUS_TABLE_NAME:
+        return DynamoDBStore(
+            UPLOAD_STATUS_TABLE_NAME, create_dynamodb_client(),
+            ttl_seconds=UPLOAD_STATUS_TTL_SECONDS, key_attribute='upload_id'
+        )
+    if UPLOAD_CACHE_DB_PATH:
+        return SQLiteStore(
+            UPLOAD_CACHE_DB_PATH, ttl_seconds=UPLOAD_STATUS_TTL_SECONDS, table='upload_status', key_column='upload_id'
+        )
+    logger.warning("No durable upload status store configured - using per-container memory only")
+    return MemoryStore(ttl_seconds=UPLOAD_STATUS_TTL_SECONDS)
+
+def get_upload_status_store():
+    return lazy_global('upload_status_store', create_upload_status_store)
 
 def lambda_handler(event, context):
+    if not REQUEST_METRICS:
+        return route_request(event)[1](event)
+
+    timer = RequestTimer()
+    with timer.activate():
+        with timer.stage('routing'):
+            timer.route, handler = route_request(event)
+        result = handler(event)
+    if 'headers' in result:
+        result['headers']['Server-Timing'] = timer.server_timing()
+        # Lets the cross-origin frontend read Server-Timing
+        result['headers']['Timing-Allow-Origin'] = '*'
+    timer.emit(METRICS_NAMESPACE, StatusCode=result.get('statusCode', 200))
+    return result
+
+def route_request(event):
+    """Return (route name, handler) for an API Gateway or S3 event."""
+    # S3 ObjectCreated notifications for direct uploads
+    if 'Records' in event:
+        return 's3_event', handle_s3_event
+
     path = event.get('rawPath', event.get('path', ''))
     method = event.get('requestContext', {}).get('http', {}).get('method', 'POST')
     
     # Handle CORS preflight
     if method == 'OPTIONS':
-        return cors_response()
+        return 'options', lambda event: cors_response()
     
     # Route to appropriate handler (handle both /chat and /prod/chat)
     if '/chat' in path:
-        return handle_chat(event)
+        return 'chat', handle_chat
+    elif '/upload/presign' in path:
+        return 'upload_presign', handle_upload_presign
+    elif '/upload/status' in path:
+        return 'upload_status', handle_upload_status
     elif '/upload' in path:
-        return handle_upload(event)
+        return 'upload', handle_upload
     elif '/recommendations' in path:
-        return handle_recommendations(event)
+        return 'recommendations', handle_recommendations
     else:
-        return {
-            'statusCode': 404,
-            'headers': cors_headers(),
-            'body': json.dumps({'error': 'Not found'})
-        }
+        return 'not_found', lambda event: error_response('Not found', 404)
 
 def cors_headers():
     """Return standard CORS headers."""
@@ -77,239 +235,605 @@ def error_response(message, status_code=400):
         'body': json.dumps({'error': message})
     }
 
-def handle_chat(event):
-    try:
-        body = json.loads(event.get('body', '{}'))
-        message = body.get('message', '')
-        session_id = body.get('session_id') or str(uuid.uuid4())
-        
-        # Input validation
-        if not message or not message.strip():
-            return error_response("Message is required", 400)
-        if len(message) > 10000:
-            return error_response("Message too long. Maximum 10000 characters.", 400)
-        
-        payload = json.dumps({"prompt": message}).encode()
-        
-        response = agentcore.invoke_agent_runtime(
+def request_header(event, name):
+    """A request header value (case-insensitive, for API Gateway v1 and v2 events), or None."""
+    headers = event.get('headers') or {}
+    value = headers.get(name)
+    if value is None:
+        name = name.lower()
+        value = next((v for k, v in headers.items() if k.lower() == name), None)
+    return value
+
+def json_response(event, body, status_code=200, conditional=False):
+    """
+    Return a JSON response, compressed with brotli or gzip when the client
+    accepts it and the body is at least COMPRESS_MIN_BYTES. With
+    conditional=True the body carries an ETag, and a request whose
+    If-None-Match matches it gets an empty 304.
+    """
+    headers = cors_headers()
+    headers['Vary'] = 'Accept-Encoding'
+    with timing.stage('encode'):
+        payload = json.dumps(body, separators=(',', ':')).encode('utf-8')
+        if conditional:
+            tag = etag(payload)
+            headers['ETag'] = tag
+            # Browsers revalidate on every poll instead of reusing a stale copy
+            headers['Cache-Control'] = 'no-cache'
+            headers['Access-Control-Expose-Headers'] = 'ETag'
+            if etag_matches(request_header(event, 'If-None-Match'), tag):
+                return {'statusCode': 304, 'headers': headers, 'body': ''}
+        encoding = None
+        if len(payload) >= COMPRESS_MIN_BYTES:
+            encoding = choose_encoding(request_header(event, 'Accept-Encoding'))
+        if encoding is None:
+            return {'statusCode': status_code, 'headers': headers, 'body': payload.decode('utf-8')}
+        headers['Content-Encoding'] = encoding
+        return {
+            'statusCode': status_code,
+            'headers': headers,
+            'body': base64.b64encode(compress(payload, encoding)).decode('ascii'),
+            'isBase64Encoded': True
+        }
+
+def parse_chat_body(raw_body):
+    """
+    Parse and validate a /chat request body.
+    Returns (message, session_id, error) where error is a message string or None.
+    """
+    body = json.loads(raw_body or '{}')
+    message = body.get('message', '')
+    session_id = body.get('session_id') or str(uuid.uuid4())
+    
+    # Input validation
+    if not message or not message.strip():
+        return message, session_id, "Message is required"
+    if len(message) > 10000:
+        return message, session_id, "Message too long. Maximum 10000 characters."
+    return message, session_id, None
+
+def invoke_agent(message, session_id):
+    """Start an AgentCore runtime invocation and return the raw streaming response."""
+    payload = json.dumps({"prompt": message}).encode()
+    with timing.stage('agent_invoke'):
+        return get_agentcore().invoke_agent_runtime(
             agentRuntimeArn=AGENT_ARN,
             runtimeSessionId=session_id,
             payload=payload,
             qualifier="DEFAULT"
         )
-        
-        content = []
-        for chunk in response.get("response", []):
-            decoded = chunk.decode('utf-8')
-            for line in decoded.split('\n'):
-                line = line.strip()
-                if line.startswith('data: '):
-                    text = line[6:].strip().strip('"')
-                    if text:
-                        content.append(text)
-        
-        # Join and clean up formatting
-        response_text = ''.join(content)
-        response_text = response_text.replace('\\n', '\n')  # Fix escaped newlines
-        
-        # Try to extract indicator recommendations from the response
-        indicators = extract_indicators_from_response(response_text)
-        if indicators:
-            # Store recommendations for this session
-            recommendations_store[session_id] = {
-                'indicators': indicators,
-                'timestamp': str(uuid.uuid1())  # For TTL tracking
-            }
+
+def iter_agent_frames(response):
+    """
+    Yield (event, text) for each SSE event of an AgentCore response as soon as
+    it is complete. text is the JSON-decoded string payload, or None for
+    non-text frames.
+    """
+    body = response.get("response", [])
+    timer = timing.current()
+    if timer is not None:
+        body = timed_chunks(body, timer)
+    for sse in iter_events(body):
+        yield sse, sse.text
+
+def timed_chunks(chunks, timer):
+    """
+    Pass raw response chunks through, recording time spent waiting for them
+    (agent_wait), time to the first one (first_chunk) and their count.
+    """
+    clock = timer.clock
+    chunks = iter(chunks)
+    wait = 0.0
+    count = 0
+    try:
+        while True:
+            start = clock()
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                return
+            wait += clock() - start
+            if not count:
+                timer.mark('first_chunk')
+            count += 1
+            yield chunk
+    finally:
+        timer.record('agent_wait', wait * 1000)
+        timer.count('chunks', count)
+
+def read_agent_response(response):
+    """
+    Consume an AgentCore response. Indicators come from the agent's typed
+    recommendations frame when it sends one; until then text is fed to the
+    indicator extractor as it arrives. Returns (response_text, indicators).
+    """
+    content = []
+    extractor = IndicatorExtractor()
+    recorded = None
+    timer = timing.current()
+    clock = timer.clock if timer is not None else time.perf_counter
+    stream_start = clock()
+    extract_ms = 0.0
+    for sse, text in iter_agent_frames(response):
+        if text:
+            content.append(text)
+            if recorded is None:
+                start = clock()
+                extractor.feed(text)
+                extract_ms += (clock() - start) * 1000
+        elif text is None:
+            frame_indicators = recommendations_from_frame(sse.data)
+            if frame_indicators is not None:
+                recorded = frame_indicators
+    stream_ms = (clock() - stream_start) * 1000
+    # Stream time not spent waiting for chunks or extracting indicators
+    parse_ms = stream_ms - extract_ms - (timer.durations.get('agent_wait', 0.0) if timer is not None else 0.0)
+    start = clock()
+    indicators = recorded if recorded is not None else extractor.close()
+    extract_ms += (clock() - start) * 1000
+    if timer is not None:
+        timer.record('agent_stream', stream_ms)
+        timer.record('sse_parse', max(0.0, parse_ms))
+        timer.record('indicators', extract_ms)
+    return ''.join(content), indicators
+
+def store_recommendations(session_id, indicators):
+    """Store extracted indicator recommendations for a session."""
+    if indicators:
+        try:
+            with timing.stage('store_put'):
+                get_recommendations_store().put(session_id, {
+                    'indicators': indicators,
+                    'timestamp': time.time()
+                })
             logger.info(f"Stored {len(indicators)} indicators for session {session_id}")
+        except Exception as e:
+            # Don't fail the chat turn if the durable store is unavailable
+            logger.error(f"Failed to store recommendations for session {session_id}: {e}")
+
+def handle_chat(event):
+    try:
+        message, session_id, error = parse_chat_body(event.get('body', '{}'))
+        if error:
+            return error_response(error, 400)
         
-        return {
-            'statusCode': 200,
-            'headers': cors_headers(),
-            'body': json.dumps({
-                'response': response_text,
-                'session_id': session_id,
-                'has_recommendations': len(indicators) > 0
-            })
-        }
+        response = invoke_agent(message, session_id)
+        response_text, indicators = read_agent_response(response)
+        store_recommendations(session_id, indicators)
+        
+        return json_response(event, {
+            'response': response_text,
+            'session_id': session_id,
+            'has_recommendations': len(indicators) > 0
+        })
     except Exception as e:
         logger.error(f"Chat handler error: {e}")
         return error_response(f"Chat processing failed: {str(e)}", 500)
 
-def handle_upload(event):
+def sse_event(event_name, data):
+    """Encode a named server-sent event with a JSON payload."""
+    return f"event: {event_name}\ndata: {json.dumps(data)}\n\n".encode('utf-8')
+
+def stream_chat(message, session_id):
+    """
+    Streaming variant of /chat.
+    Forwards each AgentCore `data:` frame as soon as it arrives while
+    extracting indicators from the text, then stores the recommendations
+    and ends with a `done` event. The agent's typed recommendations frame is
+    sent on as a `recommendations` event and replaces text extraction.
+    """
     try:
-        # Get base64 encoded file
-        body = event.get('body', '')
-        is_base64 = event.get('isBase64Encoded', False)
-        
-        if not body:
-            return error_response("No file content provided", 400)
-        
-        if isinstance(body, str):
-            if is_base64:
-                file_bytes = base64.b64decode(body)
-            else:
-                # Some API Gateway configs pass base64 but don't set isBase64Encoded
-                try:
-                    file_bytes = base64.b64decode(body, validate=True)
-                except Exception:
-                    file_bytes = body.encode()
-        else:
-            file_bytes = body
-        
-        # Validate file size (max 10MB)
-        if len(file_bytes) > 10 * 1024 * 1024:
-            return error_response("File too large. Maximum size is 10MB.", 413)
-        
-        # Upload to S3
-        file_key = f"uploads/{uuid.uuid4()}.pdf"
-        s3.put_object(Bucket=UPLOAD_BUCKET, Key=file_key, Body=file_bytes)
-        s3_uri = f"s3://{UPLOAD_BUCKET}/{file_key}"
-        logger.info(f"File uploaded to {s3_uri}")
+        response = invoke_agent(message, session_id)
+        extractor = IndicatorExtractor()
+        recorded = None
+        for sse, text in iter_agent_frames(response):
+            if text is None:
+                frame_indicators = recommendations_from_frame(sse.data)
+                if frame_indicators is not None:
+                    recorded = frame_indicators
+                    yield sse_event('recommendations', {'indicators': recorded})
+                    continue
+            elif text and recorded is None:
+                extractor.feed(text)
+            yield sse.encode()
         
-        # Extract text from PDF
-        document_text = ""
-        if PDF_SUPPORT:
-            try:
-                reader = PdfReader(io.BytesIO(file_bytes))
-                text_parts = []
-                for page in reader.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_parts.append(page_text)
-                document_text = "\n".join(text_parts)
-                logger.info(f"Extracted {len(document_text)} characters from PDF")
-            except Exception as pdf_error:
-                logger.error(f"PDF extraction failed: {pdf_error}")
-                return error_response(f"Could not read PDF file: {str(pdf_error)}", 422)
+        indicators = recorded if recorded is not None else extractor.close()
+        store_recommendations(session_id, indicators)
+        yield sse_event('done', {
+            'session_id': session_id,
+            'has_recommendations': len(indicators) > 0
+        })
+    except Exception as e:
+        logger.error(f"Chat stream error: {e}")
+        yield sse_event('error', {'error': f"Chat processing failed: {str(e)}"})
+
+def chat_stream_app(environ, start_response):
+    """
+    WSGI entry point for streaming deployments (Lambda Web Adapter behind a
+    Function URL with InvokeMode RESPONSE_STREAM).
+    POST /chat/stream returns text/event-stream; all other routes are passed
+    through to lambda_handler unchanged.
+    """
+    method = environ.get('REQUEST_METHOD', 'GET')
+    path = environ.get('PATH_INFO', '')
+    length = int(environ.get('CONTENT_LENGTH') or 0)
+    raw_body = environ['wsgi.input'].read(length) if length else b''
+    
+    if method == 'POST' and path.endswith('/chat/stream'):
+        try:
+            message, session_id, error = parse_chat_body(raw_body)
+        except ValueError:
+            message, session_id, error = None, None, "Invalid JSON body"
+        if error:
+            result = error_response(error, 400)
         else:
-            return error_response("PDF processing not available. Please contact support.", 503)
-        
-        if not document_text.strip():
-            return error_response("PDF appears to be empty or contains no extractable text.", 422)
-        
-        # Use Claude to analyze the document content (truncate to avoid token limits)
-        truncated_text = document_text[:15000]  # ~4k tokens
-        prompt = """Analyze this project document and extract:
-1. Location/Region
-2. Primary Commodity/Product
-3. Budget Range
-
-Return ONLY a JSON object with these fields: {"location": "...", "commodity": "...", "budget": "..."}
+            headers = cors_headers()
+            headers['Content-Type'] = 'text/event-stream'
+            headers['Cache-Control'] = 'no-cache'
+            start_response('200 OK', list(headers.items()))
+            return stream_chat(message, session_id)
+    else:
+        query = dict(parse_qsl(environ.get('QUERY_STRING', '')))
+        headers = {
+            key[5:].replace('_', '-').lower(): value
+            for key, value in environ.items() if key.startswith('HTTP_')
+        }
+        result = lambda_handler({
+            'rawPath': path,
+            'requestContext': {'http': {'method': method}},
+            'headers': headers,
+            'queryStringParameters': query or None,
+            'body': raw_body,
+            'isBase64Encoded': False
+        }, None)
+    
+    body = result.get('body', '')
+    if result.get('isBase64Encoded'):
+        body = base64.b64decode(body)
+    elif isinstance(body, str):
+        body = body.encode('utf-8')
+    start_response(f"{result['statusCode']} {HTTPStatus(result['statusCode']).phrase}", list(result['headers'].items()))
+    return [body]
+
+class DocumentAnalysisError(Exception):
+    """A document that can't be analyzed, with the HTTP status to report."""
+
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+# PDF extraction - pypdf must be included in Lambda layer. It is imported on
+# the first upload rather than at cold start.
+PDF_SUPPORT = None
+
+def pdf_support():
+    global PDF_SUPPORT
+    if PDF_SUPPORT is None:
+        try:
+            import pypdf  # noqa: F401
+            PDF_SUPPORT = True
+        except ImportError:
+            logger.warning("pypdf not available - PDF text extraction disabled")
+            PDF_SUPPORT = False
+    return PDF_SUPPORT
+
+def analyze_document(file_bytes):
+    """
+    Extract text from PDF bytes and find the project's location, commodity
+    and budget: deterministically where the document states them plainly
+    (cba_api/fields.py), otherwise by asking Claude for the remaining
+    fields. Returns (document_text, fields, answered); fields maps each of
+    the three names to a value or None, and answered is False when Claude's
+    answer for the remaining fields couldn't be parsed.
+    """
+    # Upload-only modules; importing them at cold start would slow every route
+    from cba_api.fields import FIELD_NAMES, confident_fields, extract_fields
+    from cba_api.pdf import extract_text as extract_pdf_text
+
+    # Extract text from PDF
+    document_text = ""
+    if pdf_support():
+        try:
+            # Only the first DOCUMENT_CHAR_LIMIT characters are analyzed,
+            # so stop extracting pages once we have that many
+            with timing.stage('pdf_extract'):
+                document_text = extract_pdf_text(
+                    file_bytes, max_chars=DOCUMENT_CHAR_LIMIT, workers=PDF_EXTRACT_WORKERS
+                )
+            logger.info(f"Extracted {len(document_text)} characters from PDF")
+        except Exception as pdf_error:
+            logger.error(f"PDF extraction failed: {pdf_error}")
+            raise DocumentAnalysisError(f"Could not read PDF file: {str(pdf_error)}", 422)
+    else:
+        raise DocumentAnalysisError("PDF processing not available. Please contact support.", 503)
+    
+    if not document_text.strip():
+        raise DocumentAnalysisError("PDF appears to be empty or contains no extractable text.", 422)
+    
+    # Fields stated plainly in the document don't need a model call
+    with timing.stage('field_extract'):
+        fields, missing = confident_fields(extract_fields(document_text), FIELD_CONFIDENCE_THRESHOLD)
+    logger.info(f"Extracted {sorted(fields)} deterministically; asking Claude for {missing}")
+    answered = True
+    if missing:
+        claude_fields = ask_claude_for_fields(document_text, missing, partial=bool(fields))
+        answered = claude_fields is not None
+        fields.update(claude_fields or {})
+    return document_text, {name: fields.get(name) or None for name in FIELD_NAMES}, answered
+
+def ask_claude_for_fields(document_text, names, partial=False):
+    """
+    Ask Claude for the given fields of a document. Returns {name: value or
+    None}. An unparseable answer raises DocumentAnalysisError, unless other
+    fields are already known (partial=True), in which case it returns None.
+    """
+    from cba_api.passages import select_passages
+
+    # Send Claude the passages most likely to mention these fields
+    with timing.stage('passage_select'):
+        excerpt = select_passages(document_text, names, token_budget=DOCUMENT_TOKEN_BUDGET)
+    items = '\n'.join(f"{i}. {FIELD_PROMPTS[name]}" for i, name in enumerate(names, 1))
+    shape = ', '.join(f'"{name}": "..."' for name in names)
+    prompt = f"""Analyze this project document and extract:
+{items}
+
+Return ONLY a JSON object with these fields: {{{shape}}}
 If a field cannot be determined, use null for that field."""
-        
-        response = bedrock_runtime.invoke_model(
+    
+    with timing.stage('model_call'):
+        response = get_bedrock_runtime().invoke_model(
             modelId='us.anthropic.claude-sonnet-4-5-20250929-v1:0',
             body=json.dumps({
                 "anthropic_version": "bedrock-2023-05-31",
                 "max_tokens": 500,
                 "messages": [{
                     "role": "user",
-                    "content": f"{prompt}\n\nDocument content:\n{truncated_text}"
+                    "content": f"{prompt}\n\nDocument content ([...] marks omitted text):\n{excerpt}"
                 }]
             })
         )
-        
         result = json.loads(response['body'].read())
-        extracted = result['content'][0]['text']
+    extracted = result['content'][0]['text']
+    
+    # Try to parse JSON - handle markdown code blocks
+    extracted_clean = extracted.strip()
+    if extracted_clean.startswith('```'):
+        # Remove markdown code block
+        lines = extracted_clean.split('\n')
+        extracted_clean = '\n'.join(lines[1:-1] if lines[-1] == '```' else lines[1:])
+    
+    try:
+        data = json.loads(extracted_clean)
+    except json.JSONDecodeError as e:
+        logger.error(f"Failed to parse Claude response as JSON: {e}\nResponse: {extracted}")
+        if partial:
+            return None
+        raise DocumentAnalysisError("Could not extract project information from document. Please ensure it contains location, commodity, and budget details.", 422)
+    
+    return {name: data.get(name) or None for name in names}
+
+def upload_result(fields, s3_uri):
+    """Format analyzed fields to match frontend expectations."""
+    found = {}
+    missing = []
+    
+    if fields.get('location'):
+        found['location'] = fields['location']
+    else:
+        missing.append('Project Location')
         
-        # Try to parse JSON - handle markdown code blocks
-        extracted_clean = extracted.strip()
-        if extracted_clean.startswith('```'):
-            # Remove markdown code block
-            lines = extracted_clean.split('\n')
-            extracted_clean = '\n'.join(lines[1:-1] if lines[-1] == '```' else lines[1:])
+    if fields.get('commodity'):
+        found['commodity'] = fields['commodity']
+    else:
+        missing.append('Primary Commodity')
         
-        try:
-            data = json.loads(extracted_clean)
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse Claude response as JSON: {e}\nResponse: {extracted}")
-            return error_response("Could not extract project information from document. Please ensure it contains location, commodity, and budget details.", 422)
+    if fields.get('budget'):
+        found['budget'] = fields['budget']
+    else:
+        missing.append('Budget Range')
+    
+    return {'found': found, 'missing': missing, 's3_uri': s3_uri}
+
+def get_cached_upload(content_hash):
+    """Look up a previous analysis of the same file; cache errors count as misses."""
+    try:
+        with timing.stage('cache_get'):
+            return get_upload_cache().get(content_hash)
+    except Exception as e:
+        logger.error(f"Failed to read upload cache: {e}")
+        return None
+
+def cache_upload(content_hash, s3_uri, document_text, fields):
+    try:
+        with timing.stage('cache_put'):
+            get_upload_cache().put(content_hash, {
+                's3_uri': s3_uri,
+                'document_text': document_text,
+                'fields': fields,
+                'timestamp': time.time()
+            })
+    except Exception as e:
+        logger.error(f"Failed to write upload cache: {e}")
+
+def analyze_upload(file_bytes, s3_uri=None):
+    """
+    Analyze an uploaded file and return the /upload response body.
+    Files not already in S3 (s3_uri None) are stored under uploads/ first.
+    Raises DocumentAnalysisError for documents that can't be analyzed.
+    """
+    # Same bytes, same analysis: skip S3, extraction and Claude on a repeat upload
+    with timing.stage('hash'):
+        content_hash = hashlib.sha256(file_bytes).hexdigest()
+    cached = get_cached_upload(content_hash)
+    if cached:
+        logger.info(f"Upload cache hit for {content_hash}")
+        return upload_result(cached['fields'], cached['s3_uri'])
+    
+    if s3_uri is None:
+        # Upload to S3 (content-addressed, so re-uploads overwrite the same object)
+        file_key = f"uploads/{content_hash}.pdf"
+        with timing.stage('s3_put'):
+            put_s3_object(get_s3(), UPLOAD_BUCKET, file_key, file_bytes)
+        s3_uri = f"s3://{UPLOAD_BUCKET}/{file_key}"
+        logger.info(f"File uploaded to {s3_uri}")
+    
+    document_text, fields, answered = analyze_document(file_bytes)
+    # An unparseable answer may be transient; let a re-upload ask Claude again
+    if answered:
+        cache_upload(content_hash, s3_uri, document_text, fields)
+    else:
+        logger.warning(f"Not caching {content_hash}: Claude's answer couldn't be parsed")
+    return upload_result(fields, s3_uri)
+
+def handle_upload(event):
+    try:
+        # Get base64 encoded file
+        body = event.get('body', '')
+        is_base64 = event.get('isBase64Encoded', False)
+        
+        if not body:
+            return error_response("No file content provided", 400)
         
-        # Format response to match frontend expectations
-        found = {}
-        missing = []
+        # Decode into a single buffer; S3 and pypdf read it through memoryviews
+        with timing.stage('decode'):
+            if isinstance(body, str):
+                if is_base64:
+                    file_bytes = decode_base64(body)
+                else:
+                    # Some API Gateway configs pass base64 but don't set isBase64Encoded
+                    try:
+                        file_bytes = decode_base64(body, validate=True)
+                    except Exception:
+                        file_bytes = memoryview(body.encode())
+            else:
+                file_bytes = memoryview(body)
         
-        if data.get('location'):
-            found['location'] = data['location']
-        else:
-            missing.append('Project Location')
-            
-        if data.get('commodity'):
-            found['commodity'] = data['commodity']
-        else:
-            missing.append('Primary Commodity')
-            
-        if data.get('budget'):
-            found['budget'] = data['budget']
-        else:
-            missing.append('Budget Range')
+        # Validate file size (max 10MB)
+        if len(file_bytes) > MAX_UPLOAD_BYTES:
+            return error_response("File too large. Maximum size is 10MB.", 413)
         
         return {
             'statusCode': 200,
             'headers': cors_headers(),
-            'body': json.dumps({'found': found, 'missing': missing, 's3_uri': s3_uri})
+            'body': json.dumps(analyze_upload(file_bytes))
         }
+    except DocumentAnalysisError as e:
+        return error_response(e.message, e.status_code)
     except Exception as e:
         logger.error(f"Upload handler error: {e}")
         return error_response(f"Upload processing failed: {str(e)}", 500)
 
-def extract_indicators_from_response(response_text):
+def set_upload_status(upload_id, status, **details):
+    get_upload_status_store().put(upload_id, {'status': status, 'updated_at': time.time(), **details})
+
+def handle_upload_presign(event):
     """
-    Extract structured indicator data from agent response.
-    Parses the formatted output to create indicator objects.
+    Handle POST /upload/presign
+    Returns a presigned S3 POST for uploading a PDF directly to the bucket.
+    The S3 event handler analyzes the file; poll /upload/status for the result.
     """
-    indicators = []
-    
-    # Look for indicator blocks in the response
-    # Format: INDICATOR #X with ID, Name, Definition, Method, Attributes
-    import re
-    
-    # Pattern to match indicator blocks
-    indicator_pattern = r'INDICATOR #(\d+).*?ID:\s*([^\n]+).*?Name:\s*([^\n]+).*?(?:Full Definition|Definition):\s*([^\n]+(?:\n(?!Recommended|Why|Attributes|Mapping|DOI)[^\n]+)*)'
-    
-    matches = re.findall(indicator_pattern, response_text, re.DOTALL | re.IGNORECASE)
-    
-    for match in matches:
+    try:
+        upload_id = str(uuid.uuid4())
+        presigned = get_s3().generate_presigned_post(
+            Bucket=UPLOAD_BUCKET,
+            Key=f"{INCOMING_PREFIX}{upload_id}.pdf",
+            Fields={'Content-Type': 'application/pdf'},
+            Conditions=[
+                {'Content-Type': 'application/pdf'},
+                ['content-length-range', 1, MAX_UPLOAD_BYTES]
+            ],
+            ExpiresIn=PRESIGNED_UPLOAD_EXPIRES_SECONDS
+        )
+        set_upload_status(upload_id, 'pending')
+        return {
+            'statusCode': 200,
+            'headers': cors_headers(),
+            'body': json.dumps({
+                'upload_id': upload_id,
+                'url': presigned['url'],
+                'fields': presigned['fields'],
+                'expires_in': PRESIGNED_UPLOAD_EXPIRES_SECONDS
+            })
+        }
+    except Exception as e:
+        logger.error(f"Presign error: {e}")
+        return error_response(f"Could not prepare upload: {str(e)}", 500)
+
+def handle_s3_event(event):
+    """
+    Analyze files uploaded to INCOMING_PREFIX, triggered by S3 ObjectCreated
+    notifications, and record the outcome for /upload/status.
+    """
+    processed = 0
+    for record in event.get('Records', []):
+        s3_info = record.get('s3', {})
+        bucket = s3_info.get('bucket', {}).get('name')
+        key = unquote_plus(s3_info.get('object', {}).get('key', ''))
+        if not key.startswith(INCOMING_PREFIX) or not key.endswith('.pdf'):
+            logger.warning(f"Ignoring S3 event for {bucket}/{key}")
+            continue
+        upload_id = key[len(INCOMING_PREFIX):-len('.pdf')]
+        set_upload_status(upload_id, 'processing')
         try:
-            indicator = {
-                'id': int(match[1].strip()) if match[1].strip().isdigit() else hash(match[1].strip()) % 1000,
-                'name': match[2].strip(),
-                'definition': match[3].strip()[:500],  # Truncate long definitions
-                'component': 'Unknown',  # Could be parsed if present
-                'class': 'Unknown',
-                'cost': 'Medium',
-                'accuracy': 'Medium',
-                'ease': 'Medium',
-                'principle': '',
-                'criterion': '',
-                'priority': 'Primary',
-                'methods': []
-            }
-            
-            # Try to extract attributes if present
-            attr_match = re.search(r'Accuracy:\s*(\w+)', response_text[response_text.find(match[2]):])
-            if attr_match:
-                indicator['accuracy'] = attr_match.group(1)
-            
-            cost_match = re.search(r'Cost:\s*(\w+)', response_text[response_text.find(match[2]):])
-            if cost_match:
-                indicator['cost'] = cost_match.group(1)
-            
-            ease_match = re.search(r'Ease[^:]*:\s*(\w+)', response_text[response_text.find(match[2]):])
-            if ease_match:
-                indicator['ease'] = ease_match.group(1)
-            
-            indicators.append(indicator)
+            if s3_info['object'].get('size', 0) > MAX_UPLOAD_BYTES:
+                raise DocumentAnalysisError("File too large. Maximum size is 10MB.", 413)
+            with timing.stage('s3_get'):
+                file_bytes = get_s3().get_object(Bucket=bucket, Key=key)['Body'].read()
+            result = analyze_upload(file_bytes, s3_uri=f"s3://{bucket}/{key}")
+            set_upload_status(upload_id, 'complete', result=result)
+        except DocumentAnalysisError as e:
+            set_upload_status(upload_id, 'failed', error=e.message, status_code=e.status_code)
         except Exception as e:
-            logger.warning(f"Failed to parse indicator: {e}")
-            continue
-    
-    return indicators
+            logger.error(f"S3 upload analysis error for {key}: {e}")
+            set_upload_status(upload_id, 'failed', error=f"Upload processing failed: {str(e)}", status_code=500)
+        processed += 1
+    return {'processed': processed}
+
+def handle_upload_status(event):
+    """
+    Handle GET /upload/status?upload_id=xxx
+    Returns pending/processing/failed, or complete with the /upload response fields.
+    """
+    try:
+        params = event.get('queryStringParameters', {}) or {}
+        upload_id = params.get('upload_id')
+        if not upload_id:
+            return error_response("upload_id is required", 400)
+        
+        with timing.stage('store_get'):
+            record = get_upload_status_store().get(upload_id)
+        if not record:
+            return error_response("Unknown upload_id", 404)
+        
+        body = {'upload_id': upload_id, 'status': record['status']}
+        if record['status'] == 'complete':
+            body.update(record['result'])
+        elif record['status'] == 'failed':
+            body['error'] = record['error']
+        return {
+            'statusCode': 200,
+            'headers': cors_headers(),
+            'body': json.dumps(body)
+        }
+    except Exception as e:
+        logger.error(f"Upload status error: {e}")
+        return error_response(f"Failed to get upload status: {str(e)}", 500)
+
+def extract_indicators_from_response(response_text):
+    """
+    Extract structured indicator data from a complete agent response.
+    Parses the formatted output to create indicator objects.
+    """
+    return extract_indicators(response_text)
 
 def handle_recommendations(event):
     """
-    Handle GET /recommendations?session_id=xxx
-    Returns stored indicator recommendations for a session.
+    Handle GET /recommendations?session_id=xxx[&fields=name,cost][&limit=10][&cursor=...]
+    Returns stored indicator recommendations for a session. fields= limits
+    each indicator to the listed attributes (id is always included); limit
+    pages the list, and next_cursor fetches the following page. Responses
+    carry an ETag, so repeat polls with If-None-Match get an empty 304.
     """
     try:
         # Get session_id from query parameters
@@ -319,28 +843,59 @@ def handle_recommendations(event):
         if not session_id:
             return error_response("session_id query parameter is required", 400)
         
+        try:
+            fields = parse_fields(params.get('fields'), INDICATOR_FIELDS)
+        except ValueError as e:
+            return error_response(str(e), 400)
+        limit = params.get('limit')
+        if limit is not None:
+            if not limit.isdigit() or int(limit) < 1:
+                return error_response("limit must be a positive integer", 400)
+            limit = int(limit)
+        
         # Look up recommendations for this session
-        session_data = recommendations_store.get(session_id)
+        with timing.stage('store_get'):
+            session_data = get_recommendations_store().get(session_id)
         
         if not session_data:
             # Return empty array if no recommendations found
-            return {
-                'statusCode': 200,
-                'headers': cors_headers(),
-                'body': json.dumps({
-                    'indicators': [],
-                    'message': 'No recommendations found for this session. Please complete the chat conversation first.'
-                })
-            }
+            return json_response(event, {
+                'indicators': [],
+                'message': 'No recommendations found for this session. Please complete the chat conversation first.'
+            }, conditional=True)
         
-        return {
-            'statusCode': 200,
-            'headers': cors_headers(),
-            'body': json.dumps({
-                'indicators': session_data['indicators'],
-                'session_id': session_id
-            })
-        }
+        indicators = session_data['indicators']
+        body = {'session_id': session_id}
+        if limit is not None or params.get('cursor'):
+            try:
+                indicators, body['next_cursor'] = paginate(
+                    indicators, limit, params.get('cursor'), session_data.get('timestamp')
+                )
+            except ValueError as e:
+                return error_response(str(e), 400)
+            body['total'] = len(session_data['indicators'])
+        body['indicators'] = project(indicators, fields)
+        return json_response(event, body, conditional=True)
     except Exception as e:
         logger.error(f"Recommendations handler error: {e}")
         return error_response(f"Failed to retrieve recommendations: {str(e)}", 500)
+
+def make_chat_stream_server(host='', port=8080):
+    """
+    WSGI server for chat_stream_app with a thread per request, so one
+    long-running stream doesn't hold up other requests.
+    """
+    from socketserver import ThreadingMixIn
+    from wsgiref.simple_server import WSGIServer, make_server
+
+    class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+        daemon_threads = True
+
+    return make_server(host, port, chat_stream_app, server_class=ThreadingWSGIServer)
+
+if __name__ == "__main__":
+    # Local / Lambda Web Adapter server for the streaming /chat/stream route
+    port = int(os.environ.get('PORT', '8080'))
+    logger.addHandler(logging.StreamHandler())
+    logger.info(f"Serving on port {port}")
+    make_chat_stream_server('', port).serve_forever()
@@ -0,0 +1,92 @@
+"""
+Tests for the tuned boto3 client factory (cba_api/aws.py). Requests are
+answered in-process by a botocore before-send hook.
+"""
+
+import ast
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+pytest.importorskip('boto3')
+from botocore.awsrequest import AWSResponse
+
+from cba_api import aws
+
+AGENT_COPY = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'agentcore-cba', 'cbaindicatoragent', 'src', 'aws_clients.py'
+)
+
+
+class Raw:
+    def __init__(self, body):
+        self.body = body
+
+    def stream(self, **kwargs):
+        yield self.body
+
+
+@pytest.fixture(autouse=True)
+def credentials(monkeypatch):
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'test')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'test')
+    monkeypatch.setattr(aws, '_stats', {})
+
+
+def respond(client, statuses):
+    """Answer the client's requests with the statuses popped from a list, then 200s."""
+    def send(request, **kwargs):
+        status = statuses.pop(0) if statuses else 200
+        body = b'{"__type": "InternalServerError"}' if status >= 500 else b'{}'
+        return AWSResponse(request.url, status, {}, Raw(body))
+
+    client.meta.events.register('before-send', send)
+
+
+def test_client_config_per_call_type():
+    client = aws.create_client('dynamodb', 'storage', region_name='us-west-2', max_pool_connections=7)
+    model = aws.create_client('bedrock-runtime', 'model', region_name='us-west-2')
+
+    assert client.meta.config.max_pool_connections == 7
+    assert client.meta.config.read_timeout == aws.CALL_TYPES['storage']['read_timeout']
+    assert client.meta.config.retries['mode'] == 'adaptive'
+    assert client.meta.config.tcp_keepalive is True
+    assert model.meta.config.read_timeout == aws.CALL_TYPES['model']['read_timeout']
+    assert model.meta.config.max_pool_connections == aws.MAX_POOL_CONNECTIONS
+
+
+def test_client_stats_count_calls_retries_and_errors(monkeypatch):
+    # Two attempts per call keeps retry backoff short
+    monkeypatch.setitem(aws.CALL_TYPES, 'storage', dict(aws.CALL_TYPES['storage'], max_attempts=2))
+    client = aws.create_client('dynamodb', region_name='us-west-2')
+    statuses = [500]
+    respond(client, statuses)
+    client.list_tables()
+    statuses.extend([500] * 10)
+    with pytest.raises(client.exceptions.InternalServerError):
+        client.list_tables()
+
+    stats = aws.client_stats()['dynamodb']
+    assert stats['calls'] == 2
+    assert stats['errors'] == 1
+    assert stats['retries'] == 2
+    assert stats['max_ms'] >= stats['avg_ms'] > 0
+
+
+def code_without_docstring(path):
+    with open(path, encoding='utf-8') as f:
+        module = ast.parse(f.read())
+    if ast.get_docstring(module) is not None:
+        module.body = module.body[1:]
+    return ast.dump(module)
+
+
+def test_agent_copy_matches():
+    """The agent container's aws_clients.py must stay a copy of cba_api/aws.py."""
+    assert code_without_docstring(AGENT_COPY) == code_without_docstring(aws.__file__), (
+        f"{AGENT_COPY} differs from cba_api/aws.py; copy the change across"
+    )
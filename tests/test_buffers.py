@@ -0,0 +1,125 @@
+"""
+Tests for low-copy upload body handling (cba_api/buffers.py), including a
+tracemalloc bound on handle_upload's peak memory.
+"""
+
+import base64
+import binascii
+import io
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from cba_api.buffers import BufferReader, decode_base64, put_object
+
+PDF_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'cba_inputs', 'Use Case Coffee Brazil.pdf'
+)
+
+
+class FakeMultipartS3:
+    def __init__(self):
+        self.objects = {}
+        self.parts = []
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self.objects[Key] = Body.read()
+
+    def create_multipart_upload(self, Bucket, Key, **kwargs):
+        return {'UploadId': 'u1'}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.parts.append((PartNumber, Body.read()))
+        return {'ETag': f'"{PartNumber}"'}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        assert [p['PartNumber'] for p in MultipartUpload['Parts']] == [n for n, _ in self.parts]
+        self.objects[Key] = b''.join(data for _, data in self.parts)
+
+
+@pytest.mark.parametrize('size', [0, 1, 2, 3, 1000, 300001])
+def test_decode_base64_matches_b64decode(size):
+    data = os.urandom(size)
+    encoded = base64.b64encode(data).decode()
+
+    assert decode_base64(encoded, chunk_chars=4096) == data
+    assert decode_base64(encoded, validate=True, chunk_chars=4096) == data
+
+
+def test_decode_base64_with_line_breaks_falls_back():
+    data = os.urandom(10000)
+    encoded = base64.encodebytes(data).decode()  # newline every 76 characters
+
+    assert decode_base64(encoded, chunk_chars=4096) == data
+    with pytest.raises(binascii.Error):
+        decode_base64(encoded, validate=True)
+
+
+def test_buffer_reader_is_a_seekable_file():
+    reader = BufferReader(memoryview(bytearray(b'0123456789')))
+
+    assert reader.read(3) == b'012'
+    reader.seek(-2, io.SEEK_END)
+    assert reader.read() == b'89'
+    reader.seek(1)
+    assert io.BufferedReader(reader).read(4) == b'1234'
+    assert len(reader) == 10
+
+
+def test_put_object_multipart_for_large_bodies():
+    s3 = FakeMultipartS3()
+    data = memoryview(bytearray(os.urandom(2500)))
+    put_object(s3, 'bucket', 'small', data[:100], multipart_threshold=1000, part_size=1000)
+    put_object(s3, 'bucket', 'large', data, multipart_threshold=1000, part_size=1000)
+
+    assert s3.objects['small'] == bytes(data[:100])
+    assert s3.objects['large'] == bytes(data)
+    assert [len(part) for _, part in s3.parts] == [1000, 1000, 500]
+
+
+def test_handle_upload_peak_memory():
+    """Decoding, hashing, S3 and PDF parsing share one buffer the size of the file."""
+    pypdf = pytest.importorskip('pypdf')
+    import lambda_function
+    from cba_api.store import MemoryStore
+
+    # A ~6MB PDF: real pages plus an incompressible attachment
+    writer = pypdf.PdfWriter(clone_from=PDF_PATH)
+    writer.add_attachment('data.bin', os.urandom(6 * 1024 * 1024))
+    out = io.BytesIO()
+    writer.write(out)
+    file_size = len(out.getvalue())
+    event = {'body': base64.b64encode(out.getvalue()).decode(), 'isBase64Encoded': True}
+    del writer, out
+
+    class DiscardS3:
+        def put_object(self, Bucket, Key, Body, **kwargs):
+            while Body.read(64 * 1024):
+                pass
+
+    class FakeBedrockRuntime:
+        def invoke_model(self, **kwargs):
+            text = json.dumps({'location': 'Brazil', 'commodity': 'Coffee', 'budget': None})
+            return {'body': io.BytesIO(json.dumps({'content': [{'text': text}]}).encode())}
+
+    lambda_function.s3 = DiscardS3()
+    lambda_function.bedrock_runtime = FakeBedrockRuntime()
+    lambda_function.upload_cache = MemoryStore()
+
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        result = lambda_function.handle_upload(event)
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+    assert result['statusCode'] == 200
+    # base64.b64decode alone peaked at ~2.3x the file size (ASCII copy + output)
+    assert peak < 1.3 * file_size
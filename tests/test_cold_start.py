@@ -0,0 +1,43 @@
+"""
+Tests that importing lambda_function and serving routes that need no AWS
+client or PDF parsing don't load boto3 or pypdf (see
+benchmarks/bench_cold_start.py for timings).
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import json, sys
+import lambda_function
+for event in json.loads(sys.argv[1]):
+    assert lambda_function.lambda_handler(event, None)['statusCode'] == 200
+print(json.dumps(sorted(name for name in ('boto3', 'botocore', 'pypdf') if name in sys.modules)))
+"""
+
+
+def loaded_modules(*events):
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD, json.dumps(events)],
+        cwd=ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    # Earlier lines are the handler's EMF metrics
+    return json.loads(output.splitlines()[-1])
+
+
+def test_import_loads_no_heavy_modules():
+    assert loaded_modules() == []
+
+
+def test_preflight_and_recommendations_load_no_heavy_modules():
+    options = {'rawPath': '/prod/chat', 'requestContext': {'http': {'method': 'OPTIONS'}}}
+    recommendations = {
+        'rawPath': '/prod/recommendations', 'requestContext': {'http': {'method': 'GET'}},
+        'queryStringParameters': {'session_id': 's1'}
+    }
+
+    assert loaded_modules(options, recommendations) == []
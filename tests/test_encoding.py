@@ -0,0 +1,130 @@
+"""
+Tests for compressed, conditional responses (cba_api/encoding.py) and the
+/recommendations projection and pagination in lambda_function.py.
+"""
+
+import base64
+import gzip
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import lambda_function
+from cba_api import encoding
+from cba_api.encoding import choose_encoding, decode_cursor, etag, etag_matches, paginate, parse_fields, project
+from cba_api.indicators import INDICATOR_FIELDS, make_indicator
+from cba_api.store import MemoryStore
+
+INDICATORS = [
+    make_indicator({'id': i, 'name': f'Indicator {i}', 'definition': 'What it measures. ' * 20})
+    for i in range(1, 8)
+]
+
+
+def setup_function(function):
+    lambda_function.recommendations_store = MemoryStore()
+    lambda_function.recommendations_store.put('s1', {'indicators': INDICATORS, 'timestamp': 1700000000.5})
+
+
+def get_recommendations(headers=None, **params):
+    return lambda_function.handle_recommendations({
+        'headers': headers or {},
+        'queryStringParameters': {'session_id': 's1', **params}
+    })
+
+
+def response_json(result):
+    body = result['body']
+    if result.get('isBase64Encoded'):
+        body = base64.b64decode(body)
+        if result['headers']['Content-Encoding'] == 'gzip':
+            body = gzip.decompress(body)
+    return json.loads(body)
+
+
+def test_choose_encoding_follows_q_values(monkeypatch):
+    monkeypatch.setattr(encoding, '_brotli', False)
+    assert choose_encoding('gzip, deflate, br') == 'gzip'
+    assert choose_encoding('gzip;q=0') is None
+    assert choose_encoding('*') == 'gzip'
+    assert choose_encoding('identity') is None
+    assert choose_encoding(None) is None
+
+
+def test_choose_encoding_prefers_brotli_when_installed(monkeypatch):
+    monkeypatch.setattr(encoding, '_brotli', object())
+    assert choose_encoding('gzip, deflate, br') == 'br'
+    assert choose_encoding('br;q=0.5, gzip') == 'gzip'
+
+
+def test_etag_matching():
+    tag = etag(b'{"indicators":[]}')
+    assert tag.startswith('W/"')
+    assert etag_matches(tag, tag)
+    assert etag_matches(f'"other", {tag.removeprefix("W/")}', tag)
+    assert etag_matches('*', tag)
+    assert not etag_matches('"other"', tag)
+    assert not etag_matches(None, tag)
+
+
+def test_fields_and_pages():
+    assert parse_fields('name, cost', INDICATOR_FIELDS) == ['name', 'cost']
+    assert parse_fields('', INDICATOR_FIELDS) is None
+    with pytest.raises(ValueError):
+        parse_fields('name,secret', INDICATOR_FIELDS)
+    assert project(INDICATORS[:1], ['name']) == [{'id': 1, 'name': 'Indicator 1'}]
+
+    page, cursor = paginate(INDICATORS, 3, None, 'v1')
+    assert [i['id'] for i in page] == [1, 2, 3]
+    assert decode_cursor(cursor) == (3, 'v1')
+    page, cursor = paginate(INDICATORS, 5, cursor, 'v1')
+    assert [i['id'] for i in page] == [4, 5, 6, 7] and cursor is None
+    with pytest.raises(ValueError):
+        paginate(INDICATORS, 3, 'not-a-cursor', 'v1')
+
+
+def test_recommendations_gzip_and_304():
+    result = get_recommendations({'Accept-Encoding': 'gzip, deflate'})
+    assert result['statusCode'] == 200
+    assert result['headers']['Content-Encoding'] == 'gzip'
+    assert result['headers']['Vary'] == 'Accept-Encoding'
+    assert len(base64.b64decode(result['body'])) < len(json.dumps(INDICATORS)) / 4
+    assert response_json(result)['indicators'] == INDICATORS
+
+    repeat = get_recommendations({'if-none-match': result['headers']['ETag']})
+    assert repeat['statusCode'] == 304
+    assert repeat['body'] == ''
+    assert repeat['headers']['ETag'] == result['headers']['ETag']
+
+    lambda_function.store_recommendations('s1', INDICATORS[:2])
+    assert get_recommendations({'If-None-Match': result['headers']['ETag']})['statusCode'] == 200
+
+
+def test_recommendations_small_bodies_are_not_compressed():
+    result = get_recommendations({'Accept-Encoding': 'gzip'}, fields='name', limit='2')
+    assert 'Content-Encoding' not in result['headers']
+    assert response_json(result)['indicators'] == [{'id': 1, 'name': 'Indicator 1'}, {'id': 2, 'name': 'Indicator 2'}]
+
+
+def test_recommendations_pagination():
+    first = response_json(get_recommendations(limit='4', fields='name'))
+    assert first['total'] == 7
+    assert [i['id'] for i in first['indicators']] == [1, 2, 3, 4]
+
+    second = response_json(get_recommendations(limit='4', fields='name', cursor=first['next_cursor']))
+    assert [i['id'] for i in second['indicators']] == [5, 6, 7]
+    assert second['next_cursor'] is None
+
+    # A new chat turn replaces the list; its old cursors are refused
+    lambda_function.store_recommendations('s1', INDICATORS)
+    assert get_recommendations(limit='4', cursor=first['next_cursor'])['statusCode'] == 400
+
+
+def test_recommendations_rejects_bad_parameters():
+    assert get_recommendations(fields='name,password')['statusCode'] == 400
+    assert get_recommendations(limit='0')['statusCode'] == 400
+    assert get_recommendations(limit='ten')['statusCode'] == 400
@@ -0,0 +1,65 @@
+"""
+Tests for deterministic upload field extraction (cba_api/fields.py).
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from cba_api.fields import confident_fields, extract_budget, extract_commodity, extract_fields, extract_location
+
+
+def test_location_names_country_and_main_region():
+    text = (
+        'Regenerative Coffee in Minas Gerais, Brazil\n'
+        'Farms across Minas Gerais and the Cerrado biome. Brazil is the largest producer; '
+        'Minas Gerais grows half of its coffee. Exports go to Germany.'
+    )
+    value, confidence = extract_location(text)
+
+    # Biomes count towards the country but aren't named
+    assert value == 'Minas Gerais, Brazil'
+    assert confidence >= 0.9
+
+
+def test_location_falls_back_to_supranational_region():
+    value, confidence = extract_location('Millet farming across the Sahel. The Sahel is semi-arid.')
+
+    assert value == 'Sahel'
+    # Capped below a named country
+    assert confidence == pytest.approx(0.8)
+
+
+def test_commodity_prefers_the_dominant_one():
+    assert extract_commodity('Cotton yields, cotton prices, cotton gins.') == ('Cotton', 1.0)
+    value, confidence = extract_commodity('Cotton and sorghum. Cotton yields, cotton prices.')
+    assert value == 'Cotton' and 0.6 < confidence < 1.0
+    # A tie is left to Claude
+    assert extract_commodity('Cocoa, cocoa, cocoa and coffee, coffee, coffee.')[1] == 0.5
+    assert extract_commodity('Soil and water') == (None, 0.0)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('Total budget: USD 250,000 over three years', ('USD 250,000', 0.85)),
+    ('The project costs EUR 1.2 million', ('EUR 1.2 million', 0.85)),
+    ('Funding of 50 000 - 100 000 USD for phase 1', ('50 000 - 100 000 USD', 0.85)),
+    ('A R$ 2.5 million grant', ('R$ 2.5 million', 0.85)),
+    ('We have a limited budget', ('Limited', 0.65)),
+    # An amount that isn't obviously a budget is left to Claude
+    ('Coffee sells at $3 per kg', ('$3', 0.4)),
+    # No amounts at all: confidently no budget
+    ('Farmers plant shade trees', (None, 0.8)),
+])
+def test_budget(text, expected):
+    assert extract_budget(text) == expected
+
+
+def test_confident_fields_splits_on_threshold():
+    extracted = extract_fields('Cotton in Chad. Cotton farms in Chad. Chad cotton. Prices are $3 per kg.')
+    resolved, missing = confident_fields(extracted, threshold=0.6)
+
+    assert resolved == {'location': 'Chad', 'commodity': 'Cotton'}
+    assert missing == ['budget']
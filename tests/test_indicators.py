@@ -0,0 +1,129 @@
+"""
+Tests for the streaming indicator extractor (cba_api/indicators.py).
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+
+from cba_api.indicators import IndicatorExtractor, extract_indicators, recommendations_from_frame
+
+RESPONSE = """Based on your coffee project in Brazil, here are my recommendations:
+
+**INDICATOR #1**
+- **ID:** 42
+- **Name:** Soil organic carbon
+- **Definition:** Carbon stored in the top 30 cm of soil,
+  measured annually across plots
+Why it matters: tracks regenerative practices
+Accuracy: High
+Cost: Low
+Ease of Use: Medium
+
+INDICATOR #2
+ID: 7
+Name: Farmer income
+Full Definition: Net household income from coffee
+Recommended method: household survey
+Cost: High
+
+INDICATOR #3
+ID: 8
+Name: Soil organic carbon
+Definition: Repeated name in a later block
+Accuracy: Low
+"""
+
+
+def test_extracts_blocks_with_scoped_attributes():
+    indicators = extract_indicators(RESPONSE)
+
+    assert [i['id'] for i in indicators] == [42, 7, 8]
+    first, second, third = indicators
+    assert first['name'] == 'Soil organic carbon'
+    assert first['definition'] == 'Carbon stored in the top 30 cm of soil,\nmeasured annually across plots'
+    assert (first['accuracy'], first['cost'], first['ease']) == ('High', 'Low', 'Medium')
+    # Missing attributes default to Medium instead of leaking from later blocks
+    assert second['definition'] == 'Net household income from coffee'
+    assert (second['accuracy'], second['cost'], second['ease']) == ('Medium', 'High', 'Medium')
+    # A repeated name resolves to its own block
+    assert third['accuracy'] == 'Low'
+    assert third['cost'] == 'Medium'
+
+
+def test_chunked_feed_matches_whole_text():
+    """Feeding arbitrary chunks gives the same result as one pass."""
+    extractor = IndicatorExtractor()
+    completed = []
+    for i in range(0, len(RESPONSE), 7):
+        completed.extend(extractor.feed(RESPONSE[i:i + 7]))
+
+    # Blocks are emitted as soon as the next header arrives
+    assert [i['id'] for i in completed] == [42, 7]
+    assert extractor.close() == extract_indicators(RESPONSE)
+
+
+def test_incomplete_blocks_are_skipped():
+    assert extract_indicators("INDICATOR #1\nName: No id or definition\n") == []
+    assert extract_indicators("No recommendations yet.") == []
+
+
+def test_non_numeric_ids_are_stable():
+    text = "INDICATOR #1\nID: SOC-1\nName: Soil\nDefinition: d\n"
+
+    assert extract_indicators(text)[0]['id'] == extract_indicators(text)[0]['id'] < 1000
+
+
+def test_recommendations_frame_fills_defaults():
+    data = json.dumps({'recommendations': [
+        {'id': 42, 'name': 'Soil organic carbon', 'cost': 'Low', 'unknown': 'dropped'},
+        {'id': 'x', 'name': 'Invalid id'},
+        {'id': 7},
+    ]})
+    indicators = recommendations_from_frame(data)
+
+    assert len(indicators) == 1
+    assert indicators[0]['cost'] == 'Low'
+    assert indicators[0]['accuracy'] == 'Medium'
+    assert indicators[0]['class'] == 'Unknown'
+    assert 'unknown' not in indicators[0]
+    assert set(indicators[0]) == set(extract_indicators(RESPONSE)[0])
+
+
+def test_other_frames_are_not_recommendations():
+    assert recommendations_from_frame('{"metadata": {}}') is None
+    assert recommendations_from_frame('{"recommendations": "none"}') is None
+    assert recommendations_from_frame('{"recommendations": [') is None
+
+
+def test_recommendations_frame_formatting():
+    """The frame is recognized whatever the agent's JSON serialization."""
+    record = {'id': 7, 'name': 'Water use'}
+    for data in (
+        json.dumps({'recommendations': [record]}, indent=2),
+        json.dumps({'recommendations': [record]}, separators=(',', ':')),
+        json.dumps({'metadata': {}, 'recommendations': [record]}, sort_keys=True),
+        ' ' + json.dumps({'recommendations': [record]}),
+    ):
+        assert [i['id'] for i in recommendations_from_frame(data)] == [7]
+    assert recommendations_from_frame('"{\\"recommendations\\": []}"') is None
+
+
+def test_inline_attributes():
+    pipes = "INDICATOR #1\nID: 42\nName: Soil\nDefinition: d\nAttributes: Accuracy: High | Cost: Low | Ease of Use: High\n"
+    commas = "INDICATOR #1\nID: 42\nName: Soil\nDefinition: d\n**Attributes:** Accuracy: High, Cost: Low, Ease: High\n"
+
+    for text in (pipes, commas):
+        indicator = extract_indicators(text)[0]
+        assert (indicator['accuracy'], indicator['cost'], indicator['ease']) == ('High', 'Low', 'High')
+        assert indicator['definition'] == 'd'
+
+
+def test_inline_id_and_name():
+    text = "INDICATOR #1\nID: 42 | Name: Soil organic carbon\nDefinition: Carbon in soil\n\nINDICATOR #2 ID: 7, Name: Farmer income\nDefinition: Income\n"
+    indicators = extract_indicators(text)
+
+    assert [(i['id'], i['name']) for i in indicators] == [(42, 'Soil organic carbon'), (7, 'Farmer income')]
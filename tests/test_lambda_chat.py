@@ -0,0 +1,189 @@
+"""
+Tests for the /chat handlers in lambda_function.py (buffered and streaming).
+AgentCore is replaced with an in-process fake.
+"""
+
+import base64
+import gzip
+import io
+import json
+import os
+import sys
+import threading
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import lambda_function
+from cba_api.store import MemoryStore
+
+AGENT_CHUNKS = [
+    b'data: "Here are your "\n\n',
+    b'data: "recommendations:\\n"\n\n',
+    b'data: "INDICATOR #1\\nID: 42\\nName: Soil organic carbon\\n"\n\n',
+    b'data: "Definition: Carbon stored in soil\\nAccuracy: High\\nCost: Low\\nEase: High"\n\n',
+]
+
+
+class FakeAgentCore:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.calls = []
+
+    def invoke_agent_runtime(self, **kwargs):
+        self.calls.append(kwargs)
+        return {'response': iter(self.chunks)}
+
+
+def setup_function(function):
+    lambda_function.agentcore = FakeAgentCore(AGENT_CHUNKS)
+    lambda_function.recommendations_store = MemoryStore()
+
+
+def test_handle_chat_buffered():
+    """Buffered /chat joins every frame and stores recommendations."""
+    result = lambda_function.handle_chat({'body': json.dumps({'message': 'hi', 'session_id': 's1'})})
+    body = json.loads(result['body'])
+
+    assert result['statusCode'] == 200
+    assert body['session_id'] == 's1'
+    assert body['response'].startswith('Here are your recommendations:\n')
+    assert body['has_recommendations'] is True
+    assert lambda_function.recommendations_store.get('s1')['indicators'][0]['id'] == 42
+
+
+RECORDED_FRAME = ('data: ' + json.dumps({'recommendations': [
+    {'id': 117, 'name': 'Net farm income', 'definition': 'Net income per household',
+     'component': 'Socio-economic', 'class': 'Financial well-being', 'cost': 'Low',
+     'methods': [{'id': 1, 'name': 'Farm record books', 'cost': 'Low', 'accuracy': 'Medium', 'ease': 'High'}]}
+]}) + '\n\n').encode()
+
+
+def test_handle_chat_prefers_recorded_recommendations():
+    """A typed recommendations frame is stored as is and the prose is not parsed."""
+    lambda_function.agentcore = FakeAgentCore([RECORDED_FRAME] + AGENT_CHUNKS)
+    result = lambda_function.handle_chat({'body': json.dumps({'message': 'hi', 'session_id': 's5'})})
+    body = json.loads(result['body'])
+
+    assert body['response'].startswith('Here are your recommendations:\n')
+    indicators = lambda_function.recommendations_store.get('s5')['indicators']
+    assert [i['id'] for i in indicators] == [117]
+    assert indicators[0]['class'] == 'Financial well-being'
+    assert indicators[0]['methods'][0]['name'] == 'Farm record books'
+
+
+def test_stream_chat_sends_recorded_recommendations_event():
+    lambda_function.agentcore = FakeAgentCore(AGENT_CHUNKS[:2] + [RECORDED_FRAME] + AGENT_CHUNKS[2:])
+    frames = list(lambda_function.stream_chat('hi', 's6'))
+
+    assert frames[2].startswith(b'event: recommendations\n')
+    assert RECORDED_FRAME not in frames
+    assert [i['id'] for i in lambda_function.recommendations_store.get('s6')['indicators']] == [117]
+
+
+def test_handle_chat_compresses_for_accepting_clients(monkeypatch):
+    monkeypatch.setattr(lambda_function, 'COMPRESS_MIN_BYTES', 0)
+    result = lambda_function.handle_chat({
+        'headers': {'accept-encoding': 'gzip'},
+        'body': json.dumps({'message': 'hi', 'session_id': 's7'})
+    })
+
+    assert result['isBase64Encoded'] is True
+    assert result['headers']['Content-Encoding'] == 'gzip'
+    body = json.loads(gzip.decompress(base64.b64decode(result['body'])))
+    assert body['session_id'] == 's7'
+
+
+def test_handle_chat_validation():
+    """Empty messages are rejected before AgentCore is called."""
+    result = lambda_function.handle_chat({'body': json.dumps({'message': '  '})})
+
+    assert result['statusCode'] == 400
+    assert lambda_function.agentcore.calls == []
+
+
+def test_stream_chat_forwards_frames_then_done():
+    """Each data frame is forwarded as-is, followed by a done event."""
+    frames = list(lambda_function.stream_chat('hi', 's2'))
+
+    assert frames[:len(AGENT_CHUNKS)] == AGENT_CHUNKS
+    assert frames[-1].startswith(b'event: done\n')
+    done = json.loads(frames[-1].split(b'data: ', 1)[1])
+    assert done == {'session_id': 's2', 'has_recommendations': True}
+    assert lambda_function.recommendations_store.get('s2') is not None
+
+
+def test_stream_chat_is_lazy():
+    """The first frame is produced before the agent stream is exhausted."""
+    consumed = []
+
+    def chunks():
+        for chunk in AGENT_CHUNKS:
+            consumed.append(chunk)
+            yield chunk
+
+    lambda_function.agentcore.invoke_agent_runtime = lambda **kwargs: {'response': chunks()}
+    stream = lambda_function.stream_chat('hi', 's3')
+    next(stream)
+
+    assert len(consumed) == 1
+
+
+def test_chat_stream_app_routes():
+    """The WSGI app streams /chat/stream and passes other routes to lambda_handler."""
+    statuses = []
+
+    def start_response(status, headers):
+        statuses.append((status, dict(headers)))
+
+    body = json.dumps({'message': 'hi', 'session_id': 's4'}).encode()
+    environ = {
+        'REQUEST_METHOD': 'POST',
+        'PATH_INFO': '/chat/stream',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': io.BytesIO(body),
+    }
+    frames = list(lambda_function.chat_stream_app(environ, start_response))
+    assert statuses[-1][0] == '200 OK'
+    assert statuses[-1][1]['Content-Type'] == 'text/event-stream'
+    assert frames[-1].startswith(b'event: done')
+
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': '/recommendations',
+        'QUERY_STRING': 'session_id=s4',
+        'wsgi.input': io.BytesIO(b''),
+    }
+    payload = json.loads(b''.join(lambda_function.chat_stream_app(environ, start_response)))
+    assert statuses[-1][0] == '200 OK'
+    assert payload['indicators'][0]['name'] == 'Soil organic carbon'
+
+
+def test_chat_stream_server_serves_requests_during_a_stream():
+    """A stream waiting on the agent doesn't block other requests."""
+    release = threading.Event()
+
+    def slow_chunks():
+        yield AGENT_CHUNKS[0]
+        release.wait(5)
+        yield from AGENT_CHUNKS[1:]
+
+    lambda_function.agentcore.invoke_agent_runtime = lambda **kwargs: {'response': slow_chunks()}
+    server = lambda_function.make_chat_stream_server('127.0.0.1', 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}'
+    try:
+        stream = urllib.request.urlopen(urllib.request.Request(
+            f'{url}/chat/stream', data=json.dumps({'message': 'hi', 'session_id': 's8'}).encode(),
+            headers={'Content-Type': 'application/json'}
+        ), timeout=5)
+        assert stream.readline() == b'data: "Here are your "\n'
+
+        with urllib.request.urlopen(f'{url}/recommendations?session_id=s8', timeout=2) as other:
+            assert other.status == 200
+        release.set()
+        assert stream.read().endswith(b'"has_recommendations": true}\n\n')
+    finally:
+        release.set()
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,54 @@
+"""
+Tests for relevance-ranked passage selection (cba_api/passages.py).
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cba_api.passages import OMITTED, estimate_tokens, score_passage, select_passages, split_passages
+
+FILLER = 'The alliance convenes partners to share lessons on regenerative landscapes. ' * 10
+TOC = '\n'.join(f'{title} ' + '.' * 30 + f' {page}' for title, page in [('Budget', 30), ('Coffee', 12), ('Brazil', 4)])
+BUDGET = 'The total project budget is USD 1.8 million over four years.'
+
+
+def report():
+    return '\n\n'.join(['Project Report', TOC] + [FILLER] * 20 + ['Coffee farms in Minas Gerais, Brazil.'] + [FILLER] * 20 + [BUDGET])
+
+
+def test_split_passages_keeps_paragraphs_together():
+    text = '\n\n'.join(['a' * 300, 'b' * 300, 'c' * 300, 'd' * 2000])
+    passages = split_passages(text, size=700)
+
+    assert passages[0] == 'a' * 300 + '\n\n' + 'b' * 300
+    assert all(len(passage) <= 700 for passage in passages)
+    assert ''.join(passages).replace('\n', '') == text.replace('\n', '')
+
+
+def test_table_of_contents_scores_below_content():
+    assert score_passage(TOC) < score_passage(BUDGET)
+    assert score_passage(FILLER) == 0
+
+
+def test_short_text_is_sent_whole():
+    assert select_passages(BUDGET, token_budget=100) == BUDGET
+
+
+def test_selection_fits_budget_and_finds_fields():
+    text = report()
+    selected = select_passages(text, token_budget=300)
+
+    assert estimate_tokens(selected) <= 300 < estimate_tokens(text)
+    assert selected.startswith('Project Report')
+    assert 'Minas Gerais, Brazil' in selected
+    assert selected.endswith(BUDGET)
+    assert OMITTED in selected
+
+
+def test_selection_targets_requested_fields():
+    selected = select_passages(report(), fields=['budget'], token_budget=150)
+
+    assert BUDGET in selected
+    assert 'Minas Gerais' not in selected
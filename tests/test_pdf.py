@@ -0,0 +1,50 @@
+"""
+Tests for lazy PDF text extraction (cba_api/pdf.py).
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+pypdf = pytest.importorskip('pypdf')
+
+from cba_api.pdf import extract_text, iter_pages
+
+PDF_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'cba_inputs', 'CBA ME Background.pdf'
+)
+
+
+@pytest.fixture(scope='module')
+def pdf_bytes():
+    with open(PDF_PATH, 'rb') as f:
+        return f.read()
+
+
+def full_text():
+    reader = pypdf.PdfReader(PDF_PATH)
+    return '\n'.join(text for text in (page.extract_text() for page in reader.pages) if text)
+
+
+def test_unbounded_extraction_matches_all_pages(pdf_bytes):
+    assert extract_text(pdf_bytes) == full_text()
+
+
+def test_extraction_stops_at_char_budget(pdf_bytes):
+    pages = iter_pages(pdf_bytes)
+    first_page = next(pages)
+    pages.close()
+
+    text = extract_text(pdf_bytes, max_chars=100)
+
+    assert text == first_page
+    assert full_text().startswith(text)
+
+
+def test_process_pool_preserves_page_order(pdf_bytes):
+    assert extract_text(pdf_bytes, workers=2) == full_text()
+    assert extract_text(pdf_bytes, max_chars=5000, workers=2) == extract_text(pdf_bytes, max_chars=5000)
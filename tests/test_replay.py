@@ -0,0 +1,77 @@
+"""
+Tests for the offline benchmark stand-ins (benchmarks/local_aws.py): the
+recorded conversations replay through lambda_function with no AWS access.
+"""
+
+import base64
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import lambda_function
+from cba_api.store import MemoryStore
+from local_aws import FakeAgentCore, FakeBedrockRuntime, FakeKnowledgeBase, FakeS3, load_recordings
+
+RECORDINGS = load_recordings()
+SESSION_ID = 'replay-' + '0' * 33
+
+
+def setup_function(function):
+    lambda_function.agentcore = FakeAgentCore(RECORDINGS)
+    lambda_function.recommendations_store = MemoryStore()
+
+
+def chat(message):
+    return lambda_function.handle_chat({'body': json.dumps({'message': message, 'session_id': SESSION_ID})})
+
+
+def test_recordings_cover_coffee_and_cotton():
+    assert {'coffee_brazil', 'cotton_chad'} <= set(RECORDINGS)
+    for recording in RECORDINGS.values():
+        assert os.path.exists(os.path.join(ROOT, 'cba_inputs', recording['document']))
+        assert any(turn['tool_calls'] for turn in recording['turns'])
+
+
+def test_replayed_turns_store_recommendations():
+    """Each conversation's recommendation turn yields indicators for /recommendations."""
+    for recording in RECORDINGS.values():
+        lambda_function.recommendations_store = MemoryStore()
+        for turn in recording['turns']:
+            result = chat(turn['message'])
+            assert result['statusCode'] == 200
+            assert json.loads(result['body'])['response'] == ''.join(turn['chunks'])
+        stored = lambda_function.recommendations_store.get(SESSION_ID)
+        assert len(stored['indicators']) >= 3
+
+
+def test_fake_model_answers_from_the_matching_recording(monkeypatch):
+    """With every field sent to invoke_model, the cotton upload gets the cotton answer."""
+    recording = RECORDINGS['cotton_chad']
+    monkeypatch.setattr(lambda_function, 'bedrock_runtime', FakeBedrockRuntime(RECORDINGS))
+    monkeypatch.setattr(lambda_function, 's3', FakeS3())
+    monkeypatch.setattr(lambda_function, 'upload_cache', MemoryStore())
+    monkeypatch.setattr(lambda_function, 'FIELD_CONFIDENCE_THRESHOLD', 1.01)
+    with open(os.path.join(ROOT, 'cba_inputs', recording['document']), 'rb') as f:
+        body = base64.b64encode(f.read()).decode()
+
+    result = lambda_function.handle_upload({'body': body, 'isBase64Encoded': True})
+
+    assert result['statusCode'] == 200
+    assert json.loads(result['body'])['found'] == recording['model_fields']
+    assert lambda_function.bedrock_runtime.calls == 1
+    assert len(lambda_function.s3.objects) == 1
+
+
+def test_fake_knowledge_base_ranks_by_shared_words():
+    kb = FakeKnowledgeBase(RECORDINGS)
+    response = kb.retrieve(
+        knowledgeBaseId='kb', retrievalQuery={'text': 'water infiltration rate'},
+        retrievalConfiguration={'vectorSearchConfiguration': {'numberOfResults': 2}}
+    )
+    results = response['retrievalResults']
+    assert len(results) == 2
+    assert 'infiltration' in results[0]['content']['text']
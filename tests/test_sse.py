@@ -0,0 +1,52 @@
+"""
+Tests for the incremental SSE decoder (cba_api/sse.py).
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cba_api.sse import SSEDecoder, SSEEvent, iter_events
+
+
+def frames(*texts):
+    return b''.join(f"data: {json.dumps(t)}\n\n".encode('utf-8') for t in texts)
+
+
+def test_frames_split_at_every_byte():
+    """Frames and multi-byte characters split across chunks are reassembled."""
+    texts = ['Café in São Paulo ', 'línea\nnueva ', '☕ "quoted" \\ end']
+    stream = frames(*texts)
+    decoder = SSEDecoder()
+    events = []
+    for i in range(len(stream)):
+        events.extend(decoder.feed(stream[i:i + 1]))
+    events.extend(decoder.close())
+
+    assert [e.text for e in events] == texts
+
+
+def test_json_unescaping():
+    """Escaped newlines, quotes and unicode escapes are decoded, not stripped."""
+    events = list(iter_events([b'data: "a\\nb \\"c\\" \\u00e9"\n\n']))
+
+    assert events[0].text == 'a\nb "c" \u00e9'
+
+
+def test_event_names_crlf_and_comments():
+    stream = [b': keep-alive\r\n', b'event: done\r\ndata: {"ok": true}\r\n\r\n', b'data: "tail"']
+    events = list(iter_events(stream))
+
+    assert events == [SSEEvent('{"ok": true}', 'done'), SSEEvent('"tail"')]
+    assert events[0].text is None
+    assert events[1].text == 'tail'
+
+
+def test_multiline_data_roundtrip():
+    """Multiple data lines join with newlines and re-encode losslessly."""
+    event = list(iter_events([b'event: x\ndata: one\ndata: two\n\n']))[0]
+
+    assert event.data == 'one\ntwo'
+    assert list(iter_events([event.encode()])) == [event]
@@ -0,0 +1,121 @@
+"""
+Tests for the recommendations stores (cba_api/store.py).
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cba_api.store import MemoryStore, SQLiteStore, TieredStore
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_memory_store_lru_eviction():
+    store = MemoryStore(max_entries=2, ttl_seconds=60)
+    store.put('a', 1)
+    store.put('b', 2)
+    store.get('a')  # 'a' is now most recently used
+    store.put('c', 3)
+
+    assert store.get('b') is None
+    assert store.get('a') == 1
+    assert store.get('c') == 3
+    assert len(store) == 2
+    assert store.stats()['evictions'] == 1
+
+
+def test_memory_store_ttl_and_counters():
+    clock = FakeClock()
+    store = MemoryStore(max_entries=10, ttl_seconds=60, clock=clock)
+    store.put('a', {'indicators': []})
+    assert store.get('a') == {'indicators': []}
+
+    clock.now += 61
+    assert store.get('a') is None
+    stats = store.stats()
+    assert (stats['hits'], stats['misses'], stats['expirations']) == (1, 1, 1)
+    assert stats['hit_rate'] == 0.5
+
+
+def test_sqlite_store_persists_across_instances(tmp_path):
+    path = str(tmp_path / 'recs.db')
+    clock = FakeClock()
+    SQLiteStore(path, ttl_seconds=60, clock=clock).put('s1', {'indicators': [{'id': 1}]})
+
+    reopened = SQLiteStore(path, ttl_seconds=60, clock=clock)
+    assert reopened.get('s1') == {'indicators': [{'id': 1}]}
+
+    clock.now += 61
+    assert reopened.get('s1') is None
+    assert reopened.purge_expired() == 0  # already removed on read
+
+
+def test_tiered_store_read_through_and_write_through(tmp_path):
+    clock = FakeClock()
+    durable = SQLiteStore(str(tmp_path / 'recs.db'), ttl_seconds=60, clock=clock)
+    # Two "Lambda instances" sharing one durable tier
+    first = TieredStore(MemoryStore(10, 60, clock), durable)
+    second = TieredStore(MemoryStore(10, 60, clock), durable)
+
+    first.put('s1', {'indicators': [1]})
+    assert durable.get('s1') == {'indicators': [1]}
+
+    assert second.get('s1') == {'indicators': [1]}  # read-through from durable
+    assert second.memory.get('s1') == {'indicators': [1]}  # now cached locally
+
+    # The memory tier keeps the durable expiry rather than a fresh TTL
+    clock.now += 61
+    assert second.get('s1') is None
+    assert second.stats()['hits'] == 1
+    assert second.stats()['misses'] == 1
+
+
+def test_tiered_store_memory_ttl_picks_up_other_instances_writes(tmp_path):
+    clock = FakeClock()
+    durable = SQLiteStore(str(tmp_path / 'recs.db'), ttl_seconds=3600, clock=clock)
+    first = TieredStore(MemoryStore(10, 5, clock), durable)
+    second = TieredStore(MemoryStore(10, 5, clock), durable)
+
+    first.put('s1', {'indicators': [1]})
+    assert second.get('s1') == {'indicators': [1]}
+    first.put('s1', {'indicators': [2]})
+    assert second.get('s1') == {'indicators': [1]}  # local copy, still fresh
+
+    clock.now += 6
+    assert second.get('s1') == {'indicators': [2]}
+    # The durable entry keeps the full TTL
+    assert durable.get_entry('s1')[1] == clock.now - 6 + 3600
+
+
+class FailingStore(SQLiteStore):
+    def put(self, key, value, expires_at=None):
+        raise RuntimeError('unavailable')
+
+
+def test_tiered_store_keeps_value_in_memory_when_durable_write_fails():
+    store = TieredStore(MemoryStore(10, 60), FailingStore())
+
+    with pytest.raises(RuntimeError):
+        store.put('s1', {'indicators': [1]})
+    assert store.get('s1') == {'indicators': [1]}
+
+
+def test_sqlite_store_key_column(tmp_path):
+    path = str(tmp_path / 'uploads.db')
+    store = SQLiteStore(path, table='upload_cache', key_column='sha256')
+    store.put('ab' * 32, {'fields': {}})
+
+    reopened = SQLiteStore(path, table='upload_cache', key_column='sha256')
+    assert reopened.get('ab' * 32) == {'fields': {}}
+    columns = [row[1] for row in reopened._conn.execute('PRAGMA table_info(upload_cache)')]
+    assert columns == ['sha256', 'payload', 'expires_at']
@@ -0,0 +1,92 @@
+"""
+Tests for per-request stage timings (cba_api/timing.py) and their EMF and
+Server-Timing output from lambda_handler.
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import lambda_function
+from cba_api import timing
+from cba_api.store import MemoryStore
+from cba_api.timing import RequestTimer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeAgentCore:
+    def invoke_agent_runtime(self, **kwargs):
+        return {'response': iter([
+            b'data: "INDICATOR #1\\nID: 42\\nName: Soil organic carbon\\n"\n\n',
+            b'data: "Definition: Carbon stored in soil\\nAccuracy: High\\nCost: Low"\n\n',
+        ])}
+
+
+def test_request_timer_accumulates_stages():
+    clock = FakeClock()
+    timer = RequestTimer('upload', clock=clock)
+    with timer.stage('s3_put'):
+        clock.now += 0.010
+    with timer.stage('s3_put'):
+        clock.now += 0.005
+    timer.mark('first_chunk')
+    clock.now += 0.001
+    timer.mark('first_chunk')
+    timer.count('chunks', 3)
+
+    assert timer.durations == {'s3_put': 15.0, 'first_chunk': 15.0}
+    assert timer.server_timing() == 's3_put;dur=15.0, first_chunk;dur=15.0, total;dur=16.0'
+
+    emf = timer.emf('Test', StatusCode=200)
+    [directive] = emf['_aws']['CloudWatchMetrics']
+    assert directive['Namespace'] == 'Test'
+    assert directive['Dimensions'] == [['Route']]
+    assert {'Name': 'chunks', 'Unit': 'Count'} in directive['Metrics']
+    assert {'Name': 'total', 'Unit': 'Milliseconds'} in directive['Metrics']
+    assert (emf['Route'], emf['s3_put'], emf['chunks'], emf['StatusCode']) == ('upload', 15.0, 3, 200)
+
+
+def test_module_helpers_are_no_ops_without_a_timer():
+    with timing.stage('anything'):
+        timing.count('chunks')
+        timing.record('x', 1.0)
+    assert timing.current() is None
+
+
+def test_lambda_handler_reports_chat_stages(capsys):
+    lambda_function.agentcore = FakeAgentCore()
+    lambda_function.recommendations_store = MemoryStore()
+    result = lambda_function.lambda_handler({
+        'rawPath': '/prod/chat',
+        'requestContext': {'http': {'method': 'POST'}},
+        'body': json.dumps({'message': 'hi', 'session_id': 's1'})
+    }, None)
+
+    assert result['statusCode'] == 200
+    stages = [entry.split(';')[0] for entry in result['headers']['Server-Timing'].split(', ')]
+    for name in ('routing', 'agent_invoke', 'first_chunk', 'agent_wait', 'agent_stream', 'sse_parse',
+                 'indicators', 'store_put', 'total'):
+        assert name in stages
+
+    emf = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+    assert emf['Route'] == 'chat'
+    assert emf['chunks'] == 2
+    assert emf['StatusCode'] == 200
+
+
+def test_lambda_handler_without_metrics(monkeypatch, capsys):
+    monkeypatch.setattr(lambda_function, 'REQUEST_METRICS', False)
+    result = lambda_function.lambda_handler({'rawPath': '/prod/nowhere', 'requestContext': {'http': {'method': 'GET'}}}, None)
+
+    assert result['statusCode'] == 404
+    assert 'Server-Timing' not in result['headers']
+    assert capsys.readouterr().out == ''
@@ -0,0 +1,262 @@
+"""
+Tests for the /upload handler in lambda_function.py.
+S3 and Bedrock are replaced with in-process fakes; direct uploads go
+through a local HTTP stand-in for S3 presigned POSTs.
+"""
+
+import base64
+import io
+import json
+import os
+import sys
+import threading
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote_plus
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+pytest.importorskip('pypdf')
+
+import lambda_function
+from cba_api.store import MemoryStore, SQLiteStore, TieredStore
+
+PDF_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'cba_inputs', 'Use Case Coffee Brazil.pdf'
+)
+
+
+class FakeS3:
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self.objects[(Bucket, Key)] = Body.read() if hasattr(Body, 'read') else bytes(Body)
+
+
+class LocalS3(FakeS3):
+    """
+    Local S3 stand-in that accepts browser-style presigned POST uploads over
+    HTTP and records the ObjectCreated notifications S3 would send.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.notifications = []
+        s3 = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode()
+                form = {}
+                for part in BytesParser(policy=default_policy).parsebytes(header + body).iter_parts():
+                    name = part.get_param('name', header='content-disposition')
+                    form[name] = part.get_payload(decode=True)
+                status = s3.receive(self.path.strip('/'), form)
+                self.send_response(status)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def generate_presigned_post(self, Bucket, Key, Fields, Conditions, ExpiresIn):
+        self.conditions = Conditions
+        host, port = self.server.server_address
+        return {'url': f'http://{host}:{port}/{Bucket}', 'fields': {'key': Key, **Fields, 'policy': 'stub'}}
+
+    def receive(self, bucket, form):
+        data = form.pop('file')
+        _, low, high = next(c for c in self.conditions if isinstance(c, list))
+        if not low <= len(data) <= high or form['Content-Type'].decode() != 'application/pdf':
+            return 403
+        key = form['key'].decode()
+        self.objects[(bucket, key)] = data
+        self.notifications.append({'Records': [{
+            'eventSource': 'aws:s3',
+            's3': {'bucket': {'name': bucket}, 'object': {'key': quote_plus(key), 'size': len(data)}}
+        }]})
+        return 204
+
+    def get_object(self, Bucket, Key):
+        return {'Body': io.BytesIO(self.objects[(Bucket, Key)])}
+
+
+class FakeBedrockRuntime:
+    def __init__(self, fields):
+        self.fields = fields
+        self.calls = []
+
+    def invoke_model(self, **kwargs):
+        self.calls.append(kwargs)
+        text = '```json\n' + json.dumps(self.fields) + '\n```'
+        return {'body': io.BytesIO(json.dumps({'content': [{'text': text}]}).encode())}
+
+
+@pytest.fixture
+def pdf_event():
+    with open(PDF_PATH, 'rb') as f:
+        return {'body': base64.b64encode(f.read()).decode(), 'isBase64Encoded': True}
+
+
+def setup_function(function):
+    lambda_function.s3 = FakeS3()
+    lambda_function.bedrock_runtime = FakeBedrockRuntime(
+        {'location': 'Minas Gerais, Brazil', 'commodity': 'Coffee', 'budget': None}
+    )
+    lambda_function.upload_cache = MemoryStore()
+    lambda_function.upload_status_store = MemoryStore()
+
+
+def test_upload_analyzes_document(pdf_event):
+    result = lambda_function.handle_upload(pdf_event)
+    body = json.loads(result['body'])
+
+    assert result['statusCode'] == 200
+    assert body['found'] == {'location': 'Minas Gerais, Brazil', 'commodity': 'Coffee'}
+    assert body['missing'] == ['Budget Range']
+    assert body['s3_uri'].startswith(f's3://{lambda_function.UPLOAD_BUCKET}/uploads/')
+    assert len(lambda_function.s3.objects) == 1
+    # Location, commodity and budget are all stated plainly in this document
+    assert lambda_function.bedrock_runtime.calls == []
+
+
+def test_claude_is_asked_only_for_uncertain_fields(pdf_event, monkeypatch):
+    # Commodity is extracted at 0.65 (the document also discusses dairy)
+    monkeypatch.setattr(lambda_function, 'FIELD_CONFIDENCE_THRESHOLD', 0.7)
+    lambda_function.bedrock_runtime.fields = {'commodity': 'Arabica coffee'}
+    body = json.loads(lambda_function.handle_upload(pdf_event)['body'])
+
+    assert body['found'] == {'location': 'Minas Gerais, Brazil', 'commodity': 'Arabica coffee'}
+    [call] = lambda_function.bedrock_runtime.calls
+    prompt = json.loads(call['body'])['messages'][0]['content']
+    assert 'Primary Commodity/Product' in prompt
+    assert 'Location/Region' not in prompt and 'Budget Range' not in prompt
+
+
+def test_unparseable_answer_keeps_deterministic_fields(pdf_event, monkeypatch):
+    monkeypatch.setattr(lambda_function, 'FIELD_CONFIDENCE_THRESHOLD', 0.7)
+    lambda_function.bedrock_runtime.invoke_model = lambda **kwargs: {
+        'body': io.BytesIO(json.dumps({'content': [{'text': 'No idea'}]}).encode())
+    }
+    result = lambda_function.handle_upload(pdf_event)
+
+    assert result['statusCode'] == 200
+    assert json.loads(result['body'])['found'] == {'location': 'Minas Gerais, Brazil'}
+
+
+def test_unparseable_answer_is_not_cached(pdf_event, monkeypatch):
+    monkeypatch.setattr(lambda_function, 'FIELD_CONFIDENCE_THRESHOLD', 0.7)
+    bedrock = lambda_function.bedrock_runtime
+    answers = iter(['No idea', json.dumps({'commodity': 'Arabica coffee'})])
+
+    def invoke_model(**kwargs):
+        bedrock.calls.append(kwargs)
+        return {'body': io.BytesIO(json.dumps({'content': [{'text': next(answers)}]}).encode())}
+
+    bedrock.invoke_model = invoke_model
+    first = json.loads(lambda_function.handle_upload(pdf_event)['body'])
+    assert 'commodity' not in first['found']
+    assert len(lambda_function.upload_cache) == 0
+
+    # The re-upload asks Claude again, and its parsed answer is cached
+    second = json.loads(lambda_function.handle_upload(pdf_event)['body'])
+    assert second['found']['commodity'] == 'Arabica coffee'
+    assert len(bedrock.calls) == 2
+    assert len(lambda_function.upload_cache) == 1
+
+
+def test_repeat_upload_is_served_from_cache(pdf_event, monkeypatch):
+    # Always ask Claude, so repeated analyses would show up as calls
+    monkeypatch.setattr(lambda_function, 'FIELD_CONFIDENCE_THRESHOLD', 1.01)
+    first = lambda_function.handle_upload(pdf_event)
+    second = lambda_function.handle_upload(pdf_event)
+
+    assert second['body'] == first['body']
+    assert len(lambda_function.s3.objects) == 1
+    assert len(lambda_function.bedrock_runtime.calls) == 1
+
+
+def test_upload_cache_durable_tier(pdf_event, tmp_path, monkeypatch):
+    monkeypatch.setattr(lambda_function, 'FIELD_CONFIDENCE_THRESHOLD', 1.01)
+    path = str(tmp_path / 'uploads.db')
+    lambda_function.upload_cache = TieredStore(MemoryStore(), SQLiteStore(path, table='upload_cache', key_column='sha256'))
+    first = lambda_function.handle_upload(pdf_event)
+
+    # A different container: empty memory tier, same durable tier
+    lambda_function.upload_cache = TieredStore(MemoryStore(), SQLiteStore(path, table='upload_cache', key_column='sha256'))
+    lambda_function.s3 = FakeS3()
+    second = lambda_function.handle_upload(pdf_event)
+
+    assert second['body'] == first['body']
+    assert lambda_function.s3.objects == {}
+    assert len(lambda_function.bedrock_runtime.calls) == 1
+
+
+def test_failed_analysis_is_not_cached():
+    event = {'body': base64.b64encode(b'not a pdf').decode(), 'isBase64Encoded': True}
+
+    assert lambda_function.handle_upload(event)['statusCode'] == 422
+    assert len(lambda_function.upload_cache) == 0
+
+
+def api(method, path, body=None, params=None):
+    event = {
+        'rawPath': path,
+        'requestContext': {'http': {'method': method}},
+        'queryStringParameters': params,
+        'body': json.dumps(body or {})
+    }
+    result = lambda_function.lambda_handler(event, None)
+    return result['statusCode'], json.loads(result['body'])
+
+
+def test_presigned_upload_flow():
+    """presign -> browser POST to S3 -> S3 event -> poll status."""
+    requests = pytest.importorskip('requests')
+    s3 = lambda_function.s3 = LocalS3()
+    try:
+        status, presign = api('POST', '/prod/upload/presign')
+        assert status == 200
+        upload_id = presign['upload_id']
+        assert api('GET', '/prod/upload/status', params={'upload_id': upload_id})[1]['status'] == 'pending'
+
+        with open(PDF_PATH, 'rb') as f:
+            upload = requests.post(presign['url'], data=presign['fields'], files={'file': ('doc.pdf', f)})
+        assert upload.status_code == 204
+
+        for notification in s3.notifications:
+            assert lambda_function.lambda_handler(notification, None) == {'processed': 1}
+
+        status, body = api('GET', '/prod/upload/status', params={'upload_id': upload_id})
+        assert status == 200
+        assert body['status'] == 'complete'
+        assert body['found'] == {'location': 'Minas Gerais, Brazil', 'commodity': 'Coffee'}
+        assert body['s3_uri'] == f's3://{lambda_function.UPLOAD_BUCKET}/incoming/{upload_id}.pdf'
+        # The object was already in S3; analysis doesn't store another copy
+        assert len(s3.objects) == 1
+    finally:
+        s3.server.shutdown()
+
+
+def test_s3_event_records_failures():
+    s3 = lambda_function.s3 = LocalS3()
+    try:
+        s3.objects[('bucket', 'incoming/abc.pdf')] = b'not a pdf'
+        event = {'Records': [{'s3': {'bucket': {'name': 'bucket'}, 'object': {'key': 'incoming/abc.pdf', 'size': 9}}}]}
+        lambda_function.lambda_handler(event, None)
+
+        status, body = api('GET', '/upload/status', params={'upload_id': 'abc'})
+        assert body['status'] == 'failed'
+        assert 'Could not read PDF' in body['error']
+        assert api('GET', '/upload/status', params={'upload_id': 'missing'})[0] == 404
+    finally:
+        s3.server.shutdown()